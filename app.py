@@ -1,982 +1,504 @@
-import streamlit as st
-import sqlite3
-from hashlib import sha256
-import time
-
-# Initialize the SQLite database
-def init_db():
-    conn = sqlite3.connect('users.db')
-    c = conn.cursor()
-    c.execute('''CREATE TABLE IF NOT EXISTS users
-                 (username TEXT PRIMARY KEY, password TEXT, role TEXT)''')
-    conn.commit()
-    conn.close()
-
-def setup_sample_admin():
-    conn = sqlite3.connect('users.db')
-    c = conn.cursor()
-    c.execute('SELECT * FROM users WHERE username = ?', ('admin',))
-    if not c.fetchone():
-        c.execute('INSERT INTO users (username, password, role) VALUES (?, ?, ?)',
-                  ('admin', hash_password('admin123'), 'admin'))
-        conn.commit()
-    conn.close()
-
-
-# Hashing function for passwords
-def hash_password(password):
-    return sha256(password.encode()).hexdigest()
-
-# Function to check user credentials
-def authenticate_user(username, password):
-    conn = sqlite3.connect('users.db')
-    c = conn.cursor()
-    c.execute('SELECT * FROM users WHERE username = ? AND password = ?', (username, hash_password(password)))
-    user = c.fetchone()
-    conn.close()
-    return user
-
-# Function to get user role
-def get_user_role(username):
-    conn = sqlite3.connect('users.db')
-    c = conn.cursor()
-    c.execute('SELECT role FROM users WHERE username = ?', (username,))
-    role = c.fetchone()
-    conn.close()
-    return role[0] if role else None
-
-# Function to register a new user
-def register_user(username, password):
-    conn = sqlite3.connect('users.db')
-    c = conn.cursor()
-    try:
-        c.execute('INSERT INTO users (username, password, role) VALUES (?, ?, ?)',
-                  (username, hash_password(password), 'user'))
-        conn.commit()
-        st.success("Registration successful! Please log in.")
-    except sqlite3.IntegrityError:
-        st.error("Username already exists.")
-    conn.close()
-
-# Mock function to get delivery time
-def get_estimated_delivery_time():
-    return "Your order will be delivered in approximately 30-45 minutes."
-
-# Streamlit App
-st.title("Food Ordering System")
-
-# Initialize session state for cart, authentication, and pages
-if "cart" not in st.session_state:
-    st.session_state.cart = []
-if "authenticated" not in st.session_state:
-    st.session_state.authenticated = False
-if "admin" not in st.session_state:
-    st.session_state.admin = False
-if "page" not in st.session_state:
-    st.session_state.page = "Login"
-if "favorites" not in st.session_state:
-    st.session_state.favorites = []
-if "order_placed" not in st.session_state:
-    st.session_state.order_placed = False
-if "username" not in st.session_state:
-    st.session_state.username = None  # Store the username of the logged-in user
-
-init_db()
-setup_sample_admin()
-
-# Page navigation
-if st.session_state.page == "Login":
-    st.header("Login")
-    username = st.text_input("Username")
-    password = st.text_input("Password", type="password")
-    
-    if st.button("Login"):
-        user = authenticate_user(username, password)
-        if user:
-            role = get_user_role(username)
-            if role == 'admin':
-                st.session_state.admin = True
-            st.session_state.authenticated = True
-            st.session_state.username = username  # Store the username
-            st.session_state.page = "Ordering" if role == 'user' else "AdminDashboard"
-        else:
-            st.error("Invalid username or password")
-
-    if st.button("Go to Register"):
-        st.session_state.page = "Register"
-
-elif st.session_state.page == "Register":
-    st.header("Register")
-    new_username = st.text_input("New Username")
-    new_password = st.text_input("New Password", type="password")
-    if st.button("Register"):
-        register_user(new_username, new_password)
-        st.session_state.page = "Login"
-
-elif st.session_state.page == "Ordering":
-    if not st.session_state.authenticated:
-        st.session_state.page = "Login"
-        
-    st.header("Ordering Page")
-    
-    # Sidebar menu to choose between options
-    menu_option = st.sidebar.selectbox(
-        "Choose an option",
-        ["View Menu", "View Cart", "Track Order", "Favorites", "Feedback"]
-    )
-
-    # Allow user to set dietary restrictions
-    dietary_restrictions = ["None", "Vegan", "Vegetarian", "Gluten-Free", "Dairy-Free", "Low-Sugar", "Low-Sodium", "High-Protein"]
-    selected_restriction = st.sidebar.selectbox("Select Dietary Restriction", dietary_restrictions)
-
-    menu_items = {
-            "Salads": {
-        "Caesar Salad": ["vegetarian", "gluten-free", "low-sugar", "low-sodium"],
-        "Quinoa Salad": ["vegan", "gluten-free", "dairy-free", "low-sugar", "high-protein"],
-        "Greek Salad": ["vegetarian", "gluten-free", "low-sodium", "low-sugar"],
-        "Kale & Avocado Salad": ["vegan", "gluten-free", "dairy-free", "low-sodium", "high-fiber", "low-sugar"],
-        "Caprese Salad": ["vegetarian", "gluten-free", "low-sodium", "low-sugar"],
-        "Spinach & Strawberry Salad": ["vegan", "gluten-free", "dairy-free", "low-sugar"],
-        "Chickpea & Cucumber Salad": ["vegan", "gluten-free", "dairy-free", "high-protein"],
-        "Roasted Beet Salad": ["vegan", "gluten-free", "dairy-free", "low-sugar", "high-fiber"],
-        "Avocado & Black Bean Salad": ["vegan", "gluten-free", "dairy-free", "high-protein", "low-sugar"],
-        "Asian Noodle Salad": ["vegetarian", "contains gluten", "dairy-free"],
-        "Southwestern Corn Salad": ["vegan", "gluten-free", "dairy-free", "low-sodium", "high-fiber"],
-        "Thai Mango Salad": ["vegan", "gluten-free", "dairy-free", "low-sugar"],
-        "Cobb Salad": ["vegetarian", "gluten-free", "contains dairy"],
-        "Mediterranean Chickpea Salad": ["vegan", "gluten-free", "dairy-free", "high-protein"],
-        "Waldorf Salad": ["vegetarian", "contains nuts", "contains dairy"],
-        "Farro Salad": ["vegetarian", "gluten-free", "contains dairy"],
-        "Black-Eyed Pea Salad": ["vegan", "gluten-free", "dairy-free", "high-protein"],
-        "Corn & Avocado Salad": ["vegan", "gluten-free", "dairy-free", "low-sodium"],
-        "Fruit & Nut Salad": ["vegetarian", "gluten-free", "contains nuts"],
-        "Roasted Sweet Potato Salad": ["vegan", "gluten-free", "dairy-free"],
-        "Panzanella Salad": ["vegetarian", "contains gluten"],
-        "Lentil Salad": ["vegan", "gluten-free", "dairy-free", "high-protein"],
-        "Pico de Gallo Salad": ["vegan", "gluten-free", "dairy-free"],
-        "Arugula & Parmesan Salad": ["vegetarian", "gluten-free", "contains dairy"],
-        "Carrot & Raisin Salad": ["vegan", "gluten-free", "dairy-free"],
-        "Apple & Walnut Salad": ["vegetarian", "gluten-free", "contains nuts"],
-        "Zucchini & Tomato Salad": ["vegan", "gluten-free", "dairy-free"],
-        "Cucumber & Tomato Salad": ["vegan", "gluten-free", "dairy-free"],
-        "Sesame Ginger Salad": ["vegan", "gluten-free", "dairy-free"],
-        "Avocado & Tomato Salad": ["vegan", "gluten-free", "dairy-free"],
-        "Chilled Gazpacho Salad": ["vegan", "gluten-free", "dairy-free"],
-        "Corn & Bean Salad": ["vegan", "gluten-free", "dairy-free", "high-protein"],
-        "Beet & Goat Cheese Salad": ["vegetarian", "gluten-free", "contains dairy"],
-        "Butternut Squash Salad": ["vegan", "gluten-free", "dairy-free"],
-        "Cabbage & Carrot Salad": ["vegan", "gluten-free", "dairy-free"],
-        "Spinach & Feta Salad": ["vegetarian", "gluten-free", "contains dairy"],
-        "Pasta Salad": ["vegetarian", "contains gluten"],
-        "Grape & Walnut Salad": ["vegetarian", "gluten-free", "contains nuts"],
-        "Radish & Cucumber Salad": ["vegan", "gluten-free", "dairy-free"],
-        "Sweet Potato & Kale Salad": ["vegan", "gluten-free", "dairy-free"],
-        "Berry & Spinach Salad": ["vegan", "gluten-free", "dairy-free"],
-        "Pear & Gorgonzola Salad": ["vegetarian", "gluten-free", "contains dairy"],
-        "Tomato & Mozzarella Salad": ["vegetarian", "gluten-free", "contains dairy"],
-        "Roasted Vegetable Salad": ["vegan", "gluten-free", "dairy-free"],
-        "Miso Salad": ["vegan", "gluten-free", "dairy-free"],
-        "Hummus & Veggie Salad": ["vegan", "gluten-free", "dairy-free"],
-        "Citrus & Avocado Salad": ["vegan", "gluten-free", "dairy-free"],
-    },
-        "Main Courses": {
-        "Grilled Chicken": ["high-protein", "gluten-free", "low-sodium", "low-sugar"],
-        "Pasta Primavera": ["vegetarian", "contains gluten", "low-sugar"],
-        "Vegetable Stir-fry": ["vegan", "gluten-free", "low-sodium"],
-        "Beef Burger (No Bun)": ["high-protein", "gluten-free", "low-sugar"],
-        "Lentil Soup": ["vegan", "gluten-free", "dairy-free", "high-fiber", "low-sugar"],
-        "Grilled Salmon": ["high-protein", "gluten-free", "low-sodium", "rich in Omega-3"],
-        "Chicken Alfredo": ["contains gluten", "contains dairy"],
-        "Stuffed Bell Peppers": ["vegetarian", "gluten-free", "dairy-free"],
-        "Eggplant Parmesan": ["vegetarian", "contains dairy"],
-        "Shrimp Scampi": ["gluten-free", "contains dairy"],
-        "Beef Stroganoff": ["contains gluten", "contains dairy"],
-        "Chicken Teriyaki": ["gluten-free", "contains soy"],
-        "Vegetarian Lasagna": ["vegetarian", "contains gluten", "contains dairy"],
-        "Falafel Wraps": ["vegan", "gluten-free"],
-        "Pork Schnitzel": ["contains gluten"],
-        "Butternut Squash Risotto": ["vegetarian", "contains dairy"],
-        "Chickpea Curry": ["vegan", "gluten-free", "dairy-free"],
-        "Baked Ziti": ["vegetarian", "contains gluten", "contains dairy"],
-        "Thai Red Curry": ["vegan", "gluten-free", "dairy-free"],
-        "Chicken Parmesan": ["contains gluten", "contains dairy"],
-        "Beef Tacos": ["contains gluten", "contains dairy"],
-        "Grilled Portobello Mushrooms": ["vegan", "gluten-free"],
-        "Sweet and Sour Chicken": ["contains gluten", "contains soy"],
-        "Vegetable Korma": ["vegan", "gluten-free", "dairy-free"],
-        "Turkey Meatballs": ["gluten-free"],
-        "Spaghetti Bolognese": ["contains gluten", "contains dairy"],
-        "Chicken Enchiladas": ["contains gluten", "contains dairy"],
-        "Coconut Curry Shrimp": ["gluten-free", "contains dairy"],
-        "Quinoa-Stuffed Eggplant": ["vegan", "gluten-free", "dairy-free"],
-        "Mushroom Risotto": ["vegetarian", "contains dairy"],
-        "BBQ Ribs": ["gluten-free"],
-        "Vegetable Paella": ["vegan", "gluten-free"],
-        "Pork Belly with Apples": ["contains gluten"],
-        "Lamb Chops": ["gluten-free"],
-        "Chicken Caesar Salad": ["contains gluten", "contains dairy"],
-        "Beef Burritos": ["contains gluten", "contains dairy"],
-        "Grilled Tuna Steak": ["gluten-free"],
-        "Spinach and Ricotta Stuffed Chicken": ["contains dairy"],
-        "Cajun Chicken Pasta": ["contains gluten"],
-        "Thai Basil Beef": ["gluten-free"],
-        "Vegetable Tempura": ["vegetarian", "contains gluten"],
-        "Chicken Shawarma": ["gluten-free"],
-        "Baked Falafel with Hummus": ["vegan", "gluten-free"],
-        "Pork Fried Rice": ["contains gluten"],
-        "Zucchini Noodles with Pesto": ["vegan", "gluten-free", "dairy-free"],
-        "Balsamic Glazed Chicken": ["gluten-free"],
-        "Stuffed Portobello Mushrooms": ["vegan", "gluten-free", "dairy-free"],
-        "Lentil Shepherd's Pie": ["vegan", "gluten-free"],
-        "Barbecue Chicken Pizza": ["contains gluten", "contains dairy"],
-        "Beef Wellington": ["contains gluten", "contains dairy"],
-    },
-        "Drinks": {
-        "Fruit Smoothie": ["vegan", "dairy-free", "low-sugar", "gluten-free"],
-        "Iced Tea (Unsweetened)": ["gluten-free", "dairy-free", "low-sugar", "low-sodium"],
-        "Mango Lassi (No Sugar)": ["vegetarian", "contains dairy", "gluten-free", "low-sugar"],
-        "Green Juice": ["vegan", "gluten-free", "dairy-free"],
-        "Coconut Water": ["vegan", "gluten-free", "dairy-free"],
-        "Herbal Tea": ["vegan", "gluten-free", "dairy-free"],
-        "Cold Brew Coffee": ["vegan", "gluten-free", "dairy-free"],
-        "Hot Chocolate": ["vegetarian", "contains dairy"],
-        "Lemonade": ["vegan", "gluten-free", "dairy-free"],
-        "Chia Seed Drink": ["vegan", "gluten-free", "dairy-free"],
-        "Almond Milk": ["vegan", "gluten-free", "low-sugar"],
-        "Matcha Latte": ["vegetarian", "contains dairy"],
-        "Ginger Ale": ["vegan", "gluten-free"],
-        "Sparkling Water": ["vegan", "gluten-free", "dairy-free"],
-        "Apple Cider": ["vegan", "gluten-free", "dairy-free"],
-        "Berry Smoothie": ["vegan", "dairy-free", "low-sugar", "gluten-free"],
-        "Pineapple Juice": ["vegan", "gluten-free", "dairy-free"],
-        "Mint Mojito": ["vegan", "gluten-free"],
-        "Cucumber Lemonade": ["vegan", "gluten-free", "dairy-free"],
-        "Soy Milk": ["vegan", "gluten-free"],
-        "Protein Shake": ["vegan", "dairy-free", "gluten-free"],
-        "Iced Coffee": ["vegan", "gluten-free", "dairy-free"],
-        "Orange Juice": ["vegan", "gluten-free", "dairy-free"],
-        "Carrot Juice": ["vegan", "gluten-free", "dairy-free"],
-        "Watermelon Juice": ["vegan", "gluten-free", "dairy-free"],
-        "Tropical Punch": ["vegan", "gluten-free", "dairy-free"],
-        "Raspberry Lemonade": ["vegan", "gluten-free", "dairy-free"],
-        "Kombucha": ["vegan", "gluten-free", "dairy-free"],
-        "Lavender Lemonade": ["vegan", "gluten-free", "dairy-free"],
-        "Berry Infused Water": ["vegan", "gluten-free", "dairy-free"],
-        "Peach Iced Tea": ["vegan", "gluten-free"],
-        "Hibiscus Tea": ["vegan", "gluten-free", "dairy-free"],
-        "Apple Mint Cooler": ["vegan", "gluten-free", "dairy-free"],
-        "Cherry Juice": ["vegan", "gluten-free", "dairy-free"],
-        "Coconut Milkshake": ["vegetarian", "contains dairy"],
-        "Ginger Lemon Tea": ["vegan", "gluten-free"],
-        "Tamarind Drink": ["vegan", "gluten-free", "dairy-free"],
-        "Cinnamon Apple Cider": ["vegan", "gluten-free"],
-        "Blueberry Smoothie": ["vegan", "dairy-free", "low-sugar", "gluten-free"],
-        "Strawberry Banana Smoothie": ["vegan", "dairy-free", "low-sugar", "gluten-free"],
-        "Coconut Pineapple Juice": ["vegan", "gluten-free", "dairy-free"],
-        "Cranberry Juice": ["vegan", "gluten-free", "dairy-free"],
-        "Lemon Basil Soda": ["vegan", "gluten-free"],
-        "Sweetened Almond Milk": ["vegan", "gluten-free"],
-        "Matcha Smoothie": ["vegan", "dairy-free", "gluten-free"],
-        "Iced Matcha Latte": ["vegetarian", "contains dairy"],
-        "Spiced Chai": ["vegetarian", "contains dairy"],
-        "Peach Smoothie": ["vegan", "dairy-free", "low-sugar", "gluten-free"],
-        "Papaya Juice": ["vegan", "gluten-free", "dairy-free"],
-    },
-       "Desserts": {
-        "Chocolate Lava Cake": ["vegetarian", "contains gluten", "contains dairy"],
-        "Cheesecake": ["vegetarian", "contains gluten", "contains dairy"],
-        "Tiramisu": ["vegetarian", "contains gluten", "contains dairy"],
-        "Apple Pie": ["vegetarian", "contains gluten", "contains dairy"],
-        "Brownies": ["vegetarian", "contains gluten", "contains dairy"],
-        "Lemon Bars": ["vegetarian", "contains gluten", "contains dairy"],
-        "Panna Cotta": ["vegetarian", "contains gluten", "contains dairy"],
-        "Baklava": ["vegetarian", "contains gluten", "contains dairy"],
-        "Pavlova": ["vegetarian", "contains gluten", "contains dairy"],
-        "Crème Brûlée": ["vegetarian", "contains gluten", "contains dairy"],
-        "Mango Sticky Rice": ["vegan", "gluten-free", "dairy-free"],
-        "Fruit Sorbet": ["vegan", "gluten-free", "dairy-free"],
-        "Vegan Chocolate Cake": ["vegan", "contains gluten"],
-        "Chia Pudding": ["vegan", "gluten-free", "dairy-free"],
-        "Coconut Macaroons": ["vegan", "gluten-free"],
-        "Almond Cake": ["vegetarian", "contains gluten", "contains dairy"],
-        "Peach Cobbler": ["vegetarian", "contains gluten", "contains dairy"],
-        "Rice Pudding": ["vegetarian", "contains gluten", "contains dairy"],
-        "Tapioca Pudding": ["vegetarian", "contains gluten", "contains dairy"],
-        "Key Lime Pie": ["vegetarian", "contains gluten", "contains dairy"],
-        "Popsicles": ["vegan", "gluten-free", "dairy-free"],
-        "Apple Crisp": ["vegetarian", "contains gluten", "contains dairy"],
-        "Pumpkin Pie": ["vegetarian", "contains gluten", "contains dairy"],
-        "Matcha Green Tea Cake": ["vegetarian", "contains gluten", "contains dairy"],
-        "Coconut Cream Pie": ["vegetarian", "contains gluten", "contains dairy"],
-        "Lava Cake": ["vegetarian", "contains gluten", "contains dairy"],
-        "Carrot Cake": ["vegetarian", "contains gluten", "contains dairy"],
-        "Gelato": ["vegetarian", "contains gluten", "contains dairy"],
-        "Rice Krispie Treats": ["vegetarian", "contains gluten", "contains dairy"],
-        "Cinnamon Rolls": ["vegetarian", "contains gluten", "contains dairy"],
-        "Strawberry Shortcake": ["vegetarian", "contains gluten", "contains dairy"],
-        "Fruit Tart": ["vegetarian", "contains gluten", "contains dairy"],
-        "Chocolate Mousse": ["vegetarian", "contains gluten", "contains dairy"],
-        "Bread Pudding": ["vegetarian", "contains gluten", "contains dairy"],
-        "Blueberry Muffins": ["vegetarian", "contains gluten", "contains dairy"],
-        "Lemon Meringue Pie": ["vegetarian", "contains gluten", "contains dairy"],
-        "Black Forest Cake": ["vegetarian", "contains gluten", "contains dairy"],
-        "Raspberry Cheesecake Bars": ["vegetarian", "contains gluten", "contains dairy"],
-        "Chocolate Chip Cookies": ["vegetarian", "contains gluten", "contains dairy"],
-        "Sweet Potato Pie": ["vegetarian", "contains gluten", "contains dairy"],
-        "Coconut Panna Cotta": ["vegetarian", "gluten-free", "dairy-free"],
-        "Vegan Cookies": ["vegan", "gluten-free"],
-        "Raisin Bran Muffins": ["vegetarian", "contains gluten", "contains dairy"],
-        "Toffee Bars": ["vegetarian", "contains gluten", "contains dairy"],
-        "Fig Bars": ["vegetarian", "contains gluten", "contains dairy"],
-        "Mango Sorbet": ["vegan", "gluten-free", "dairy-free"],
-        "Apple Cinnamon Donuts": ["vegetarian", "contains gluten", "contains dairy"],
-        "Coconut Banana Bread": ["vegetarian", "contains gluten", "contains dairy"],
-        "Apricot Almond Cake": ["vegetarian", "contains gluten", "contains dairy"],
-        "Orange Almond Cake": ["vegetarian", "contains gluten", "contains dairy"],
-        "Churros": ["vegetarian", "contains gluten", "contains dairy"],
-        "S'mores Bars": ["vegetarian", "contains gluten", "contains dairy"],
-        "Raspberry Sorbet": ["vegan", "gluten-free", "dairy-free"],
-    },  "Drinks": {
-        "Mango Smoothie": ["contains dairy"],
-        "Berry Blast": ["vegan"],
-        "Orange Juice": ["vegan"],
-        "Pineapple Coconut Smoothie": ["vegan"],
-        "Strawberry Banana Smoothie": ["contains dairy"],
-        "Green Juice": ["vegan"],
-        "Blueberry Almond Smoothie": ["vegan"],
-        "Carrot Ginger Juice": ["vegan"],
-        "Apple Cider": ["vegan"],
-        "Watermelon Juice": ["vegan"],
-        "Avocado Smoothie": ["contains dairy"],
-        "Almond Milk Smoothie": ["vegan"],
-        "Peach Smoothie": ["vegan"],
-        "Pomegranate Juice": ["vegan"],
-        "Cucumber Mint Juice": ["vegan"],
-        "Grapefruit Juice": ["vegan"],
-        "Papaya Smoothie": ["vegan"],
-        "Lemon Ginger Detox Juice": ["vegan"],
-        "Berry Citrus Smoothie": ["vegan"],
-        "Kiwi Mango Juice": ["vegan"],
-        "Coconut Water": ["vegan"],
-        "Chocolate Banana Smoothie": ["contains dairy"],
-        "Green Apple Juice": ["vegan"],
-        "Dragon Fruit Smoothie": ["vegan"],
-        "Pear and Spinach Smoothie": ["vegan"],
-        "Cantaloupe Juice": ["vegan"],
-        "Apple and Beetroot Juice": ["vegan"],
-        "Berry Yogurt Smoothie": ["contains dairy"],
-        "Mango Pineapple Juice": ["vegan"],
-        "Sweet Potato Smoothie": ["vegan"],
-        "Pina Colada Smoothie": ["contains dairy"],
-        "Raspberry Lime Juice": ["vegan"],
-        "Tropical Fruit Punch": ["vegan"],
-        "Watermelon Mint Juice": ["vegan"],
-        "Beet and Carrot Juice": ["vegan"],
-        "Tropical Green Smoothie": ["vegan"],
-        "Cherry Smoothie": ["vegan"],
-        "Ginger Peach Juice": ["vegan"],
-        "Apricot Juice": ["vegan"],
-        "Matcha Latte": ["contains dairy"],
-        "Ginger Lemonade": ["vegan"],
-        "Kiwi Lime Juice": ["vegan"],
-        "Lavender Lemonade": ["vegan"],
-        "Coconut Matcha Smoothie": ["contains dairy"],
-        "Peach Lemonade": ["vegan"]
-    },
-    "Desserts": {
-        "Chocolate Lava Cake": ["contains dairy", "contains gluten"],
-        "Vanilla Cheesecake": ["contains dairy", "contains gluten"],
-        "Apple Pie": ["contains dairy", "contains gluten"],
-        "Lemon Meringue Pie": ["contains dairy", "contains gluten"],
-        "Tiramisu": ["contains dairy", "contains gluten"],
-        "Strawberry Shortcake": ["contains dairy", "contains gluten"],
-        "Brownies": ["contains dairy", "contains gluten"],
-        "Panna Cotta": ["contains dairy"],
-        "Fruit Tart": ["contains gluten"],
-        "Carrot Cake": ["contains dairy", "contains gluten"],
-        "Cheesecake Brownies": ["contains dairy", "contains gluten"],
-        "Chocolate Mousse": ["contains dairy"],
-        "Creme Brulee": ["contains dairy"],
-        "Peach Cobbler": ["contains dairy", "contains gluten"],
-        "Raspberry Sorbet": ["vegan"],
-        "Pavlova": ["contains dairy"],
-        "Mango Sticky Rice": ["vegan"],
-        "Chocolate Chip Cookies": ["contains dairy", "contains gluten"],
-        "Lemon Bars": ["contains dairy", "contains gluten"],
-        "Almond Cake": ["contains dairy", "contains gluten"],
-        "Coconut Macaroons": ["contains gluten"],
-        "Rice Pudding": ["contains dairy"],
-        "Baked Apples": ["vegan"],
-        "Apple Crisp": ["contains dairy", "contains gluten"],
-        "Chocolate Covered Strawberries": ["contains dairy"],
-        "Pumpkin Pie": ["contains dairy", "contains gluten"],
-        "Key Lime Pie": ["contains dairy", "contains gluten"],
-        "Coconut Panna Cotta": ["vegan"],
-        "Berry Parfait": ["contains dairy"],
-        "Chocolate Fondue": ["contains dairy"],
-        "Peach Melba": ["contains dairy"],
-        "Baked Pears": ["vegan"],
-        "Raisin Cookies": ["contains dairy", "contains gluten"],
-        "Blueberry Muffins": ["contains dairy", "contains gluten"],
-        "Tiramisu Cupcakes": ["contains dairy", "contains gluten"],
-        "Cherry Clafoutis": ["contains dairy", "contains gluten"],
-        "Coconut Ice Cream": ["contains dairy"],
-        "Fruit Sorbet": ["vegan"],
-        "Gingerbread Cookies": ["contains dairy", "contains gluten"],
-        "Almond Croissants": ["contains dairy", "contains gluten"],
-        "Chocolate Tiramisu": ["contains dairy", "contains gluten"],
-        "Pistachio Ice Cream": ["contains dairy"],
-        "Matcha Cheesecake": ["contains dairy"]
-    },
-    "Appetizers": {
-        "Bruschetta": ["vegetarian", "contains gluten"],
-        "Stuffed Mushrooms": ["vegetarian"],
-        "Deviled Eggs": ["contains dairy"],
-        "Spring Rolls": ["vegan"],
-        "Garlic Knots": ["contains gluten"],
-        "Stuffed Jalapenos": ["vegetarian"],
-        "Spinach Artichoke Dip": ["vegetarian", "contains dairy"],
-        "Cucumber Sandwiches": ["vegetarian"],
-        "Chicken Satay": ["contains gluten"],
-        "Cheese Platter": ["contains dairy"],
-        "Hummus with Pita": ["vegan"],
-        "Chicken Wings": ["contains gluten"],
-        "Pigs in a Blanket": ["contains gluten"],
-        "Falafel": ["vegan"],
-        "Bruschetta with Tomato": ["vegetarian", "contains gluten"],
-        "Caprese Skewers": ["vegetarian"],
-        "Mini Quiches": ["contains dairy"],
-        "Stuffed Grape Leaves": ["vegan"],
-        "Cheese and Crackers": ["contains dairy"],
-        "Vegetable Samosas": ["vegan"],
-        "Olive Tapenade": ["vegan"],
-        "Jalapeno Poppers": ["contains gluten"],
-        "Zucchini Fritters": ["vegetarian"],
-        "Artichoke Dip": ["vegetarian", "contains dairy"],
-        "Cheese Stuffed Meatballs": ["contains dairy"],
-        "Spring Roll Wrappers": ["vegan"],
-        "Crispy Chickpeas": ["vegan"],
-        "Garlic Parmesan Pretzels": ["contains gluten"],
-        "Sweet Potato Fries": ["vegan"],
-        "Mini Tacos": ["contains gluten"],
-        "Antipasto Platter": ["vegetarian"],
-        "Caprese Salad Skewers": ["vegetarian"],
-        "Buffalo Cauliflower Bites": ["vegan"],
-        "Pita Bread with Tzatziki": ["vegetarian"],
-        "Stuffed Pita Pockets": ["vegan"],
-        "Cheese Fondue": ["contains dairy"],
-        "Vegetable Spring Rolls": ["vegan"],
-        "Mini Quesadillas": ["contains dairy"]
-    },
-    "Soups": {
-        "Tomato Basil Soup": ["vegan", "gluten-free"],
-        "Minestrone Soup": ["vegan", "gluten-free"],
-        "Chicken Noodle Soup": ["contains gluten"],
-        "Lentil Soup": ["vegan", "gluten-free"],
-        "Butternut Squash Soup": ["vegan", "gluten-free"],
-        "Clam Chowder": ["contains dairy", "contains gluten"],
-        "Vegetable Soup": ["vegan", "gluten-free"],
-        "Mushroom Soup": ["vegetarian", "contains dairy"],
-        "Chicken Tortilla Soup": ["contains gluten"],
-        "Corn Chowder": ["contains dairy", "contains gluten"],
-        "Split Pea Soup": ["vegan", "gluten-free"],
-        "Beef Barley Soup": ["contains gluten"],
-        "Sweet Potato Soup": ["vegan", "gluten-free"],
-        "Gazpacho": ["vegan", "gluten-free"],
-        "French Onion Soup": ["contains dairy"],
-        "Carrot Ginger Soup": ["vegan", "gluten-free"],
-        "Pumpkin Soup": ["vegan", "gluten-free"],
-        "Creamy Tomato Soup": ["contains dairy"],
-        "Cauliflower Soup": ["vegan", "gluten-free"],
-        "Spicy Black Bean Soup": ["vegan", "gluten-free"],
-        "Thai Coconut Soup": ["vegan", "gluten-free"],
-        "Potato Leek Soup": ["vegetarian", "contains dairy"],
-        "Green Pea Soup": ["vegan", "gluten-free"],
-        "Barley Vegetable Soup": ["vegan", "gluten-free"],
-        "Broccoli Cheddar Soup": ["contains dairy"],
-        "Chicken and Rice Soup": ["contains gluten"],
-        "Roasted Red Pepper Soup": ["vegan", "gluten-free"],
-        "Cream of Asparagus Soup": ["contains dairy"],
-        "Zucchini Soup": ["vegan", "gluten-free"],
-        "Lobster Bisque": ["contains dairy", "contains gluten"],
-        "Potato Soup": ["contains dairy"],
-        "Kale Soup": ["vegan", "gluten-free"],
-        "Spicy Tomato Soup": ["vegan", "gluten-free"],
-        "Cabbage Soup": ["vegan", "gluten-free"],
-        "Wild Mushroom Soup": ["vegetarian", "contains dairy"],
-        "Pea and Mint Soup": ["vegan", "gluten-free"],
-        "Sichuan Hot & Sour Soup": ["vegan", "contains gluten"],
-        "Italian Wedding Soup": ["contains gluten"],
-        "Sweet Corn Soup": ["vegan", "gluten-free"],
-        "Red Lentil Soup": ["vegan", "gluten-free"]
-    },
-        "Sides": {
-        "Garlic Mashed Potatoes": ["contains dairy"],
-        "Roasted Vegetables": ["vegan", "gluten-free"],
-        "French Fries": ["vegan", "gluten-free"],
-        "Rice Pilaf": ["vegan", "gluten-free"],
-        "Steamed Asparagus": ["vegan", "gluten-free"],
-        "Coleslaw": ["vegetarian"],
-        "Sweet Potato Fries": ["vegan", "gluten-free"],
-        "Crispy Brussels Sprouts": ["vegan", "gluten-free"],
-        "Baked Beans": ["vegan"],
-        "Corn on the Cob": ["vegan", "gluten-free"],
-        "Garlic Bread": ["vegetarian", "contains gluten"],
-        "Macaroni and Cheese": ["contains dairy"],
-        "Grilled Zucchini": ["vegan", "gluten-free"],
-        "Cucumber Salad": ["vegan", "gluten-free"],
-        "Roasted Sweet Potatoes": ["vegan", "gluten-free"],
-        "Quinoa Salad": ["vegan", "gluten-free"],
-        "Hush Puppies": ["contains gluten"],
-        "Potato Wedges": ["vegan", "gluten-free"],
-        "Vegetable Stir-Fry": ["vegan"],
-        "Cheese Sticks": ["contains dairy", "contains gluten"]
-    },
-    "Sauces & Condiments": {
-        "Ketchup": ["vegan", "gluten-free"],
-        "Mustard": ["vegan", "gluten-free"],
-        "Mayonnaise": ["contains dairy"],
-        "Ranch Dressing": ["contains dairy"],
-        "Barbecue Sauce": ["vegan"],
-        "Hot Sauce": ["vegan", "gluten-free"],
-        "Soy Sauce": ["vegan", "contains gluten"],
-        "Salsa": ["vegan", "gluten-free"],
-        "Guacamole": ["vegan"],
-        "Tzatziki": ["contains dairy"],
-        "Hummus": ["vegan"],
-        "Pesto": ["contains dairy, nuts"],
-        "Buffalo Sauce": ["vegan"],
-        "Chimichurri": ["vegan"],
-        "Balsamic Vinaigrette": ["vegan"],
-        "Raspberry Vinaigrette": ["vegan"],
-        "Teriyaki Sauce": ["vegan", "contains gluten"],
-        "Cranberry Sauce": ["vegan"],
-        "Aioli": ["contains dairy"],
-        "Sriracha": ["vegan", "gluten-free"]
-    },
-    "Sandwiches & Wraps": {
-        "Chicken Caesar Wrap": ["contains dairy"],
-        "Turkey Club Sandwich": ["contains gluten"],
-        "Vegetarian Panini": ["vegetarian", "contains gluten"],
-        "Grilled Cheese Sandwich": ["contains dairy", "contains gluten"],
-        "Falafel Wrap": ["vegan"],
-        "Chicken Shawarma Wrap": ["contains gluten"],
-        "BLT Sandwich": ["contains gluten"],
-        "Caprese Sandwich": ["vegetarian", "contains gluten"],
-        "Roast Beef Sandwich": ["contains gluten"],
-        "Veggie Wrap": ["vegan"],
-        "Turkey & Avocado Sandwich": ["contains gluten"],
-        "Pastrami on Rye": ["contains gluten"],
-        "Buffalo Chicken Wrap": ["contains gluten"],
-        "Mushroom & Swiss Sandwich": ["vegetarian", "contains gluten", "contains dairy"],
-        "Grilled Veggie Wrap": ["vegan"],
-        "BBQ Pulled Pork Sandwich": ["contains gluten"],
-        "Hummus & Veggie Wrap": ["vegan"],
-        "Tuna Salad Sandwich": ["contains gluten"],
-        "Egg Salad Sandwich": ["contains gluten", "contains dairy"],
-        "Greek Salad Wrap": ["vegan"]
-    },
-    "Pasta": {
-        "Spaghetti Bolognese": ["contains gluten"],
-        "Fettuccine Alfredo": ["contains dairy"],
-        "Penne Arrabbiata": ["vegan"],
-        "Lasagna": ["contains dairy", "contains gluten"],
-        "Macaroni and Cheese": ["contains dairy"],
-        "Pesto Pasta": ["contains dairy"],
-        "Ratatouille Pasta": ["vegan"],
-        "Carbonara": ["contains dairy", "contains gluten"],
-        "Stuffed Shells": ["contains dairy"],
-        "Seafood Pasta": ["contains gluten"],
-        "Baked Ziti": ["contains dairy", "contains gluten"],
-        "Vegan Pasta Primavera": ["vegan"],
-        "Pasta with Marinara Sauce": ["vegan"],
-        "Mushroom Risotto": ["contains dairy"],
-        "Pasta Puttanesca": ["vegan"],
-        "Sweet Potato Pasta": ["vegan"],
-        "Butternut Squash Pasta": ["vegan"],
-        "Cacio e Pepe": ["contains dairy"],
-        "Lemon Garlic Pasta": ["vegan"],
-        "Eggplant Pasta": ["vegan"]
-    },
-    "Pizza": {
-        "Margherita Pizza": ["vegetarian"],
-        "Pepperoni Pizza": ["contains gluten"],
-        "Vegetarian Pizza": ["vegetarian"],
-        "BBQ Chicken Pizza": ["contains gluten"],
-        "Hawaiian Pizza": ["contains gluten"],
-        "Mushroom Pizza": ["vegetarian"],
-        "Four Cheese Pizza": ["contains dairy"],
-        "Veggie Supreme Pizza": ["vegetarian"],
-        "Meat Lover's Pizza": ["contains gluten"],
-        "Pesto Pizza": ["vegetarian", "contains dairy"],
-        "Greek Pizza": ["vegetarian"],
-        "White Pizza": ["contains dairy"],
-        "Buffalo Chicken Pizza": ["contains gluten"],
-        "Spinach & Artichoke Pizza": ["vegetarian"],
-        "Sausage & Peppers Pizza": ["contains gluten"],
-        "Margherita Flatbread": ["vegetarian"],
-        "Pineapple & Ham Pizza": ["contains gluten"],
-        "Roasted Vegetable Pizza": ["vegetarian"],
-        "Chorizo Pizza": ["contains gluten"],
-        "Tomato & Basil Pizza": ["vegetarian"],
-        "Zucchini & Goat Cheese Pizza": ["vegetarian", "contains dairy"]
-    },
-    "Seafood": {
-        "Grilled Salmon": ["gluten-free"],
-        "Shrimp Scampi": ["contains gluten"],
-        "Crab Cakes": ["contains gluten"],
-        "Fish Tacos": ["contains gluten"],
-        "Seafood Paella": ["contains gluten"],
-        "Baked Cod": ["gluten-free"],
-        "Clam Chowder": ["contains dairy", "contains gluten"],
-        "Mussels in White Wine Sauce": ["contains dairy"],
-        "Lobster Roll": ["contains gluten"],
-        "Garlic Butter Shrimp": ["gluten-free"],
-        "Tuna Steak": ["gluten-free"],
-        "Oysters Rockefeller": ["contains dairy"],
-        "Grilled Swordfish": ["gluten-free"],
-        "Sushi Rolls": ["contains gluten"],
-        "Seafood Alfredo": ["contains dairy", "contains gluten"],
-        "Shrimp Fried Rice": ["contains gluten"],
-        "Salmon Tartare": ["gluten-free"],
-        "Crab Legs": ["gluten-free"],
-        "Scallops in Lemon Butter Sauce": ["contains dairy"],
-        "Prawn Curry": ["vegan"],
-        "Octopus Salad": ["gluten-free"]
-    },
-    "Burgers": {
-        "Classic Cheeseburger": ["contains dairy"],
-        "Bacon Burger": ["contains gluten"],
-        "Veggie Burger": ["vegan"],
-        "BBQ Burger": ["contains gluten"],
-        "Mushroom Swiss Burger": ["contains dairy"],
-        "Chicken Burger": ["contains gluten"],
-        "Bison Burger": ["contains gluten"],
-        "Black Bean Burger": ["vegan"],
-        "Turkey Burger": ["contains gluten"],
-        "Sliders": ["contains gluten"],
-        "Beef Burger": ["contains gluten"],
-        "Fish Burger": ["contains gluten"],
-        "Lamb Burger": ["contains gluten"],
-        "Portobello Burger": ["vegan"],
-        "Greek Burger": ["contains gluten"],
-        "Avocado Burger": ["contains gluten"],
-        "Jalapeno Burger": ["contains gluten"],
-        "Hawaiian Burger": ["contains gluten"],
-        "Pork Burger": ["contains gluten"],
-        "BBQ Pulled Pork Burger": ["contains gluten"]
-    },
-    "Breakfast Items": {
-        "Pancakes": ["contains dairy", "contains gluten"],
-        "French Toast": ["contains dairy", "contains gluten"],
-        "Omelette": ["contains dairy"],
-        "Avocado Toast": ["vegan"],
-        "Bagel with Cream Cheese": ["contains dairy", "contains gluten"],
-        "Breakfast Burrito": ["contains gluten"],
-        "Granola with Yogurt": ["contains dairy"],
-        "Smoothie Bowl": ["vegan"],
-        "Eggs Benedict": ["contains dairy", "contains gluten"],
-        "Breakfast Sandwich": ["contains gluten", "contains dairy"],
-        "Chia Pudding": ["vegan"],
-        "Fruit Salad": ["vegan"],
-        "Breakfast Quesadilla": ["contains dairy", "contains gluten"],
-        "Tofu Scramble": ["vegan"],
-        "Muffins": ["contains dairy", "contains gluten"],
-        "Breakfast Parfait": ["contains dairy"],
-        "Egg & Cheese Croissant": ["contains dairy", "contains gluten"],
-        "Breakfast Pizza": ["contains gluten", "contains dairy"],
-        "Waffles": ["contains dairy", "contains gluten"],
-        "Overnight Oats": ["vegan"]
-    },
-    "Smoothies & Juices": {
-        "Mango Smoothie": ["contains dairy"],
-        "Green Juice": ["vegan"],
-        "Berry Smoothie": ["vegan"],
-        "Orange Juice": ["vegan"],
-        "Strawberry Banana Smoothie": ["contains dairy"],
-        "Carrot Juice": ["vegan"],
-        "Pineapple Smoothie": ["vegan"],
-        "Beet Juice": ["vegan"],
-        "Apple Smoothie": ["vegan"],
-        "Ginger Juice": ["vegan"],
-        "Kiwi Smoothie": ["vegan"],
-        "Watermelon Juice": ["vegan"],
-        "Blueberry Smoothie": ["vegan"],
-        "Cucumber Juice": ["vegan"],
-        "Tropical Smoothie": ["vegan"],
-        "Spinach Smoothie": ["vegan"],
-        "Lemonade": ["vegan"],
-        "Peach Juice": ["vegan"],
-        "Raspberry Smoothie": ["vegan"],
-        "Tomato Juice": ["vegan"],
-        "Avocado Smoothie": ["contains dairy"]
-    },
-    "Healthy Options": {
-        "Quinoa Salad": ["vegan", "gluten-free"],
-        "Grilled Chicken Salad": ["gluten-free"],
-        "Vegan Buddha Bowl": ["vegan"],
-        "Greek Yogurt with Honey": ["contains dairy"],
-        "Vegetable Stir-Fry": ["vegan"],
-        "Fruit Smoothie": ["vegan"],
-        "Chia Seed Pudding": ["vegan"],
-        "Avocado Toast": ["vegan"],
-        "Spinach and Feta Salad": ["contains dairy"],
-        "Sweet Potato and Black Bean Bowl": ["vegan"],
-        "Hummus with Veggies": ["vegan"],
-        "Salmon Salad": ["gluten-free"],
-        "Roasted Chickpeas": ["vegan"],
-        "Cucumber and Tomato Salad": ["vegan"],
-        "Almond Butter Banana Toast": ["vegan"],
-        "Kale Salad": ["vegan"],
-        "Grilled Tofu Salad": ["vegan"],
-        "Berry Parfait": ["contains dairy"],
-        "Stuffed Bell Peppers": ["vegan"],
-        "Lentil Soup": ["vegan"]
-    },
-    "Specialty Items": {
-        "Lobster Mac and Cheese": ["contains dairy"],
-        "Duck Confit": ["contains gluten"],
-        "Truffle Risotto": ["contains dairy"],
-        "Beef Wellington": ["contains gluten"],
-        "Foie Gras": ["contains gluten"],
-        "Seafood Paella": ["contains gluten"],
-        "Rack of Lamb": ["contains gluten"],
-        "Spaghetti Carbonara": ["contains dairy", "contains gluten"],
-        "Chateaubriand": ["contains gluten"],
-        "Braised Short Ribs": ["contains gluten"],
-        "Crab Cakes": ["contains gluten"],
-        "Miso Glazed Salmon": ["gluten-free"],
-        "Stuffed Portobello Mushrooms": ["vegetarian"],
-        "Sushi Platter": ["contains gluten"],
-        "Osso Buco": ["contains gluten"],
-        "Beef Tenderloin": ["contains gluten"],
-        "Lobster Roll": ["contains gluten"],
-        "Duck Breast": ["contains gluten"],
-        "Caviar": ["gluten-free"],
-        "Truffle Oil Pasta": ["contains dairy"]
-    },
-    "Kids’ Menu": {
-        "Chicken Tenders": ["contains gluten"],
-        "Mac and Cheese": ["contains dairy"],
-        "Mini Burgers": ["contains gluten"],
-        "Pizza Bites": ["contains gluten"],
-        "Grilled Cheese Sandwich": ["contains dairy", "contains gluten"],
-        "Hot Dogs": ["contains gluten"],
-        "Fruit Kabobs": ["vegan"],
-        "Cheese Quesadilla": ["contains dairy", "contains gluten"],
-        "Chicken Nuggets": ["contains gluten"],
-        "Mini Pancakes": ["contains dairy", "contains gluten"],
-        "Spaghetti with Marinara Sauce": ["vegan"],
-        "Veggie Sticks with Hummus": ["vegan"],
-        "Mac and Cheese Bites": ["contains dairy", "contains gluten"],
-        "Peanut Butter and Jelly Sandwich": ["contains gluten"],
-        "Mini Corn Dogs": ["contains gluten"],
-        "Cheese Pizza": ["contains dairy", "contains gluten"],
-        "Fruit Smoothie": ["vegan"],
-        "Kids’ Burrito": ["contains gluten"],
-        "Chicken Wrap": ["contains gluten"],
-        "Mini Tacos": ["contains gluten"]
-    },
-    "Appetizer Platter": {
-        "Bruschetta": ["vegetarian", "contains gluten"],
-        "Stuffed Mushrooms": ["vegetarian"],
-        "Spring Rolls": ["vegan"],
-        "Hummus with Pita": ["vegan"],
-        "Falafel": ["vegan"],
-        "Caprese Skewers": ["vegetarian"],
-        "Cheese Platter": ["contains dairy"],
-        "Vegetable Samosas": ["vegan"],
-        "Olive Tapenade": ["vegan"],
-        "Antipasto Platter": ["vegetarian"],
-        "Buffalo Cauliflower Bites": ["vegan"],
-        "Mini Quiches": ["contains dairy"],
-        "Garlic Knots": ["contains gluten"],
-        "Cheese and Crackers": ["contains dairy"],
-        "Stuffed Jalapenos": ["vegetarian"],
-        "Cucumber Sandwiches": ["vegetarian"],
-        "Chicken Satay": ["contains gluten"],
-        "Bruschetta with Tomato": ["vegetarian", "contains gluten"],
-        "Vegetable Spring Rolls": ["vegan"],
-        "Mini Tacos": ["contains gluten"],
-        "Cheese Fondue": ["contains dairy"]
-    },
-    "Breads & Pastries": {
-        "Croissants": ["contains dairy", "contains gluten"],
-        "Bagels": ["contains gluten"],
-        "Muffins": ["contains dairy", "contains gluten"],
-        "Scones": ["contains dairy", "contains gluten"],
-        "Baguette": ["contains gluten"],
-        "Danish Pastries": ["contains dairy", "contains gluten"],
-        "Ciabatta Bread": ["contains gluten"],
-        "Focaccia": ["contains gluten"],
-        "Brioche": ["contains dairy", "contains gluten"],
-        "English Muffins": ["contains gluten"],
-        "Pita Bread": ["contains gluten"],
-        "Pain au Chocolat": ["contains dairy", "contains gluten"],
-        "Whole Wheat Bread": ["contains gluten"],
-        "Brioche Buns": ["contains dairy", "contains gluten"],
-        "Flatbread": ["contains gluten"],
-        "Rosemary Olive Oil Bread": ["contains gluten"],
-        "Cinnamon Rolls": ["contains dairy", "contains gluten"],
-        "Apple Cinnamon Muffins": ["contains dairy", "contains gluten"],
-        "Pumpkin Bread": ["contains dairy", "contains gluten"],
-        "Chocolate Croissants": ["contains dairy", "contains gluten"],
-        "Almond Croissants": ["contains dairy", "contains gluten"]
-    },
-    "Beverages": {
-        "Coffee": ["vegan"],
-        "Tea": ["vegan"],
-        "Iced Coffee": ["vegan"],
-        "Hot Chocolate": ["contains dairy"],
-        "Lemonade": ["vegan"],
-        "Milkshakes": ["contains dairy"],
-        "Smoothies": ["vegan"],
-        "Soft Drinks": ["vegan"],
-        "Sparkling Water": ["vegan"],
-        "Fruit Juices": ["vegan"],
-        "Herbal Tea": ["vegan"],
-        "Iced Tea": ["vegan"],
-        "Hot Cider": ["contains dairy"],
-        "Matcha Latte": ["contains dairy"],
-        "Golden Milk": ["contains dairy"],
-        "Protein Shake": ["contains dairy"],
-        "Kombucha": ["vegan"],
-        "Coconut Water": ["vegan"],
-        "Milk Alternatives": ["vegan"],
-        "Cocktails": ["varies"],
-        "Mocktails": ["vegan"]
-    }
-}
-    
-
-    order_status = [
-        "Order Received", "Preparing Your Order", "Cooking In Progress", "Order Packed", "Out for Delivery", "Delivered"
-    ]
-
-    def process_order():
-        st.write("Processing your order...")
-        for i in range(len(order_status)):
-            st.write(f"Status: {order_status[i]}")
-            time.sleep(2)
-            if i == len(order_status) - 1:
-                st.success("Your order has been delivered!")
-            else:
-                st.info(f"Next step: {order_status[i + 1]}")
-
-    if menu_option == "View Menu":
-        category = st.selectbox("Select a Category", list(menu_items.keys()))
-        search_query = st.text_input("Search Menu Items")
-        
-        if category:
-            st.write(f"Here are the items in the {category} category:")
-
-            for item, tags in menu_items[category].items():
-                if (selected_restriction == "None" or selected_restriction.lower() in tags) and search_query.lower() in item.lower():
-                    st.write(f"- {item} ({', '.join(tags)})")
-                    if st.button(f"Add {item} to Cart", key=item):
-                        st.session_state.cart.append(item)
-                        st.success(f"{item} added to cart!")
-                    if st.button(f"Add {item} to Favorites", key=item + "_fav"):
-                        st.session_state.favorites.append(item)
-                        st.success(f"{item} added to favorites!")
-
-    elif menu_option == "View Cart":
-        st.write("Your Cart:")
-        if st.session_state.cart:
-            for item in st.session_state.cart:
-                st.write(f"- {item}")
-            estimated_delivery = get_estimated_delivery_time()
-            st.write(f"Estimated Delivery Time: {estimated_delivery}")
-            if st.button("Place Order"):
-                st.session_state.order_placed = True
-                st.session_state.cart = []  # Clear cart after placing order
-                st.success("Your order has been placed!")
-        else:
-            st.write("Your cart is empty.")
-
-    elif menu_option == "Track Order":
-        if st.session_state.order_placed:
-            st.write("Tracking your order...")
-            for status in order_status:
-                st.write(f"Status: {status}")
-                time.sleep(2)
-        else:
-            st.write("No orders placed yet.")
-
-    elif menu_option == "Favorites":
-        st.write("Your Favorites:")
-        if st.session_state.favorites:
-            for item in st.session_state.favorites:
-                st.write(f"- {item}")
-        else:
-            st.write("No favorite items yet.")
-
-    elif menu_option == "Feedback":
-        st.write("Submit Feedback")
-        feedback_text = st.text_area("Your Feedback")
-        if st.button("Submit Feedback"):
-            if st.session_state.authenticated:
-                username = st.session_state.username  # Use the logged-in username
-                conn = sqlite3.connect('feedback.db')
-                c = conn.cursor()
-                c.execute('''CREATE TABLE IF NOT EXISTS feedback
-                             (username TEXT, feedback TEXT)''')
-                c.execute('INSERT INTO feedback (username, feedback) VALUES (?, ?)',
-                          (username, feedback_text))
-                conn.commit()
-                conn.close()
-                st.success("Thank you for your feedback!")
-            else:
-                st.error("You need to log in to submit feedback.")
-
-elif st.session_state.page == "AdminDashboard":
-    if not st.session_state.authenticated or not st.session_state.admin:
-        st.session_state.page = "Login"
-    
-    st.header("Admin Dashboard")
-    
-    # Display feedback from users
-    conn = sqlite3.connect('feedback.db')
-    c = conn.cursor()
-    c.execute('SELECT username, feedback FROM feedback')
-    feedback = c.fetchall()
-    conn.close()
-    
-    st.subheader("User Feedback")
-    if feedback:
-        for user_feedback in feedback:
-            st.write(f"User: {user_feedback[0]}")
-            st.write(f"Feedback: {user_feedback[1]}")
-            st.write("---")
-    else:
-        st.write("No feedback yet.")
-    
-    # Display all users
-    conn = sqlite3.connect('users.db')
-    c = conn.cursor()
-    c.execute('SELECT username FROM users WHERE role = ?', ('user',))
-    users = c.fetchall()
-    conn.close()
-    
-    st.subheader("Registered Users")
-    if users:
-        for user in users:
-            st.write(f"User: {user[0]}")
-            st.write("---")
-    else:
-        st.write("No registered users.")
-
-    # Display user orders
-    st.subheader("User Orders")
-    # Simulated orders, replace with actual order data
-    st.write("This section will display order history for users.")
-
-if st.session_state.authenticated:
-    if st.button("Logout"):
-        st.session_state.authenticated = False
-        st.session_state.page = "Login"
-        st.session_state.cart = []
-        st.session_state.order_placed = False
-        st.session_state.favorites = []
-        st.session_state.admin = False
-        st.session_state.username = None
+import pandas as pd
+import streamlit as st
+from streamlit.runtime.context import _get_request
+from auth import LoginThrottled, authenticate_user, client_address, get_usernames, login_counters, register_user
+from carts import get_cart_store
+from chat import describe, get_parser
+from catalog import DIETARY_RESTRICTIONS
+from favorites import add_favorites, favorite_rows, get_favorites, only_favorites, remove_favorite
+from feedback import list_feedback, submit_feedback
+from menu_store import get_menu_store
+from metrics import counters, ensure_metrics_server, histograms, prometheus_text, reset as reset_metrics, span, timed
+from migrations import ensure_schema
+from orders import DELIVERED, ORDER_STATUS, get_tracker, list_orders
+from recommendations import get_recommender
+from storage import get_storage
+from translations import LANGUAGES, get_translator
+
+# Mock function to get delivery time
+def get_estimated_delivery_time():
+    return "Your order will be delivered in approximately 30-45 minutes."
+
+# Show where an order is; the background tracker does the advancing
+def show_order_status(order_id):
+    stage = get_tracker().status(order_id)
+    st.progress((stage + 1) / len(ORDER_STATUS), text=f"Status: {ORDER_STATUS[stage]}")
+    if stage == DELIVERED:
+        st.success("Your order has been delivered!")
+    else:
+        st.info(f"Next step: {ORDER_STATUS[stage + 1]}")
+
+# Re-render just the tracking widget every couple of seconds instead of blocking the script
+@st.fragment(run_every=2)
+def poll_order_status(order_id):
+    show_order_status(order_id)
+
+# Key for per-client login limits: the address a trusted proxy reported (see
+# auth.TRUSTED_PROXY_HOPS), else the address of the browser's connection. This
+# Streamlit's st.context only has headers, so the address comes from the same
+# websocket request st.context reads them from; None where there is none (AppTest).
+def client_id():
+    peer = getattr(_get_request(), "remote_ip", None)
+    return client_address(st.context.headers.get("X-Forwarded-For", ""), peer)
+
+# Menu rows shown per page of the View Menu table
+MENU_PAGE_SIZE = 25
+# Dishes listed in a chat answer, and chat messages kept in the session
+CHAT_RESULTS = 10
+CHAT_HISTORY = 40
+
+# Answer a menu chat message: how it was read, then the best matching dishes.
+# `restrictions` are the sidebar's, applied on top of the message's own.
+@timed("chat.reply")
+def chat_reply(menu_store, catalog, index, message, restrictions, localize):
+    query = get_parser(catalog).parse(message)
+    understood = describe(query)
+    if not understood:
+        return ("Tell me what you feel like: a diet (vegan, gluten-free, high-protein...), a course "
+                "(soup, dessert, drinks...) or a dish name, and what to leave out (\"no nuts\", \"without soup\").")
+    if restrictions:
+        understood += f" (and your filter: {', '.join(restrictions)})"
+    rows = menu_store.chat_view(catalog, index, query, restrictions)
+    if not len(rows):
+        return f"Nothing on the menu fits: {understood}."
+    lines = [f"Here is what fits: {understood}."]
+    lines += [f"- {localize(catalog.names[row])} ({', '.join(map(localize, catalog.tags[row]))})"
+              for row in rows[:CHAT_RESULTS]]
+    if len(rows) > CHAT_RESULTS:
+        lines.append(f"...and {len(rows) - CHAT_RESULTS} more.")
+    return "\n".join(lines)
+
+
+# Batch-add the rows ticked in the menu table, then give the table a fresh key to clear the ticks
+def add_selected_items(editor_key, item_ids):
+    added_to_cart = 0
+    new_favorites = []
+    carts = get_cart_store()
+    for row, changes in st.session_state[editor_key]["edited_rows"].items():
+        if changes.get("Cart"):
+            carts.add(st.session_state.username, item_ids[int(row)])
+            added_to_cart += 1
+        if changes.get("Favorite"):
+            new_favorites.append(item_ids[int(row)])
+    if new_favorites:
+        add_favorites(st.session_state.username, new_favorites)
+        st.session_state.favorites = None
+    added_to_favorites = len(new_favorites)
+    st.session_state.menu_editor_version += 1
+    st.session_state.menu_added = (added_to_cart, added_to_favorites)
+
+# The user's favorite item ids, read once and cached in the session until they change
+def favorite_ids():
+    if st.session_state.favorites is None:
+        st.session_state.favorites = get_favorites(st.session_state.username)
+    return st.session_state.favorites
+
+def unfavorite(item_id):
+    remove_favorite(st.session_state.username, item_id)
+    st.session_state.favorites = None
+
+# Count the restrictions a session newly starts filtering by, for the dashboard's popularity chart
+def count_restriction_picks(restrictions):
+    picked = set(restrictions) - st.session_state.restrictions
+    if picked:
+        get_storage().count_restriction_picks(sorted(picked))
+    st.session_state.restrictions = set(restrictions)
+
+# Seconds the dashboard summary is reused before it is read again
+SUMMARY_TTL = 60
+
+# Dashboard figures from the summary tables. Cached for every admin session;
+# a write on this node changes `version`, so the next rerun reads fresh figures,
+# and writes on other nodes show up within SUMMARY_TTL.
+@st.cache_data(ttl=SUMMARY_TTL, show_spinner=False)
+def dashboard_summary(version):
+    return get_storage().dashboard_summary()
+
+# Keyset paging for admin tables: a stack of page-start cursors per table,
+# reset to the first page whenever the table's filter changes
+def current_page_cursor(table, filter_value):
+    if st.session_state.get(f"{table}_filter") != filter_value:
+        st.session_state[f"{table}_filter"] = filter_value
+        st.session_state[f"{table}_cursors"] = [None]
+    return st.session_state[f"{table}_cursors"][-1]
+
+def next_page(table, cursor):
+    st.session_state[f"{table}_cursors"].append(cursor)
+
+def previous_page(table):
+    st.session_state[f"{table}_cursors"].pop()
+
+def page_buttons(table, next_cursor):
+    newer_col, older_col = st.columns(2)
+    newer_col.button(f"Newer {table}", on_click=previous_page, args=(table,),
+                     disabled=len(st.session_state[f"{table}_cursors"]) == 1)
+    older_col.button(f"Older {table}", on_click=next_page, args=(table, next_cursor),
+                     disabled=next_cursor is None)
+
+# Streamlit App
+st.title("Food Ordering System")
+
+# Initialize session state for authentication and pages; carts live in the cart store
+if "authenticated" not in st.session_state:
+    st.session_state.authenticated = False
+if "admin" not in st.session_state:
+    st.session_state.admin = False
+if "page" not in st.session_state:
+    st.session_state.page = "Login"
+if "favorites" not in st.session_state:
+    st.session_state.favorites = None  # Cached set of favorite item ids; None until read
+if "menu_editor_version" not in st.session_state:
+    st.session_state.menu_editor_version = 0
+if "menu_version" not in st.session_state:
+    st.session_state.menu_version = None  # Catalog version the menu table was last built from
+if "restrictions" not in st.session_state:
+    st.session_state.restrictions = set()  # Restrictions already counted for this session
+if "chat" not in st.session_state:
+    st.session_state.chat = []  # (role, text) messages of the menu chat
+if "order_id" not in st.session_state:
+    st.session_state.order_id = None  # Most recent order placed in this session
+if "username" not in st.session_state:
+    st.session_state.username = None  # Store the username of the logged-in user
+
+# Create or upgrade the databases once per process; a no-op on reruns
+ensure_schema()
+# Serve /metrics for Prometheus when METRICS_PORT is set; also once per process
+ensure_metrics_server()
+
+# Admins switch between the dashboard and the performance figures from the sidebar
+if st.session_state.page in ("AdminDashboard", "Performance"):
+    admin_view = st.sidebar.radio("Admin view", ["Dashboard", "Performance"])
+    st.session_state.page = "Performance" if admin_view == "Performance" else "AdminDashboard"
+
+# Time this rerun of whichever page runs, until the end of the script
+page_span = span(f"page.{st.session_state.page}")
+
+# Page navigation
+if st.session_state.page == "Login":
+    st.header("Login")
+    username = st.text_input("Username")
+    password = st.text_input("Password", type="password")
+    
+    if st.button("Login"):
+        try:
+            role = authenticate_user(username, password, client_id())
+        except LoginThrottled:
+            st.error("Too many login attempts. Please wait a little and try again.")
+        else:
+            if role:
+                if role == 'admin':
+                    st.session_state.admin = True
+                st.session_state.authenticated = True
+                st.session_state.username = username  # Store the username
+                if role == 'user':
+                    get_cart_store().get(username)  # Restore the saved cart
+                st.session_state.page = "Ordering" if role == 'user' else "AdminDashboard"
+            else:
+                st.error("Invalid username or password")
+
+    if st.button("Go to Register"):
+        st.session_state.page = "Register"
+
+elif st.session_state.page == "Register":
+    st.header("Register")
+    new_username = st.text_input("New Username")
+    new_password = st.text_input("New Password", type="password")
+    if st.button("Register"):
+        if register_user(new_username, new_password):
+            st.success("Registration successful! Please log in.")
+        else:
+            st.error("Username already exists.")
+        st.session_state.page = "Login"
+
+elif st.session_state.page == "Ordering":
+    if not st.session_state.authenticated:
+        st.session_state.page = "Login"
+        
+    st.header("Ordering Page")
+    
+    menu_store = get_menu_store()
+    catalog, search_index = menu_store.snapshot()
+
+    # Sidebar menu to choose between options
+    menu_option = st.sidebar.selectbox(
+        "Choose an option",
+        ["View Menu", "Chat", "View Cart", "Track Order", "Favorites", "Feedback"]
+    )
+    page_span.name = f"page.Ordering.{menu_option}"  # Time each option on its own
+
+    # Menu names, categories and tags in the chosen language; each language is
+    # translated once per process, so switching costs a dict lookup afterwards
+    language = st.sidebar.selectbox("Language", list(LANGUAGES))
+    labels = get_translator().table(catalog, LANGUAGES[language])
+
+    def localize(text):
+        return labels.get(text, text)
+
+    # Allow user to set dietary restrictions (items must match all of them)
+    selected_restrictions = st.sidebar.multiselect("Select Dietary Restrictions", DIETARY_RESTRICTIONS,
+                                                   format_func=localize)
+    count_restriction_picks(selected_restrictions)
+
+    if menu_option == "View Menu":
+        # Rows ticked under an older menu version may have moved: start the table afresh
+        if st.session_state.menu_version != catalog.version:
+            if st.session_state.menu_version is not None:
+                st.info("The menu has been updated.")
+            st.session_state.menu_version = catalog.version
+            st.session_state.menu_editor_version += 1
+        category = st.selectbox("Select a Category", catalog.category_names(), format_func=localize)
+        search_query = st.text_input("Search Menu Items")
+        favorites_only = st.checkbox("Favorites only")
+        
+        # A search looks across every category, as do favorites; otherwise list the chosen category
+        rows = None
+        if search_query.strip():
+            st.write(f"Best matches for '{search_query}' across the menu:")
+            rows = menu_store.view(catalog, search_index, restrictions=selected_restrictions, query=search_query)
+            if favorites_only:
+                rows = only_favorites(catalog, rows, favorite_ids())
+        elif favorites_only:
+            st.write("Your favorite items across the menu:")
+            rows = catalog.restrict(favorite_rows(catalog, favorite_ids()), selected_restrictions)
+        elif category:
+            st.write(f"Here are the items in the {localize(category)} category:")
+            rows = menu_store.view(catalog, search_index, category, selected_restrictions)
+
+        if rows is not None:
+            # One table widget per page instead of two buttons per item
+            pages = max(1, -(-len(rows) // MENU_PAGE_SIZE))
+            page = st.number_input("Page", min_value=1, max_value=pages) if pages > 1 else 1
+            matches = [(catalog.ids[row], catalog.names[row], catalog.tags[row], catalog.row_categories[row])
+                       for row in rows[(page - 1) * MENU_PAGE_SIZE:page * MENU_PAGE_SIZE]]
+            if matches:
+                editor_key = f"menu_editor_{st.session_state.menu_editor_version}"
+                st.data_editor(
+                    pd.DataFrame({
+                        "Cart": False,
+                        "Favorite": False,
+                        "Item": [localize(item) for _, item, _, _ in matches],
+                        "Category": [", ".join(map(localize, categories)) for _, _, _, categories in matches],
+                        "Tags": [", ".join(map(localize, tags)) for _, _, tags, _ in matches],
+                    }),
+                    column_config={
+                        "Cart": st.column_config.CheckboxColumn("Add to cart"),
+                        "Favorite": st.column_config.CheckboxColumn("Add to favorites"),
+                    },
+                    disabled=["Item", "Category", "Tags"], hide_index=True, key=editor_key,
+                )
+                st.button("Add selected", on_click=add_selected_items,
+                          args=(editor_key, [int(item_id) for item_id, _, _, _ in matches]))
+                if "menu_added" in st.session_state:
+                    added_to_cart, added_to_favorites = st.session_state.pop("menu_added")
+                    st.success(f"Added {added_to_cart} item(s) to your cart and {added_to_favorites} to favorites!")
+            else:
+                st.write("No items match your filters.")
+
+    elif menu_option == "Chat":
+        for role, text in st.session_state.chat:
+            st.chat_message(role).markdown(text)
+        message = st.chat_input("Ask for dishes, e.g. something vegan and high-protein, no soup")
+        if message:
+            reply = chat_reply(menu_store, catalog, search_index, message, selected_restrictions, localize)
+            st.chat_message("user").markdown(message)
+            st.chat_message("assistant").markdown(reply)
+            st.session_state.chat += [("user", message), ("assistant", reply)]
+            del st.session_state.chat[:-CHAT_HISTORY]
+
+    elif menu_option == "View Cart":
+        st.write("Your Cart:")
+        carts = get_cart_store()
+        cart = carts.get(st.session_state.username)
+        if cart:
+            items = {}
+            for item_id, quantity in cart.items():
+                row = catalog.rows_by_id.get(item_id)
+                if row is None:
+                    carts.set_quantity(st.session_state.username, item_id, 0)
+                    st.warning("An item in your cart is no longer on the menu and was removed.")
+                else:
+                    items[catalog.names[row]] = quantity
+                    st.write(f"- {localize(catalog.names[row])} × {quantity}")
+            # Dishes often ordered or favorited together with the cart's, from precomputed lists
+            suggestions = get_recommender().goes_with(catalog, list(cart), selected_restrictions)
+            if len(suggestions):
+                st.write("Goes well with your cart:")
+                for row in suggestions:
+                    item_id = int(catalog.ids[row])
+                    name_col, add_col = st.columns([4, 1])
+                    name_col.write(f"- {localize(catalog.names[row])}")
+                    add_col.button("Add", key=f"suggestion_{item_id}", on_click=carts.add,
+                                   args=(st.session_state.username, item_id))
+            estimated_delivery = get_estimated_delivery_time()
+            st.write(f"Estimated Delivery Time: {estimated_delivery}")
+            if items and st.button("Place Order"):
+                st.session_state.order_id = get_tracker().place(st.session_state.username, items)
+                carts.clear(st.session_state.username)  # Clear cart after placing order
+                st.success("Your order has been placed!")
+        else:
+            st.write("Your cart is empty.")
+
+    elif menu_option == "Track Order":
+        if st.session_state.order_id is not None:
+            st.write("Tracking your order...")
+            if get_tracker().status(st.session_state.order_id) == DELIVERED:
+                show_order_status(st.session_state.order_id)
+            else:
+                poll_order_status(st.session_state.order_id)
+        else:
+            st.write("No orders placed yet.")
+
+    elif menu_option == "Favorites":
+        st.write("Your Favorites:")
+        rows = favorite_rows(catalog, favorite_ids())
+        if len(rows):
+            for row in rows:
+                st.write(f"- {localize(catalog.names[row])}")
+            names = {catalog.names[row]: int(catalog.ids[row]) for row in rows}
+            to_remove = st.multiselect("Remove from favorites", list(names), format_func=localize)
+            if st.button("Remove", disabled=not to_remove):
+                for name in to_remove:
+                    unfavorite(names[name])
+                st.rerun()
+        else:
+            st.write("No favorite items yet.")
+
+    elif menu_option == "Feedback":
+        st.write("Submit Feedback")
+        feedback_text = st.text_area("Your Feedback")
+        if st.button("Submit Feedback"):
+            if st.session_state.authenticated:
+                username = st.session_state.username  # Use the logged-in username
+                submit_feedback(username, feedback_text)
+                st.success("Thank you for your feedback!")
+            else:
+                st.error("You need to log in to submit feedback.")
+
+elif st.session_state.page == "AdminDashboard":
+    if not st.session_state.authenticated or not st.session_state.admin:
+        st.session_state.page = "Login"
+    
+    st.header("Admin Dashboard")
+
+    # Summary figures, served from the cache; the button drops it for every admin
+    summary_col, refresh_col = st.columns([4, 1])
+    summary_col.subheader("Summary")
+    if refresh_col.button("Refresh"):
+        dashboard_summary.clear()
+    summary = dashboard_summary(get_storage().summary_version)
+    users_col, admins_col = st.columns(2)
+    users_col.metric("Registered users", summary["users"].get("user", 0))
+    admins_col.metric("Admins", summary["users"].get("admin", 0))
+    st.write("Feedback per day (last 30 days)")
+    if summary["feedback_per_day"]:
+        feedback_days = pd.DataFrame(summary["feedback_per_day"], columns=["Day", "Feedback"])
+        feedback_days["Day"] = pd.to_datetime(feedback_days["Day"] * 86400, unit="s")
+        st.bar_chart(feedback_days, x="Day", y="Feedback")
+    else:
+        st.write("No feedback in the last 30 days.")
+    items_col, restrictions_col = st.columns(2)
+    items_col.write("Most ordered items")
+    items_col.dataframe(pd.DataFrame(summary["top_items"], columns=["Item", "Units"]), hide_index=True)
+    restrictions_col.write("Dietary restriction popularity")
+    restrictions_col.dataframe(pd.DataFrame(summary["restrictions"], columns=["Restriction", "Sessions"]),
+                               hide_index=True)
+
+    # Display feedback from users, one page at a time
+    st.subheader("User Feedback")
+    feedback_query = st.text_input("Search feedback")
+    feedback, next_cursor = list_feedback(current_page_cursor("feedback", feedback_query), query=feedback_query)
+    if feedback:
+        feedback = pd.DataFrame(feedback, columns=["ID", "User", "Feedback", "Submitted"])
+        feedback["Submitted"] = pd.to_datetime(feedback["Submitted"], unit="s")
+        st.dataframe(feedback, hide_index=True)
+    else:
+        st.write("No matching feedback." if feedback_query else "No feedback yet.")
+    page_buttons("feedback", next_cursor)
+    
+    # Login attempts since the server started, including those refused by the limiter
+    st.subheader("Login Attempts")
+    logins = login_counters()
+    for column, (label, keys) in zip(st.columns(4), [
+            ("Accepted", ["accepted"]),
+            ("Wrong password", ["rejected"]),
+            ("Unknown user", ["unknown_user", "unknown_user_cached"]),
+            ("Throttled", ["throttled_user", "throttled_client"])]):
+        column.metric(label, sum(logins.get(key, 0) for key in keys))
+
+    # Filtered menu views served from the shared cache since the server started
+    st.subheader("Menu View Cache")
+    views = get_menu_store().views
+    lookups = views.hits + views.misses
+    for column, (label, value) in zip(st.columns(4), [
+            ("Hits", views.hits),
+            ("Misses", views.misses),
+            ("Hit rate", f"{views.hits / lookups:.0%}" if lookups else "-"),
+            ("Cached views", len(views))]):
+        column.metric(label, value)
+
+    # Display registered users, one page at a time
+    st.subheader("Registered Users")
+    users, next_cursor = get_usernames('user', current_page_cursor("users", 'user'))
+    if users:
+        st.dataframe(pd.DataFrame({"User": users}), hide_index=True)
+    else:
+        st.write("No registered users.")
+    page_buttons("users", next_cursor)
+
+    # Display user orders, one page at a time
+    st.subheader("User Orders")
+    orders_filter = st.text_input("Filter orders by username")
+    orders, next_cursor = list_orders(orders_filter, current_page_cursor("orders", orders_filter))
+    if orders:
+        st.dataframe(pd.DataFrame({
+            "Order": [order["id"] for order in orders],
+            "User": [order["username"] for order in orders],
+            "Placed": pd.to_datetime([order["created_at"] for order in orders], unit="s"),
+            "Status": [order["status"] for order in orders],
+            "Items": [", ".join(f"{quantity} x {item}" for item, quantity in order["items"].items())
+                      for order in orders],
+        }), hide_index=True)
+    else:
+        st.write("No orders yet.")
+    page_buttons("orders", next_cursor)
+
+elif st.session_state.page == "Performance":
+    if not st.session_state.authenticated or not st.session_state.admin:
+        st.session_state.page = "Login"
+
+    st.header("Performance")
+
+    # Wall time of page reruns and helpers on this server since it started (or was reset)
+    timings = histograms()
+    if timings:
+        st.dataframe(pd.DataFrame({
+            "Span": list(timings),
+            "Count": [hist.count for hist in timings.values()],
+            "Mean (ms)": [hist.sum / max(hist.count, 1) * 1e3 for hist in timings.values()],
+            "p50 (ms)": [(hist.quantile(0.5) or 0) * 1e3 for hist in timings.values()],
+            "p95 (ms)": [(hist.quantile(0.95) or 0) * 1e3 for hist in timings.values()],
+            "p99 (ms)": [(hist.quantile(0.99) or 0) * 1e3 for hist in timings.values()],
+            "Max (ms)": [hist.max * 1e3 for hist in timings.values()],
+        }), hide_index=True)
+    else:
+        st.write("Nothing recorded yet.")
+    # Running totals since the same start, e.g. database statements sent
+    for name, total in counters().items():
+        st.write(f"{name}: {total:,}")
+    export_col, reset_col = st.columns(2)
+    export_col.download_button("Download Prometheus metrics", prometheus_text(),
+                               file_name="metrics.prom", mime="text/plain")
+    reset_col.button("Reset timings", on_click=reset_metrics)
+
+if st.session_state.authenticated:
+    if st.button("Logout"):
+        get_cart_store().release(st.session_state.username)  # Saved, and restored at the next login
+        st.session_state.authenticated = False
+        st.session_state.page = "Login"
+        st.session_state.order_id = None
+        st.session_state.favorites = None
+        st.session_state.admin = False
+        st.session_state.username = None
+
+# Reruns cut short by st.rerun() go unrecorded
+page_span.stop()
@@ -0,0 +1,115 @@
+import os
+import threading
+from collections import Counter
+
+from cache import LRUCache
+from metrics import timed
+from passwords import hash_password, offload, verify_password
+from ratelimit import TokenBucketLimiter
+from storage import get_storage
+
+# Login attempts allowed per username: a burst of 5, then one every 10 seconds
+USER_LIMITER = TokenBucketLimiter(rate=0.1, burst=5)
+# Login attempts allowed per client: a burst of 20, then one a second
+CLIENT_LIMITER = TokenBucketLimiter(rate=1.0, burst=20)
+# Login attempts allowed from all clients whose address is unknown, together
+UNKNOWN_CLIENT_LIMITER = TokenBucketLimiter(rate=10.0, burst=100)
+# Reverse proxies in front of the app that append the address they received to
+# X-Forwarded-For. 0 (the default) ignores the header, since anyone can send
+# one, and keys clients on the address of their connection instead. Behind a
+# proxy that address is the proxy's, shared by every client, so set this to
+# the number of proxies.
+TRUSTED_PROXY_HOPS = int(os.environ.get('TRUSTED_PROXY_HOPS', '0'))
+# Usernames found not to exist, answered without touching the database for a minute
+MISSING_USERS = LRUCache(10_000, ttl=60)
+
+_counters = Counter()
+_counters_lock = threading.Lock()
+
+
+# Raised by authenticate_user when the username or the client is over its attempt limit
+class LoginThrottled(Exception):
+    pass
+
+
+def _count(outcome):
+    with _counters_lock:
+        _counters[outcome] += 1
+
+
+# Login attempts so far by outcome: accepted, rejected, unknown_user,
+# unknown_user_cached, throttled_client, throttled_user
+def login_counters():
+    with _counters_lock:
+        return dict(_counters)
+
+
+# Client address for the per-client login limit: from an X-Forwarded-For
+# value, the entry the outermost of `hops` trusted proxies appended, counting
+# from the right, since everything to its left came from the client. With no
+# proxy trusted, or a header shorter than the proxy chain, the connection's own
+# `peer` address (None if unknown).
+def client_address(forwarded_for, peer=None, hops=None):
+    hops = TRUSTED_PROXY_HOPS if hops is None else hops
+    entries = [entry.strip() for entry in forwarded_for.split(",") if entry.strip()]
+    if not hops or len(entries) < hops:
+        return peer
+    return entries[-hops]
+
+
+# Function to check user credentials; returns the user's role, or None if they don't match.
+# Attempts over the per-client or per-username limit raise LoginThrottled, and
+# known-missing usernames are refused, both before any database or hashing work.
+# Clients without a known address (client None) share one bucket.
+# Hashes are checked on the hash pool; an outdated one is replaced after a successful login.
+@timed("auth.authenticate_user")
+def authenticate_user(username, password, client=None):
+    if not (CLIENT_LIMITER.allow(client) if client is not None else UNKNOWN_CLIENT_LIMITER.allow(None)):
+        _count('throttled_client')
+        raise LoginThrottled(client)
+    if not USER_LIMITER.allow(username):
+        _count('throttled_user')
+        raise LoginThrottled(username)
+    if MISSING_USERS.get(username):
+        _count('unknown_user_cached')
+        return None
+    row = get_storage().find_user(username)
+    if row is None:
+        MISSING_USERS.put(username, True)
+        _count('unknown_user')
+        return None
+    stored, role = row
+    matches, needs_upgrade = offload(verify_password, password, stored)
+    if not matches:
+        _count('rejected')
+        return None
+    if needs_upgrade:
+        upgraded = offload(hash_password, password)
+        # Only if no other login upgraded it meanwhile
+        get_storage().replace_password(username, stored, upgraded)
+    _count('accepted')
+    return role
+
+# Function to get user role
+def get_user_role(username):
+    row = get_storage().find_user(username)
+    return row[1] if row else None
+
+# Function to register a new user; returns False if the username is taken
+@timed("auth.register_user")
+def register_user(username, password):
+    hashed = offload(hash_password, password)
+    if not get_storage().add_user(username, hashed, 'user'):
+        return False
+    MISSING_USERS.discard(username)
+    return True
+
+# One page of the usernames with a given role, in name order (for the dashboard,
+# on a read-only connection). Returns (usernames, next_cursor); next_cursor is
+# None on the last page.
+@timed("auth.get_usernames")
+def get_usernames(role, cursor=None, limit=50):
+    names = get_storage().usernames(role, cursor, limit + 1)
+    more = len(names) > limit
+    names = names[:limit]
+    return names, names[-1] if more else None
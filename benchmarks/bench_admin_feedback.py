@@ -0,0 +1,72 @@
+# Benchmark: admin feedback section render time at 100k feedback rows, old
+# fetchall() + three st.write calls per row versus one keyset page rendered as
+# a single st.dataframe, plus an FTS5 search page. Scripts run headless through
+# Streamlit's AppTest.
+#
+#     python benchmarks/bench_admin_feedback.py [rows]
+import os
+import random
+import sys
+import tempfile
+import time
+
+from streamlit.testing.v1 import AppTest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from db import APP_DB, get_pool
+from migrations import ensure_schema
+
+WORDS = "soup pizza cold hot great slow fast salad vegan delivery tasty bland fresh late order menu".split()
+
+
+def old_dashboard():
+    import sqlite3
+    import streamlit as st
+    conn = sqlite3.connect('app.db')
+    feedback = conn.execute('SELECT username, feedback FROM feedback').fetchall()
+    conn.close()
+    for user_feedback in feedback:
+        st.write(f"User: {user_feedback[0]}")
+        st.write(f"Feedback: {user_feedback[1]}")
+        st.write("---")
+
+
+def new_dashboard(root, query):
+    import sys
+    sys.path.insert(0, root)
+    import pandas as pd
+    import streamlit as st
+    from feedback import list_feedback
+    rows, _ = list_feedback(query=query)
+    feedback = pd.DataFrame(rows, columns=["ID", "User", "Feedback", "Submitted"])
+    feedback["Submitted"] = pd.to_datetime(feedback["Submitted"], unit="s")
+    st.dataframe(feedback, hide_index=True)
+
+
+def timed(app):
+    start = time.perf_counter()
+    app.run(timeout=600)
+    assert not app.exception, app.exception
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    os.chdir(tempfile.mkdtemp())
+    ensure_schema()
+    rng = random.Random(0)
+    now = time.time()
+    with get_pool(APP_DB).connection() as conn:
+        conn.executemany('INSERT INTO feedback (username, feedback, created_at) VALUES (?, ?, ?)',
+                         [(f"user{i % 5000}", " ".join(rng.choices(WORDS, k=12)), now - i) for i in range(rows)])
+
+    timed(AppTest.from_function(new_dashboard, args=(ROOT, None)))  # warm-up: imports
+    new = timed(AppTest.from_function(new_dashboard, args=(ROOT, None)))
+    search = timed(AppTest.from_function(new_dashboard, args=(ROOT, "cold pizz")))
+    old = timed(AppTest.from_function(old_dashboard))
+    print(f"{rows} feedback rows")
+    print(f"fetchall + st.write per field : {old:8.3f}s")
+    print(f"one page as st.dataframe      : {new:8.3f}s")
+    print(f"FTS5 search page              : {search:8.3f}s")
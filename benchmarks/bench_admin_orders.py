@@ -0,0 +1,71 @@
+# Benchmark: admin "User Orders" page load at 10k and 1M orders. Compares the
+# keyset-paginated list_orders() with the equivalent LIMIT/OFFSET query for a
+# deep page, and times a per-user page and the DataFrame the page renders.
+#
+#     python benchmarks/bench_admin_orders.py [sizes...]
+import os
+import sys
+import tempfile
+import time
+import timeit
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db import APP_DB, close_pools, get_pool
+from gen_orders import generate_orders
+from migrations import MIGRATIONS, migrate
+from orders import list_orders
+
+PAGE = 20
+DEEP_PAGE = 500
+
+
+def best(fn, number=20):
+    return min(timeit.repeat(fn, number=number, repeat=3)) / number
+
+
+def offset_page(page):
+    with get_pool(APP_DB).connection() as conn:
+        return conn.execute('SELECT id, username, status, created_at FROM orders'
+                            ' ORDER BY created_at DESC, id DESC LIMIT ? OFFSET ?', (PAGE, page * PAGE)).fetchall()
+
+
+def render(orders):
+    return pd.DataFrame({
+        "Order": [order["id"] for order in orders],
+        "User": [order["username"] for order in orders],
+        "Placed": pd.to_datetime([order["created_at"] for order in orders], unit="s"),
+        "Status": [order["status"] for order in orders],
+        "Items": [", ".join(f"{q} x {i}" for i, q in order["items"].items()) for order in orders],
+    })
+
+
+def run(size):
+    os.chdir(tempfile.mkdtemp())
+    close_pools()
+    for path in MIGRATIONS:
+        migrate(path)
+    start = time.perf_counter()
+    generate_orders(size)
+    generated = time.perf_counter() - start
+
+    deep = min(DEEP_PAGE, size // PAGE - 1)
+    cursor = None
+    for _ in range(deep):
+        _, cursor = list_orders(cursor=cursor, limit=PAGE)
+    first = best(lambda: render(list_orders(limit=PAGE)[0]))
+    deep_keyset = best(lambda: list_orders(cursor=cursor, limit=PAGE))
+    deep_offset = best(lambda: offset_page(deep))
+    user = best(lambda: list_orders(username="user42", limit=PAGE))
+    print(f"{size:>9} orders (generated in {generated:.1f}s)")
+    print(f"    first page + DataFrame   : {first * 1e3:8.2f} ms")
+    print(f"    page {deep:<4} keyset         : {deep_keyset * 1e3:8.2f} ms")
+    print(f"    page {deep:<4} LIMIT/OFFSET   : {deep_offset * 1e3:8.2f} ms")
+    print(f"    one user's first page    : {user * 1e3:8.2f} ms")
+
+
+if __name__ == "__main__":
+    for size in [int(arg) for arg in sys.argv[1:]] or [10_000, 1_000_000]:
+        run(size)
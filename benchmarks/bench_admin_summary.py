@@ -0,0 +1,115 @@
+# Benchmark: admin dashboard cost as the tables grow, at 10k, 100k and 1M
+# users (feedback and orders at a tenth of that). Compares what the dashboard
+# used to read (every username, then one st.write pair per user) and what a
+# live summary would cost (GROUP BY over the base tables) with the summary
+# tables: one uncached read, and the whole admin page rerun through AppTest
+# with the st.cache_data entry cold and warm. Also reports the one-off
+# backfill when the summary migration runs on existing data, and what an
+# order costs now that it also bumps the item counters.
+#
+#     python benchmarks/bench_admin_summary.py [users]
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import timeit
+
+import streamlit as st
+from streamlit.testing.v1 import AppTest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from db import APP_DB, get_pool
+from gen_orders import generate_orders
+from migrations import MIGRATIONS, migrate
+from storage import get_storage
+
+CHUNK = 100_000
+LIVE_SUMMARY = [
+    'SELECT role, COUNT(*) FROM users GROUP BY role',
+    'SELECT CAST(created_at / 86400 AS INTEGER) AS day, COUNT(*) FROM feedback WHERE created_at > ? GROUP BY day',
+    'SELECT item, SUM(quantity) AS units FROM order_items GROUP BY item ORDER BY units DESC LIMIT 10',
+]
+
+
+def old_users_section(usernames):
+    import streamlit as st
+    for user in usernames:
+        st.write(f"User: {user}")
+        st.write("---")
+
+
+def best(fn, number=3):
+    return min(timeit.repeat(fn, number=number, repeat=3)) / number
+
+
+def load(users):
+    rng = random.Random(0)
+    now = time.time()
+    with get_pool(APP_DB).connection() as conn:
+        for start in range(0, users, CHUNK):
+            conn.executemany('INSERT INTO users (username, password, role) VALUES (?, ?, ?)',
+                             ((f"user{i}", "scrypt$-", 'user') for i in range(start, min(start + CHUNK, users))))
+        conn.executemany('INSERT INTO feedback (username, feedback, created_at) VALUES (?, ?, ?)',
+                         ((f"user{rng.randrange(users)}", "Nice soup", now - rng.random() * 60 * 86400)
+                          for _ in range(users // 10)))
+    generate_orders(users // 10, users=users)
+
+
+def run(users):
+    os.chdir(tempfile.mkdtemp())
+    migrate(APP_DB, MIGRATIONS[APP_DB][:-1])  # everything up to the summary tables
+    load(users)
+    start = time.perf_counter()
+    migrate(APP_DB)
+    backfill = time.perf_counter() - start
+
+    storage = get_storage()
+    with get_pool(APP_DB, readonly=True).connection() as conn:
+        old_query = best(lambda: conn.execute('SELECT username FROM users WHERE role = ?', ('user',)).fetchall(), 1)
+        live = best(lambda: [conn.execute(sql, (time.time() - 30 * 86400,) if '?' in sql else ()).fetchall()
+                             for sql in LIVE_SUMMARY], 1)
+    summary = best(storage.dashboard_summary, 20)
+    order = best(lambda: storage.add_order("user1", {"Tomato Soup": 1, "Caesar Salad": 2}, time.time()), 200)
+
+    at = AppTest.from_file(os.path.join(ROOT, "app.py"), default_timeout=600).run()
+    at.text_input[0].input("admin")
+    at.text_input[1].input("admin123")
+    [button for button in at.button if button.label == "Login"][0].click().run()
+    at.run()
+    assert not at.exception, at.exception
+
+    def rerun(clear):
+        if clear:
+            st.cache_data.clear()
+        start = time.perf_counter()
+        at.run()
+        assert not at.exception, at.exception
+        return time.perf_counter() - start
+    cold = min(rerun(True) for _ in range(3))
+    warm = min(rerun(False) for _ in range(3))
+
+    print(f"{users} users, {users // 10} feedback rows, {users // 10} orders  (summary backfill {backfill:.2f}s)")
+    print(f"    old: all usernames {old_query * 1e3:9.1f} ms   live GROUP BY summary {live * 1e3:9.1f} ms")
+    print(f"    summary tables read {summary * 1e3:7.3f} ms   add_order {order * 1e6:6.0f} us")
+    print(f"    admin page rerun: cache cold {cold * 1e3:7.1f} ms, warm {warm * 1e3:7.1f} ms")
+    if users <= 10_000:
+        with get_pool(APP_DB, readonly=True).connection() as conn:
+            usernames = [row[0] for row in conn.execute('SELECT username FROM users WHERE role = ?', ('user',))]
+        old_render = AppTest.from_function(old_users_section, args=(usernames,), default_timeout=600)
+        start = time.perf_counter()
+        old_render.run()
+        print(f"    old users section render (st.write per user) {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        run(int(sys.argv[1]))
+    else:
+        # One process per size: the app's pools and singletons are per process
+        for users in (10_000, 100_000, 1_000_000):
+            subprocess.run([sys.executable, __file__, str(users)], check=True)
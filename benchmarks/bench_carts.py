@@ -0,0 +1,111 @@
+# Benchmark: carts for 10k concurrent sessions. Compares the memory of the old
+# per-session lists of item names with CartStore's {item_id: quantity} dicts,
+# the cost of one add-to-cart, and write-behind batching against committing
+# every click.
+#
+#     python benchmarks/bench_carts.py [sessions]
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from carts import CartStore
+from catalog import load_catalog
+from db import APP_DB, close_pools, get_pool
+from migrations import MIGRATIONS, migrate
+from storage import SqliteStorage
+
+
+# Per session: (item id, units) picks. Most sessions browse without buying;
+# shoppers pick a few dishes, often more than one of each.
+def shopping(sessions, ids, seed=0):
+    rng = random.Random(seed)
+    carts = []
+    for _ in range(sessions):
+        if rng.random() < 0.5:
+            carts.append([])
+        else:
+            carts.append([(rng.choice(ids), rng.choice((1, 1, 2, 3, 4))) for _ in range(rng.randint(1, 6))])
+    return carts
+
+
+def traced(build):
+    tracemalloc.start()
+    kept = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return kept, size
+
+
+def run(sessions):
+    catalog = load_catalog()
+    ids = list(catalog.rows_by_id)
+    names = {item_id: catalog.names[row] for item_id, row in catalog.rows_by_id.items()}
+    picks = shopping(sessions, ids)
+    units = sum(quantity for cart in picks for _, quantity in cart)
+
+    # Old: one list per session holding the name once per unit; while clicking
+    # the strings are the catalog's own, once rebuilt from storage each is a copy
+    _, old = traced(lambda: [[names[item_id] for item_id, quantity in cart for _ in range(quantity)]
+                             for cart in picks])
+    _, old_restored = traced(lambda: [[names[item_id].encode().decode() for item_id, quantity in cart
+                                       for _ in range(quantity)] for cart in picks])
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "app.db")
+        migrate(path, MIGRATIONS[APP_DB])
+        store = CartStore(SqliteStorage(path), flush_seconds=3600, batch_size=10 ** 9)
+        users = [f"user{i}" for i in range(sessions)]
+        for user in users:
+            store.get(user)  # every session logged in, nothing saved yet
+
+        def fill():
+            for user, cart in zip(users, picks):
+                for item_id, quantity in cart:
+                    store.add(user, item_id, quantity)
+            store.flush()
+        _, new = traced(fill)
+
+        def restore():
+            for user in users:
+                store.release(user)
+            for user in users:
+                store.get(user)
+        _, new_restored = traced(restore)
+        print(f"{sessions} sessions, {units} units in carts")
+        for label, before, after in [("filled by clicks", old, new), ("restored at login", old_restored, new_restored)]:
+            print(f"    {label:<18} list of names {before / sessions:6.1f} B/session"
+                  f"   item-id counter {after / sessions:6.1f} B/session")
+
+        start = time.perf_counter()
+        adds = 0
+        store.flush()
+        for user, cart in zip(users, picks):
+            for item_id, _ in cart:
+                store.add(user, item_id)
+                adds += 1
+        per_add = (time.perf_counter() - start) / adds
+        start = time.perf_counter()
+        written = store.flush()
+        batched = time.perf_counter() - start
+        print(f"    add-to-cart {per_add * 1e6:.2f} us; write-behind flush of {written} changes"
+              f" {batched * 1e3:.1f} ms (one transaction)")
+
+        sample = [(user, item_id) for user, cart in zip(users, picks) for item_id, _ in cart][:2000]
+        start = time.perf_counter()
+        for user, item_id in sample:
+            with get_pool(path).connection() as conn:
+                conn.execute('INSERT OR REPLACE INTO carts (username, item_id, quantity) VALUES (?, ?, 1)',
+                             (user, item_id))
+        per_click = (time.perf_counter() - start) / len(sample)
+        print(f"    commit per click {per_click * 1e6:.1f} us/change"
+              f" vs write-behind {batched / max(1, written) * 1e6:.1f} us/change")
+        close_pools()
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 10_000)
@@ -0,0 +1,45 @@
+# Microbenchmark: dietary filtering with the old per-item list scan versus the
+# bitmask catalog, at the real menu size and at synthetic 700 and 100k-item menus.
+#
+#     python benchmarks/bench_catalog.py
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from catalog import MenuCatalog, read_menu
+
+
+# Grow the real menu to roughly `size` items by cloning dishes under numbered names
+def synthetic_menu(size):
+    categories, base = read_menu()
+    items = [dict(base[i % len(base)], id=i + 1, name=f"{base[i % len(base)]['name']} #{i}") for i in range(size)]
+    return categories, items
+
+
+# The filter app.py used before the catalog: a list membership test per item
+def scan_filter(items, category, restrictions):
+    wanted = [r.lower() for r in restrictions]
+    return [item["name"] for item in items
+            if category in item["categories"] and all(r in item["tags"] for r in wanted)]
+
+
+def run(label, menu, category, restrictions, number):
+    categories, items = menu
+    catalog = MenuCatalog(categories, items)
+    assert sorted(scan_filter(items, category, restrictions)) == sorted(
+        name for name, _ in catalog.items(catalog.filter(category, restrictions)))
+    scan = min(timeit.repeat(lambda: scan_filter(items, category, restrictions), number=number, repeat=5)) / number
+    mask = min(timeit.repeat(lambda: catalog.filter(category, restrictions), number=number, repeat=5)) / number
+    all_cats = min(timeit.repeat(lambda: [catalog.filter(c, restrictions) for c in catalog.categories],
+                                 number=max(1, number // 10), repeat=5)) / max(1, number // 10)
+    print(f"{label:>10} | {len(items):>7} items | scan {scan * 1e6:9.1f} us | bitmask {mask * 1e6:8.1f} us"
+          f" | speedup {scan / mask:6.1f}x | all categories {all_cats * 1e6:8.1f} us")
+
+
+if __name__ == "__main__":
+    restrictions = ["Vegan", "Gluten-Free"]
+    run("real menu", read_menu(), "Salads", restrictions, number=2000)
+    run("700", synthetic_menu(700), "Salads", restrictions, number=2000)
+    run("100k", synthetic_menu(100_000), "Salads", restrictions, number=20)
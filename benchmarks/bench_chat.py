@@ -0,0 +1,110 @@
+# Benchmark: menu chat latency per message. A mix of phrasings (diets,
+# courses, exclusions, dish names, typos) is parsed cold and from the parse
+# cache, then answered (parse + query + the reply's first rows) on the real
+# menu and a synthetic 100k-item one, from one thread and from 16 threads at
+# once standing in for concurrent sessions, with every answer computed and
+# with answers shared through MenuStore's view cache as the app does. Reports
+# p50/p95/p99 per message.
+#
+#     python benchmarks/bench_chat.py [messages per thread]
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from catalog import read_menu
+from chat import ChatParser, run_query
+from menu_store import MenuStore
+
+MESSAGES = [
+    "something vegan and high-protein, no soup", "gluten free pasta without cheese", "a drink with no sugar",
+    "spicy chicken but no nuts", "I'd like a dessert, dairy-free please", "show me salads except caesar",
+    "quinoa", "vegetarian burger", "low sodium soup", "anything with salmon", "kids menu, nothing fried",
+    "healthy breakfast, no eggs", "smoothie high protein", "main courses not vegetarian", "tiramisu",
+    "fish without gluten", "starters vegan", "sandwich no meat", "chocolate dessert", "chiken wrap",
+    "pizza, no dairy", "green tea", "low sugar drinks", "hummus", "omega 3 rich seafood",
+]
+THREADS = 16
+
+
+def synthetic_menu(size, folder):
+    categories, base = read_menu()
+    items = [dict(base[i % len(base)], id=i + 1, name=f"{base[i % len(base)]['name']} {i}") for i in range(size)]
+    path = os.path.join(folder, "menu.json")
+    with open(path, "w") as f:
+        json.dump({"categories": categories, "items": items}, f)
+    return path
+
+
+def computed(store, catalog, index, query):
+    return run_query(catalog, index, query)
+
+
+def shared(store, catalog, index, query):
+    return store.chat_view(catalog, index, query)
+
+
+def percentiles(timings):
+    return "  ".join(f"p{q} {np.percentile(timings, q) * 1e3:6.3f} ms" for q in (50, 95, 99))
+
+
+def hammer(answer, store, parser, messages, timings, seed):
+    rng = random.Random(seed)
+    catalog, index = store.snapshot()
+    for _ in range(messages):
+        message = rng.choice(MESSAGES)
+        start = time.perf_counter()
+        rows = answer(store, catalog, index, parser.parse(message))
+        [catalog.names[row] for row in rows[:10]]
+        timings.append(time.perf_counter() - start)
+
+
+def concurrently(answer, store, parser, messages):
+    timings = [[] for _ in range(THREADS)]
+    threads = [threading.Thread(target=hammer, args=(answer, store, parser, messages, timings[n], n))
+               for n in range(THREADS)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    timings = [timing for thread_timings in timings for timing in thread_timings]
+    return f"{percentiles(timings)}  ({len(timings) / elapsed:,.0f} messages/s)"
+
+
+def run(label, store, messages):
+    catalog, _ = store.snapshot()
+    parser = ChatParser(catalog.category_names())
+    cold = []
+    for message in MESSAGES:
+        start = time.perf_counter()
+        parser.parse(message)
+        cold.append(time.perf_counter() - start)
+    cached = []
+    for message in MESSAGES * 40:
+        start = time.perf_counter()
+        parser.parse(message)
+        cached.append(time.perf_counter() - start)
+    single = []
+    hammer(computed, store, parser, messages, single, 0)
+    print(f"{label}: {len(catalog)} items")
+    print(f"    parse, cold                 {percentiles(cold)}")
+    print(f"    parse, cached               {percentiles(cached)}")
+    print(f"    answer, 1 thread            {percentiles(single)}")
+    print(f"    answer, {THREADS} threads          {concurrently(computed, store, parser, messages)}")
+    print(f"    answer, {THREADS} threads, shared  {concurrently(shared, store, parser, messages)}")
+
+
+if __name__ == "__main__":
+    messages = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    run("real menu", MenuStore(), messages)
+    with tempfile.TemporaryDirectory() as tmp:
+        run("100k", MenuStore(synthetic_menu(100_000, tmp)), messages // 5)
@@ -0,0 +1,147 @@
+# Benchmark: feedback writers and admin dashboard readers hitting the database
+# at once. Compares the old layout (users.db and feedback.db in the default
+# rollback-journal mode, dashboard reads on ordinary connections) with the
+# consolidated app.db in WAL mode read through the read-only pool. Writers each
+# commit one feedback row and one order status change per iteration; readers run
+# the dashboard's feedback page, a per-user feedback count and the order status
+# breakdown. Reports latency percentiles for both sides and, for the old layout,
+# how often a statement failed with "database is locked".
+#
+#     python benchmarks/bench_db_concurrency.py [seconds]
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db import APP_DB, close_pools, get_pool
+from migrations import LEGACY_FEEDBACK_DB, LEGACY_USERS_DB, MIGRATIONS, ensure_schema, migrate
+from orders import DELIVERED
+
+WRITERS = 4
+READERS = 4
+ROWS = 100_000  # preloaded feedback rows and orders
+PACE = 0.002  # seconds between one thread's iterations
+
+FEEDBACK_PAGE = 'SELECT id, username, feedback, created_at FROM feedback ORDER BY id DESC LIMIT 51'
+FEEDBACK_BY_USER = 'SELECT username, COUNT(*) FROM feedback GROUP BY username'
+ORDER_STATUS = 'SELECT status, COUNT(*) FROM orders GROUP BY status'
+
+
+def preload(users_conn, feedback_conn):
+    rng = random.Random(0)
+    now = time.time()
+    with feedback_conn:
+        feedback_conn.executemany('INSERT INTO feedback (username, feedback, created_at) VALUES (?, ?, ?)',
+                                  ((f"user{rng.randrange(1000)}", "Fine, a bit slow.", now) for _ in range(ROWS)))
+    with users_conn:
+        users_conn.executemany('INSERT INTO orders (username, status, created_at, updated_at) VALUES (?, ?, ?, ?)',
+                               ((f"user{rng.randrange(1000)}", DELIVERED, now, now) for _ in range(ROWS)))
+
+
+def run(label, writer_connection, reader_connection, seconds):
+    reads, writes, locked = [], [], [0]
+    deadline = time.perf_counter() + seconds
+
+    def timed(samples, fn):
+        start = time.perf_counter()
+        try:
+            fn()
+        except sqlite3.OperationalError as e:
+            if 'locked' not in str(e):
+                raise
+            locked[0] += 1
+        else:
+            samples.append(time.perf_counter() - start)
+
+    def writer(n):
+        rng = random.Random(n)
+        while time.perf_counter() < deadline:
+            def write():
+                with writer_connection('feedback') as conn:
+                    conn.execute('INSERT INTO feedback (username, feedback, created_at) VALUES (?, ?, ?)',
+                                 (f"user{rng.randrange(1000)}", "Great soup!", time.time()))
+                with writer_connection('orders') as conn:
+                    conn.execute('UPDATE orders SET updated_at = ? WHERE id = ?', (time.time(), rng.randrange(1, ROWS)))
+            timed(writes, write)
+            time.sleep(PACE)
+
+    def reader(n):
+        while time.perf_counter() < deadline:
+            def read():
+                with reader_connection('feedback') as conn:
+                    conn.execute(FEEDBACK_PAGE).fetchall()
+                    conn.execute(FEEDBACK_BY_USER).fetchall()
+                with reader_connection('orders') as conn:
+                    conn.execute(ORDER_STATUS).fetchall()
+            timed(reads, read)
+            time.sleep(PACE)
+
+    threads = [threading.Thread(target=writer, args=(n,)) for n in range(WRITERS)]
+    threads += [threading.Thread(target=reader, args=(n,)) for n in range(READERS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    print(f"  {label}")
+    for side, samples in (("dashboard reads", reads), ("writes", writes)):
+        ms = np.array(samples) * 1e3
+        print(f"    {side:<16} {len(ms) / seconds:7.0f}/s  p50 {np.percentile(ms, 50):7.2f} ms"
+              f"  p99 {np.percentile(ms, 99):8.2f} ms  max {ms.max():8.2f} ms")
+    print(f"    'database is locked' failures: {locked[0]}")
+
+
+# The old layout: one file per area, rollback journal, a fresh connection per use
+def separate_files(tmp, seconds):
+    paths = {'feedback': os.path.join(tmp, LEGACY_FEEDBACK_DB), 'orders': os.path.join(tmp, LEGACY_USERS_DB)}
+    migrate(paths['orders'], MIGRATIONS[APP_DB][:7])
+    migrate(paths['feedback'], MIGRATIONS[APP_DB][7:9])
+    close_pools()
+    for path in paths.values():
+        conn = sqlite3.connect(path)
+        conn.execute('PRAGMA journal_mode=DELETE')
+        conn.close()
+    users_conn, feedback_conn = sqlite3.connect(paths['orders']), sqlite3.connect(paths['feedback'])
+    preload(users_conn, feedback_conn)
+    users_conn.close()
+    feedback_conn.close()
+
+    class Connection:
+        def __init__(self, area):
+            self.conn = sqlite3.connect(paths[area], timeout=5.0)
+
+        def __enter__(self):
+            return self.conn.__enter__()
+
+        def __exit__(self, *exc):
+            try:
+                return self.conn.__exit__(*exc)
+            finally:
+                self.conn.close()
+
+    run("separate files, rollback journal", Connection, Connection, seconds)
+
+
+def consolidated(tmp, seconds):
+    os.chdir(tmp)
+    ensure_schema()
+    with get_pool(APP_DB).connection() as conn:
+        preload(conn, conn)
+    run("one file, WAL, read-only dashboard pool",
+        lambda area: get_pool(APP_DB).connection(),
+        lambda area: get_pool(APP_DB, readonly=True).connection(), seconds)
+    close_pools()
+
+
+if __name__ == "__main__":
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 5
+    print(f"{WRITERS} writers, {READERS} dashboard readers, {ROWS} feedback rows and orders, {seconds:.0f}s each")
+    with tempfile.TemporaryDirectory() as old, tempfile.TemporaryDirectory() as new:
+        separate_files(old, seconds)
+        consolidated(new, seconds)
@@ -0,0 +1,65 @@
+# Benchmark: the View Menu "favorites only" filter for a user with 1k
+# favorites. Compares membership tests against the old list of names with the
+# cached set of item ids, over a search result, a category and the favorites
+# listing, at the real menu size and a synthetic 100k-item menu, plus the cost
+# of refilling the session cache from the database after a write.
+#
+#     python benchmarks/bench_favorites.py
+import os
+import random
+import sys
+import tempfile
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import storage
+from catalog import MenuCatalog, read_menu
+from db import close_pools
+from favorites import add_favorites, favorite_rows, get_favorites, only_favorites
+from storage import SqliteStorage
+
+FAVORITES = 1000
+
+
+def synthetic_menu(size):
+    categories, base = read_menu()
+    items = [dict(base[i % len(base)], id=i + 1, name=f"{base[i % len(base)]['name']} #{i}") for i in range(size)]
+    return categories, items
+
+
+def timed(fn, number):
+    return min(timeit.repeat(fn, number=number, repeat=5)) / number * 1e3
+
+
+def run(label, catalog, number):
+    rng = random.Random(0)
+    ids = list(catalog.rows_by_id)
+    favorite_ids = set(rng.sample(ids, min(FAVORITES, len(ids))))
+    # The old session list: names appended per click, some clicked twice
+    names = [catalog.names[catalog.rows_by_id[item_id]] for item_id in favorite_ids]
+    favorite_list = names + rng.sample(names, len(names) // 10)
+    category = max(catalog.categories, key=lambda c: len(catalog.categories[c]))
+    rows = catalog.filter(category)
+
+    old = timed(lambda: [row for row in rows if catalog.names[row] in favorite_list], number)
+    new = timed(lambda: only_favorites(catalog, rows, favorite_ids), number)
+    listing = timed(lambda: catalog.restrict(favorite_rows(catalog, favorite_ids), ["Vegetarian"]), number)
+    print(f"{label}: {len(ids)} items, {len(favorite_ids)} favorites, category {category!r} of {len(rows)} rows")
+    print(f"    list membership {old:9.3f} ms   cached set {new:7.3f} ms   favorites-only listing {listing:7.3f} ms")
+    return favorite_ids
+
+
+if __name__ == "__main__":
+    run("real menu", MenuCatalog(*read_menu()), number=20)
+    favorite_ids = run("100k", MenuCatalog(*synthetic_menu(100_000)), number=2)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        storage._storage = SqliteStorage(os.path.join(tmp, "app.db"))
+        storage._storage.migrate()
+        add_favorites("alice", favorite_ids)
+        add_favorites("alice", favorite_ids)  # repeated clicks keep one row each
+        assert get_favorites("alice") == favorite_ids
+        miss = timed(lambda: get_favorites("alice"), 20)
+        print(f"    cache refill after a write (database read) {miss:.3f} ms")
+        close_pools()
@@ -0,0 +1,68 @@
+# Benchmark: feedback ingestion from 8 concurrent sessions. Compares one
+# committed INSERT per submit (the previous submit_feedback) with the queued
+# FeedbackWriter, both fire-and-forget and durable (each submit waits for its
+# batch to commit). Reports per-submit latency and end-to-end inserts/s.
+#
+#     python benchmarks/bench_feedback_ingest.py [submissions]
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db import APP_DB, close_pools, get_pool
+from feedback import FeedbackWriter
+from migrations import MIGRATIONS, migrate
+from storage import SqliteStorage
+
+THREADS = 8
+TEXT = "The quinoa salad was great but delivery took a while. " * 3
+
+
+def insert_now(path, username, text):
+    with get_pool(path).connection() as conn:
+        conn.execute('INSERT INTO feedback (username, feedback, created_at) VALUES (?, ?, ?)',
+                     (username, text, time.time()))
+
+
+def run(label, path, submit, count, finish=lambda: None):
+    latencies = np.empty(count)
+
+    def one(i):
+        start = time.perf_counter()
+        submit(f"user{i % 500}", TEXT)
+        latencies[i] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(THREADS) as sessions:
+        list(sessions.map(one, range(count)))
+    finish()
+    elapsed = time.perf_counter() - start
+    with get_pool(path).connection() as conn:
+        stored = conn.execute('SELECT COUNT(*) FROM feedback').fetchone()[0]
+    assert stored == count, (stored, count)
+    latencies *= 1e3
+    print(f"    {label:<22} submit p50 {np.percentile(latencies, 50):7.3f} ms  p99 {np.percentile(latencies, 99):7.3f} ms"
+          f"  {count / elapsed:8.0f} inserts/s")
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    print(f"{count} submissions from {THREADS} threads")
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = {}
+        for label in ("one commit per submit", "queued", "queued, durable"):
+            paths[label] = path = os.path.join(tmp, f"{len(paths)}.db")
+            migrate(path, MIGRATIONS[APP_DB])
+
+        path = paths["one commit per submit"]
+        run("one commit per submit", path, lambda u, t: insert_now(path, u, t), count)
+        for label, durable in (("queued", False), ("queued, durable", True)):
+            writer = FeedbackWriter(SqliteStorage(paths[label]), durable=durable)
+            writer.start()
+            run(label, paths[label], writer.submit, count, finish=writer.stop)
+        close_pools()
@@ -0,0 +1,88 @@
+# Benchmark: what the timing instrumentation costs. Reports the price of one
+# span and one timed call next to an untimed one, then reruns the busiest pages
+# (View Menu, the admin dashboard) through AppTest with recording on and off,
+# interleaved, and reports the median difference next to the estimate of spans
+# per rerun x cost per span. Ends with the time to render the Prometheus export.
+#
+#     python benchmarks/bench_instrumentation.py [reruns]
+import os
+import statistics
+import sys
+import tempfile
+import time
+import timeit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from streamlit.testing.v1 import AppTest
+
+import metrics
+
+
+def noop():
+    pass
+
+
+@metrics.timed("bench.noop")
+def timed_noop():
+    pass
+
+
+def per_call(fn, number=200_000):
+    return min(timeit.repeat(fn, number=number, repeat=5)) / number
+
+
+def login(user, password):
+    at = AppTest.from_file(os.path.join(ROOT, "app.py"), default_timeout=60).run()
+    at.text_input[0].input(user)
+    at.text_input[1].input(password)
+    [button for button in at.button if button.label == "Login"][0].click().run()
+    at.run()
+    assert not at.exception, at.exception
+    return at
+
+
+def user_session():
+    at = AppTest.from_file(os.path.join(ROOT, "app.py"), default_timeout=60).run()
+    [button for button in at.button if button.label == "Go to Register"][0].click().run()
+    at.run()
+    at.text_input[0].input("bench")
+    at.text_input[1].input("bench")
+    [button for button in at.button if button.label == "Register"][0].click().run()
+    at = login("bench", "bench")
+    at.sidebar.selectbox[0].select("View Menu").run()
+    return at
+
+
+def compare(label, at, reruns):
+    timings = {True: [], False: []}
+    spans = 0
+    for _ in range(reruns):
+        for enabled in (True, False):
+            metrics.ENABLED = enabled
+            before = sum(hist.count for hist in metrics.histograms().values())
+            start = time.perf_counter()
+            at.run()
+            timings[enabled].append(time.perf_counter() - start)
+            if enabled:
+                spans += sum(hist.count for hist in metrics.histograms().values()) - before
+            assert not at.exception, at.exception
+    metrics.ENABLED = True
+    on, off = statistics.median(timings[True]), statistics.median(timings[False])
+    estimate = spans / reruns * span_cost / off
+    print(f"  {label:<16} rerun {off * 1e3:7.2f} ms off, {on * 1e3:7.2f} ms on ({(on - off) / off:+.2%} measured);"
+          f" {spans / reruns:.0f} spans per rerun, estimated overhead {estimate:.4%}")
+
+
+if __name__ == "__main__":
+    reruns = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    os.chdir(tempfile.mkdtemp())
+    plain = per_call(noop)
+    wrapped = per_call(timed_noop)
+    span_cost = wrapped - plain
+    print(f"  call {plain * 1e9:.0f} ns, timed call {wrapped * 1e9:.0f} ns: {span_cost * 1e9:.0f} ns per span")
+    compare("View Menu", user_session(), reruns)
+    compare("Admin Dashboard", login("admin", "admin123"), reruns)
+    export = per_call(metrics.prometheus_text, 200)
+    print(f"  Prometheus export of {len(metrics.histograms())} histograms: {export * 1e3:.3f} ms")
@@ -0,0 +1,257 @@
+# Load test: concurrent scripted sessions against app.py through Streamlit's
+# headless AppTest, no browser or server needed. A user session logs in, then
+# each round browses categories, adds dishes to the cart, searches, places the
+# order and sends feedback; every ADMIN_EVERY-th session is an admin going
+# through the dashboard, feedback search, order filter and performance page
+# instead. One user and one admin session first run alone, giving each step's
+# latency and database statements without contention; then all sessions run
+# at once. Reports p50/p95/p99 rerun latency per step and overall, database
+# statements per rerun (the db.statements counter) and peak memory (RSS).
+# The --max-* limits make it a regression gate: it exits with status 1 when
+# the concurrent run exceeds one.
+#
+# AppTest swaps process-wide Streamlit state (its runtime, config) for every
+# run, so runs in one process cannot overlap: a process's sessions each have a
+# thread, sharing the app's caches, pools and background workers as a server's
+# sessions do, but take turns rerunning. --processes spreads the sessions over
+# that many processes on the same database for reruns that really overlap.
+# AppTest also gives every run an empty st.cache_data, so the admin summary is
+# costed uncached.
+#
+#     python benchmarks/bench_load.py [--sessions 8] [--processes 1] [--rounds 3]
+#                                     [--max-p95 MS] [--max-db N] [--max-rss MIB]
+import argparse
+import os
+import random
+import resource
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from streamlit.testing.v1 import AppTest
+
+import metrics
+from catalog import load_catalog
+from migrations import ensure_schema
+from passwords import hash_password
+from storage import get_storage
+
+PASSWORD = "load-test"
+# Every this many sessions, one is an admin
+ADMIN_EVERY = 4
+# Categories browsed and dishes added to the cart per round
+CATEGORIES = 3
+DISHES = 2
+SEARCHES = ["salad", "vegan", "chicken", "chocolate", "soup", "quinoa"]
+FEEDBACK = ["Great food, fast delivery.", "The soup was cold.", "Loved the vegan options!", "Too salty."]
+# Seconds a rerun may take before AppTest gives up on it
+TIMEOUT = 120
+
+# Held for each AppTest run: runs in one process must not overlap
+_run_lock = threading.Lock()
+
+
+def widget(widgets, label):
+    return next(element for element in widgets if element.label == label)
+
+
+# One scripted browser tab. Each step applies its widget changes and reruns
+# the script, like a browser does on an interaction; the rerun's wall time
+# and the database statements counted meanwhile are recorded under the step.
+class Session:
+    def __init__(self, username, seed):
+        self.username = username
+        self.rng = random.Random(seed)
+        self.at = AppTest.from_file(os.path.join(ROOT, "app.py"), default_timeout=TIMEOUT)
+        self.timings = defaultdict(list)
+        self.statements = defaultdict(list)
+
+    def step(self, name, action=None):
+        if action is not None:
+            action(self.at)
+        with _run_lock:
+            before = metrics.counters().get("db.statements", 0)
+            start = time.perf_counter()
+            self.at.run()
+            self.timings[name].append(time.perf_counter() - start)
+            self.statements[name].append(metrics.counters().get("db.statements", 0) - before)
+        if self.at.exception:
+            raise RuntimeError(f"{self.username}, {name}: {self.at.exception[0].message}")
+
+    def login(self):
+        self.step("open")
+        self.step("login", lambda at: (widget(at.text_input, "Username").input(self.username),
+                                       widget(at.text_input, "Password").input(PASSWORD),
+                                       widget(at.button, "Login").click()))
+        self.step("first page")
+
+    def run(self, rounds):
+        raise NotImplementedError
+
+
+class UserSession(Session):
+    def run(self, rounds):
+        self.login()
+        categories = load_catalog().category_names()
+        for _ in range(rounds):
+            self.step("menu", lambda at: widget(at.selectbox, "Choose an option").select("View Menu"))
+            for category in self.rng.sample(categories, CATEGORIES):
+                self.step("browse", lambda at: widget(at.selectbox, "Select a Category").select(category))
+            self.step("add to cart", self._tick_dishes)
+            self.step("search", lambda at: widget(at.text_input, "Search Menu Items").input(
+                self.rng.choice(SEARCHES)))
+            self.step("search", lambda at: widget(at.text_input, "Search Menu Items").input(""))
+            self.step("cart", lambda at: widget(at.selectbox, "Choose an option").select("View Cart"))
+            self.step("place order", lambda at: widget(at.button, "Place Order").click())
+            self.step("feedback", lambda at: widget(at.selectbox, "Choose an option").select("Feedback"))
+            self.step("submit feedback", lambda at: (widget(at.text_area, "Your Feedback").input(
+                self.rng.choice(FEEDBACK)), widget(at.button, "Submit Feedback").click()))
+        self.step("logout", lambda at: widget(at.button, "Logout").click())
+
+    # Tick "Cart" on a few rows of the menu table, then press "Add selected"
+    def _tick_dishes(self, at):
+        key = next(key for key in at.session_state.filtered_state
+                   if str(key).startswith("menu_editor_") and key != "menu_editor_version")
+        rows = self.rng.sample(range(len(at.dataframe[0].value)), DISHES)
+        at.session_state[key] = {"edited_rows": {row: {"Cart": True} for row in rows},
+                                 "added_rows": [], "deleted_rows": []}
+        widget(at.button, "Add selected").click()
+
+
+class AdminSession(Session):
+    def run(self, rounds):
+        self.login()
+        for _ in range(rounds):
+            self.step("dashboard refresh", lambda at: widget(at.button, "Refresh").click())
+            self.step("feedback search", lambda at: widget(at.text_input, "Search feedback").input(
+                self.rng.choice(FEEDBACK).split()[-1].strip(".!")))
+            self.step("feedback search", lambda at: widget(at.text_input, "Search feedback").input(""))
+            self.step("order filter", lambda at: widget(at.text_input, "Filter orders by username").input("load1"))
+            self.step("order filter", lambda at: widget(at.text_input, "Filter orders by username").input(""))
+            self.step("performance", lambda at: widget(at.radio, "Admin view").set_value("Performance"))
+            self.step("dashboard", lambda at: widget(at.radio, "Admin view").set_value("Dashboard"))
+        self.step("logout", lambda at: widget(at.button, "Logout").click())
+
+
+# Session specs (kind, username, seed): every ADMIN_EVERY-th one an admin
+def session_specs(count, prefix):
+    return [("admin", f"{prefix}admin{n}", n) if n % ADMIN_EVERY == ADMIN_EVERY - 1 else ("user", f"{prefix}{n}", n)
+            for n in range(count)]
+
+
+def create_users(specs):
+    storage, hashed = get_storage(), hash_password(PASSWORD)
+    for kind, username, _ in specs:
+        storage.add_user(username, hashed, kind)
+
+
+def percentiles(timings):
+    return "  ".join(f"p{q} {np.percentile(timings, q) * 1e3:8.1f} ms" for q in (50, 95, 99))
+
+
+def peak_rss():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # KiB on Linux
+
+
+# Run sessions in one process, each in its own thread started together, or one
+# after another. Returns per-step timings and statements, the statements the
+# process sent meanwhile (its background work included) and its peak RSS.
+def worker(folder, specs, rounds, together=True):
+    os.chdir(folder)
+    group = [(AdminSession if kind == "admin" else UserSession)(username, seed) for kind, username, seed in specs]
+    errors = []
+    start_line = threading.Barrier(len(group))
+
+    def run(session):
+        start_line.wait()
+        try:
+            session.run(rounds)
+        except Exception as error:
+            errors.append(error)
+
+    before = metrics.counters().get("db.statements", 0)
+    if together:
+        threads = [threading.Thread(target=run, args=(session,)) for session in group]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        if errors:
+            raise errors[0]
+    else:
+        for session in group:
+            session.run(rounds)
+    timings, statements = defaultdict(list), defaultdict(list)
+    for session in group:
+        for name, values in session.timings.items():
+            timings[name] += values
+            statements[name] += session.statements[name]
+    return dict(timings), dict(statements), metrics.counters().get("db.statements", 0) - before, peak_rss()
+
+
+# Run `specs` spread over `processes` fresh processes; returns their merged
+# results, the largest peak RSS and the wall time
+def run_spread(folder, specs, rounds, processes, together=True):
+    shares = [specs[n::processes] for n in range(processes) if specs[n::processes]]
+    start = time.perf_counter()
+    with ProcessPoolExecutor(len(shares), mp_context=get_context("spawn")) as pool:
+        results = list(pool.map(worker, [folder] * len(shares), shares, [rounds] * len(shares),
+                                [together] * len(shares)))
+    elapsed = time.perf_counter() - start
+    timings, statements = defaultdict(list), defaultdict(list)
+    for step_timings, step_statements, _, _ in results:
+        for name, values in step_timings.items():
+            timings[name] += values
+            statements[name] += step_statements[name]
+    return timings, statements, sum(result[2] for result in results), max(result[3] for result in results), elapsed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Concurrent AppTest sessions against app.py")
+    parser.add_argument("--sessions", type=int, default=8)
+    parser.add_argument("--processes", type=int, default=1)
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--max-p95", type=float, help="fail above this overall rerun p95, in ms")
+    parser.add_argument("--max-db", type=float, help="fail above this many database statements per rerun")
+    parser.add_argument("--max-rss", type=float, help="fail above this peak resident memory per process, in MiB")
+    args = parser.parse_args()
+
+    folder = tempfile.mkdtemp()
+    os.chdir(folder)
+    ensure_schema()
+    alone, specs = [("user", "alone0", 0), ("admin", "aloneadmin0", 0)], session_specs(args.sessions, "load")
+    create_users(alone + specs)
+
+    timings, statements, _, rss, _ = run_spread(folder, alone, args.rounds, 1, together=False)
+    print(f"one user and one admin session, alone (peak {rss:.0f} MiB RSS)")
+    for name, values in timings.items():
+        print(f"    {name:<18} {percentiles(values)}  {np.mean(statements[name]):5.1f} statements")
+
+    timings, _, sent, rss, elapsed = run_spread(folder, specs, args.rounds, args.processes)
+    reruns = [timing for values in timings.values() for timing in values]
+    admins = sum(kind == "admin" for kind, _, _ in specs)
+    print(f"{args.sessions} sessions at once ({admins} admins) in {args.processes} process(es),"
+          f" {args.rounds} rounds: {len(reruns)} reruns in {elapsed:.1f}s, {len(reruns) / elapsed:.1f} reruns/s")
+    for name, values in timings.items():
+        print(f"    {name:<18} {percentiles(values)}")
+    p95 = np.percentile(reruns, 95) * 1e3
+    per_rerun = sent / len(reruns)
+    print(f"    {'every rerun':<18} {percentiles(reruns)}")
+    print(f"    database statements per rerun {per_rerun:.1f} (background work included)")
+    print(f"    peak memory {rss:.0f} MiB RSS per process")
+
+    failures = [f"{label} {value:.1f} over {limit}" for label, value, limit in [
+        ("rerun p95 (ms)", p95, args.max_p95), ("statements per rerun", per_rerun, args.max_db),
+        ("peak RSS (MiB)", rss, args.max_rss)] if limit is not None and value > limit]
+    if failures:
+        print("FAILED: " + "; ".join(failures))
+        sys.exit(1)
@@ -0,0 +1,67 @@
+# Benchmark: login latency with a fresh sqlite3.connect per helper call (the
+# original authenticate_user + get_user_role pair) versus the app's lookup
+# today, storage.find_user on the pooled connection plus verify_password. Both
+# check the legacy SHA-256 hash so only the database access differs (the app
+# would upgrade such a hash on login; that is left out here, as are the login
+# limits); see bench_password_hashing.py for the cost of the slow hashes.
+#
+#     python benchmarks/bench_login.py
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db import APP_DB, get_pool
+from migrations import ensure_schema
+from passwords import hash_password, verify_password
+from storage import get_storage
+
+LOGINS = 5000
+THREADS = 8
+
+
+def old_login(path, username, password):
+    conn = sqlite3.connect(path)
+    user = conn.execute('SELECT * FROM users WHERE username = ? AND password = ?',
+                        (username, hash_password(password, 'sha256'))).fetchone()
+    conn.close()
+    if not user:
+        return None
+    conn = sqlite3.connect(path)
+    role = conn.execute('SELECT role FROM users WHERE username = ?', (username,)).fetchone()
+    conn.close()
+    return role[0] if role else None
+
+
+def pooled_login(username, password):
+    row = get_storage().find_user(username)
+    if row is None or not verify_password(password, row[0])[0]:
+        return None
+    return row[1]
+
+
+def burst(login):
+    start = time.perf_counter()
+    with ThreadPoolExecutor(THREADS) as pool:
+        roles = list(pool.map(lambda i: login(f"user{i % 1000}", "secret"), range(LOGINS)))
+    elapsed = time.perf_counter() - start
+    assert all(role == 'user' for role in roles)
+    return elapsed
+
+
+if __name__ == "__main__":
+    os.chdir(tempfile.mkdtemp())
+    ensure_schema()
+    with get_pool(APP_DB).connection() as conn:
+        conn.executemany('INSERT INTO users (username, password, role) VALUES (?, ?, ?)',
+                         [(f"user{i}", hash_password("secret", 'sha256'), 'user') for i in range(1000)])
+
+    old = burst(lambda u, p: old_login(APP_DB, u, p))
+    new = burst(pooled_login)
+    print(f"{LOGINS} logins on {THREADS} threads")
+    print(f"connect per call: {old:.3f}s ({LOGINS / old:,.0f} logins/s)")
+    print(f"find_user       : {new:.3f}s ({LOGINS / new:,.0f} logins/s)")
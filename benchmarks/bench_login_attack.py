@@ -0,0 +1,112 @@
+# Load test: a credential-stuffing burst against authenticate_user, with and
+# without the login limiters and the missing-username cache. Attacker threads
+# play a handful of clients cycling through a leaked list of usernames (most of
+# which don't exist here) with wrong passwords, each thread offering up to 200
+# attempts/s, while one real user logs in from their own client. Clients are
+# keyed as the app does by default (no trusted proxy): auth.client_address on
+# the connection's address, with the attackers sending a fresh spoofed
+# X-Forwarded-For each attempt, which must not buy them a fresh bucket. Reports
+# attempts/s, database queries/s (counted with a trace callback on every pooled
+# connection), password hashes/s, the outcome counters and the real user's
+# login latency.
+#
+#     python benchmarks/bench_login_attack.py [seconds]
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import auth
+import db
+from cache import LRUCache
+from db import APP_DB, close_pools, get_pool
+from migrations import ensure_schema
+from passwords import hash_password
+from ratelimit import TokenBucketLimiter
+
+ATTACKERS = 16
+CLIENTS = 8
+PACE = 0.005  # seconds between one attacker thread's attempts
+USERS = 200
+LEAKED = 2000  # leaked usernames tried; USERS of them exist here
+
+counts = {"queries": 0, "hashes": 0}
+_connect = db.ConnectionPool._connect
+
+
+def traced_connect(pool):
+    conn = _connect(pool)
+    conn.set_trace_callback(lambda sql: counts.__setitem__("queries", counts["queries"] + 1))
+    return conn
+
+
+_verify = auth.verify_password
+
+
+def counted_verify(password, stored):
+    counts["hashes"] += 1
+    return _verify(password, stored)
+
+
+def attack(seconds, protected):
+    if protected:
+        auth.USER_LIMITER = TokenBucketLimiter(rate=0.1, burst=5)
+        auth.CLIENT_LIMITER = TokenBucketLimiter(rate=1.0, burst=20)
+        auth.UNKNOWN_CLIENT_LIMITER = TokenBucketLimiter(rate=10.0, burst=100)
+        auth.MISSING_USERS = LRUCache(10_000, ttl=60)
+    else:
+        auth.USER_LIMITER = auth.CLIENT_LIMITER = auth.UNKNOWN_CLIENT_LIMITER = TokenBucketLimiter(
+            rate=0, burst=float('inf'))
+        auth.MISSING_USERS = LRUCache(10_000, ttl=0)
+    auth._counters.clear()
+    counts.update(queries=0, hashes=0)
+    deadline = time.perf_counter() + seconds
+    attempts = [0] * ATTACKERS
+
+    def attacker(n):
+        rng = random.Random(n)
+        while time.perf_counter() < deadline:
+            spoofed = f"203.0.113.{rng.randrange(256)}"
+            client = auth.client_address(spoofed, f"10.0.0.{n % CLIENTS}")
+            try:
+                auth.authenticate_user(f"user{rng.randrange(LEAKED)}", "hunter2", client)
+            except auth.LoginThrottled:
+                pass
+            attempts[n] += 1
+            time.sleep(PACE)
+
+    threads = [threading.Thread(target=attacker, args=(n,)) for n in range(ATTACKERS)]
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds / 2)
+    start = time.perf_counter()
+    role = auth.authenticate_user("alice", "secret", auth.client_address("", "192.168.1.7"))
+    real_user = time.perf_counter() - start
+    for thread in threads:
+        thread.join()
+    counters = auth.login_counters()
+    print(f"  {'protected' if protected else 'unprotected':<11} {sum(attempts) / seconds:9.0f} attempts/s"
+          f"  {counts['queries'] / seconds:8.0f} DB queries/s  {counts['hashes'] / seconds:6.1f} hashes/s"
+          f"  real user {role} in {real_user * 1e3:.0f} ms")
+    print(f"              {dict(sorted(counters.items()))}")
+
+
+if __name__ == "__main__":
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 5
+    os.chdir(tempfile.mkdtemp())
+    ensure_schema()
+    with get_pool(APP_DB).connection() as conn:
+        conn.executemany('INSERT INTO users (username, password, role) VALUES (?, ?, ?)',
+                         [(f"user{i}", hash_password("secret"), 'user') for i in range(USERS)]
+                         + [("alice", hash_password("secret"), 'user')])
+    close_pools()
+    db.ConnectionPool._connect = traced_connect
+    auth.verify_password = counted_verify
+    print(f"{ATTACKERS} attacker threads from {CLIENTS} clients, {LEAKED} leaked usernames ({USERS} real),"
+          f" {seconds:.0f}s each")
+    attack(seconds, protected=False)
+    attack(seconds, protected=True)
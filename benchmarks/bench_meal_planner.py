@@ -0,0 +1,73 @@
+# Benchmark: meal planner latency on synthetic menus of 1k, 10k and 100k
+# items (the real dishes repeated, with random nutrition figures), for no
+# restriction, one and two. Also checks plan quality on a small menu against
+# an exhaustive search of every main/side/drink/dessert combination, and times
+# scoring the 100k dishes in a plain Python loop for comparison with the
+# vectorized shortlist.
+#
+#     python benchmarks/bench_meal_planner.py [runs]
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from catalog import NUTRIENTS, MenuCatalog, read_menu
+from planner import COURSES, DEFAULT_TARGETS, course_codes, plan_meal, score
+
+RESTRICTIONS = [(), ("Vegan",), ("Vegetarian", "Gluten-Free")]
+LOW = [50, 0, 0, 0, 0]
+HIGH = [900, 50, 120, 60, 1500]
+
+
+def synthetic_catalog(size, seed=0):
+    categories, base = read_menu()
+    rng = np.random.default_rng(seed)
+    figures = rng.uniform(LOW, HIGH, size=(size, len(NUTRIENTS))).round(1)
+    items = [dict(base[i % len(base)], id=i + 1, name=f"{base[i % len(base)]['name']} #{i}",
+                  nutrition=dict(zip(NUTRIENTS, map(float, figures[i])))) for i in range(size)]
+    return MenuCatalog(categories, items)
+
+
+def latency(catalog, restrictions, runs):
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        plan_meal(catalog, restrictions=restrictions)
+        timings.append(time.perf_counter() - start)
+    return np.percentile(timings, 50) * 1e3, np.percentile(timings, 95) * 1e3
+
+
+# Best score over every combination, one main at a time
+def exhaustive(catalog, targets):
+    codes = course_codes(catalog)
+    usable = ~np.isnan(catalog.nutrition).any(axis=1)
+    main, side, drink, dessert = (catalog.nutrition[usable & (codes == code)] for code in range(len(COURSES)))
+    rest = (side[:, None, None, :] + drink[None, :, None, :] + dessert[None, None, :, :]).reshape(-1, len(NUTRIENTS))
+    return min(score(rest + dish, targets).min() for dish in main)
+
+
+def python_loop(catalog, targets):
+    return [sum(max(figure - target, 0) + max(target - figure, 0) for figure, target in zip(row, targets))
+            for row in catalog.nutrition.tolist()]
+
+
+if __name__ == "__main__":
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    targets = np.array([DEFAULT_TARGETS[nutrient] for nutrient in NUTRIENTS], dtype=np.float32)
+    for size in (1_000, 10_000, 100_000):
+        catalog = synthetic_catalog(size)
+        print(f"{size} items")
+        for restrictions in RESTRICTIONS:
+            p50, p95 = latency(catalog, restrictions, runs)
+            print(f"    {', '.join(restrictions) or 'no restriction':<24} p50 {p50:6.2f} ms  p95 {p95:6.2f} ms")
+    start = time.perf_counter()
+    python_loop(catalog, targets)
+    print(f"    scoring every dish in a Python loop: {(time.perf_counter() - start) * 1e3:.1f} ms")
+
+    small = synthetic_catalog(300, seed=1)
+    courses, totals = plan_meal(small)
+    planned = score(np.array([totals[nutrient] for nutrient in NUTRIENTS], dtype=np.float32), targets)
+    print(f"300 items: planner score {planned:.4f}, exhaustive best {exhaustive(small, targets):.4f}")
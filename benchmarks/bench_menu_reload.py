@@ -0,0 +1,103 @@
+# Benchmark: hot-reloading a 100k-item menu file. Compares a full rebuild of
+# the catalog and search index with MenuStore's diff application for a 1%
+# change (retags, renames, additions, removals), checks the patched menu
+# answers like a fresh build, and measures how long snapshot() calls take on
+# the serving thread while a background reload runs.
+#
+#     python benchmarks/bench_menu_reload.py [size]
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from catalog import TAG_VOCABULARY, MenuCatalog, read_menu
+from menu_store import MenuStore
+from search import MenuSearchIndex
+
+QUERIES = ["qui", "quinoa salad", "ceasar salad", "spicy grilled chiken"]
+
+
+def synthetic_menu(size):
+    categories, base = read_menu()
+    items = [dict(base[i % len(base)], id=i + 1, name=f"{base[i % len(base)]['name']} #{i}") for i in range(size)]
+    return categories, items
+
+
+# About `share` of the items retagged, renamed, recategorized, removed or newly added
+def mutate(categories, items, share=0.01, seed=0):
+    rng = random.Random(seed)
+    items = [dict(item) for item in items]
+    count = int(len(items) * share)
+    for item in rng.sample(items, count):
+        kind = rng.randrange(3)
+        if kind == 0:
+            item["tags"] = rng.sample(TAG_VOCABULARY, 3)
+        elif kind == 1:
+            item["name"] += " Deluxe"
+        else:
+            item["categories"] = [rng.choice(categories)]
+    removed = {item["id"] for item in rng.sample(items, count // 2)}
+    items = [item for item in items if item["id"] not in removed]
+    next_id = max(item["id"] for item in items) + 1
+    items += [dict(rng.choice(items), id=next_id + i, name=f"New Dish {seed}-{i}") for i in range(count // 2)]
+    return categories, items
+
+
+def write(path, categories, items):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"categories": categories, "items": items}, f)
+    # Make sure the mtime moves even on coarse-grained filesystems
+    os.utime(path, ns=(time.time_ns(), time.time_ns() + 1_000_000))
+
+
+def answers(catalog, index):
+    live = catalog.matches(())
+    results = {c: sorted(catalog.names[r] for r in catalog.filter(c, ["Vegan"])) for c in catalog.category_names()}
+    for query in QUERIES:
+        results[query] = [catalog.names[r] for r in index.search(query, live)]
+    return results
+
+
+def run(size):
+    categories, items = synthetic_menu(size)
+    changed = mutate(categories, items)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "menu.json")
+        write(path, categories, items)
+        store = MenuStore(path, check_seconds=0)
+
+        write(path, *changed)
+        start = time.perf_counter()
+        catalog = MenuCatalog(*read_menu(path))
+        index = MenuSearchIndex(catalog.names)
+        full = time.perf_counter() - start
+        start = time.perf_counter()
+        counts = store.reload()
+        patched = time.perf_counter() - start
+        assert answers(*store.snapshot()) == answers(catalog, index)
+        print(f"{size} items, diff added/changed/removed {counts}")
+        print(f"    full rebuild {full * 1e3:8.1f} ms   diff reload {patched * 1e3:8.1f} ms")
+
+        # Serve snapshots while a reload runs in the background
+        write(path, *mutate(*changed, seed=1))
+        version = store.version
+        store.check()
+        latencies = []
+        while store.version == version and store.last_error is None:
+            start = time.perf_counter()
+            store.snapshot()
+            latencies.append(time.perf_counter() - start)
+            time.sleep(0.001)  # a request's worth of other work
+        latencies = np.array(latencies) * 1e6
+        print(f"    during background reload: {len(latencies)} snapshot() calls,"
+              f" p50 {np.percentile(latencies, 50):.1f} us  max {latencies.max():.1f} us")
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
@@ -0,0 +1,85 @@
+# Benchmark: View Menu rerun cost with one st.write + two st.button per item
+# versus one paged st.data_editor. Reports element count, protobuf payload
+# (the size of the deltas sent to the browser) and rerun time, via AppTest.
+#
+#     python benchmarks/bench_menu_render.py
+import os
+import sys
+import time
+
+from streamlit.testing.v1 import AppTest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RERUNS = 5
+PAGE_SIZE = 25  # MENU_PAGE_SIZE in app.py
+
+
+def per_item_buttons(items):
+    import streamlit as st
+    for item, tags in items:
+        st.write(f"- {item} ({', '.join(tags)})")
+        if st.button(f"Add {item} to Cart", key=item):
+            st.success(f"{item} added to cart!")
+        if st.button(f"Add {item} to Favorites", key=item + "_fav"):
+            st.success(f"{item} added to favorites!")
+
+
+def table_page(items, page_size):
+    import pandas as pd
+    import streamlit as st
+    pages = max(1, -(-len(items) // page_size))
+    page = st.number_input("Page", min_value=1, max_value=pages) if pages > 1 else 1
+    items = items[(page - 1) * page_size:page * page_size]
+    st.data_editor(
+        pd.DataFrame({
+            "Cart": False,
+            "Favorite": False,
+            "Item": [item for item, _ in items],
+            "Tags": [", ".join(tags) for _, tags in items],
+        }),
+        column_config={
+            "Cart": st.column_config.CheckboxColumn("Add to cart"),
+            "Favorite": st.column_config.CheckboxColumn("Add to favorites"),
+        },
+        disabled=["Item", "Tags"], hide_index=True, key="menu_editor",
+    )
+    st.button("Add selected")
+
+
+# Element count and serialized size of everything the script emitted
+def payload(node):
+    count, size = 0, 0
+    proto = getattr(node, "proto", None)
+    if proto is not None:
+        count, size = 1, proto.ByteSize()
+    for child in getattr(node, "children", {}).values():
+        child_count, child_size = payload(child)
+        count += child_count
+        size += child_size
+    return count, size
+
+
+def measure(script, *args):
+    app = AppTest.from_function(script, args=args, default_timeout=120)
+    app.run()
+    start = time.perf_counter()
+    for _ in range(RERUNS):
+        app.run()
+    elapsed = (time.perf_counter() - start) / RERUNS
+    assert not app.exception, app.exception
+    return payload(app._tree) + (elapsed,)
+
+
+if __name__ == "__main__":
+    sys.path.insert(0, ROOT)
+    from catalog import load_catalog
+
+    catalog = load_catalog()
+    salads = catalog.items(catalog.filter("Salads"))
+    large = catalog.items(range(len(catalog)))
+    for label, items in [("Salads", salads), ("one large category", large)]:
+        print(f"{label}: {len(items)} items")
+        for mode, script, args in [("per-item buttons", per_item_buttons, (items,)),
+                                   ("paged data_editor", table_page, (items, PAGE_SIZE))]:
+            count, size, elapsed = measure(script, *args)
+            print(f"    {mode:<18} {count:5} elements {size / 1024:9.1f} KiB  rerun {elapsed * 1e3:8.1f} ms")
@@ -0,0 +1,113 @@
+# Benchmark: View Menu rerun latency for a realistic session mix, with and
+# without MenuStore's shared view cache, at the real menu size and a synthetic
+# 100k-item menu. Each simulated session reruns the page 30 times; most reruns
+# come from unrelated widgets (sidebar, paging, ticking rows) and keep the
+# same view, the rest switch to a popular category, toggle a restriction or
+# type one of a few popular searches (spelled with varying case and spacing).
+# A rerun's cost here is computing the view plus building its first page
+# table; reports latency percentiles and the cache hit rate, next to what the
+# app did before (recompute, then build a row tuple for every match).
+#
+#     python benchmarks/bench_menu_views.py [sessions]
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from catalog import read_menu
+from menu_store import MenuStore
+
+RERUNS = 30
+PAGE = 25
+RESTRICTIONS = [[], [], [], ["Vegetarian"], ["Vegan"], ["Gluten-Free"], ["Vegetarian", "Gluten-Free"]]
+QUERIES = ["salad", "Salad ", "quinoa", "QUINOA", "soup", "chicken", " spicy  chicken", "pizza"]
+
+
+def synthetic_menu(size):
+    categories, base = read_menu()
+    items = [dict(base[i % len(base)], id=i + 1, name=f"{base[i % len(base)]['name']} #{i}") for i in range(size)]
+    return categories, items
+
+
+# Per session, the (category, restrictions, query) view shown on each rerun
+def session_mix(categories, sessions, seed=0):
+    rng = random.Random(seed)
+    weights = [1 / (rank + 1) for rank in range(len(categories))]  # a few categories get most visits
+    mix = []
+    for _ in range(sessions):
+        view = (rng.choices(categories, weights)[0], rng.choice(RESTRICTIONS), None)
+        views = []
+        for _ in range(RERUNS):
+            roll = rng.random()
+            if roll < 0.15:
+                view = (rng.choices(categories, weights)[0], view[1], None)
+            elif roll < 0.25:
+                view = (view[0], rng.choice(RESTRICTIONS), view[2])
+            elif roll < 0.32:
+                view = (view[0], view[1], rng.choice(QUERIES))
+            elif roll < 0.35:
+                view = (view[0], view[1], None)
+            views.append(view)
+        mix.append(views)
+    return mix
+
+
+# The app used to build a tuple for every matching row, then slice out the page
+def first_page_of_all(catalog, rows):
+    matches = [(catalog.ids[row], catalog.names[row], catalog.tags[row], catalog.row_categories[row]) for row in rows]
+    return pd.DataFrame({"Item": [name for _, name, _, _ in matches[:PAGE]],
+                         "Tags": [", ".join(tags) for _, _, tags, _ in matches[:PAGE]]})
+
+
+def first_page(catalog, rows):
+    rows = rows[:PAGE]
+    return pd.DataFrame({"Item": [catalog.names[row] for row in rows],
+                         "Tags": [", ".join(catalog.tags[row]) for row in rows]})
+
+
+def run(label, store, sessions):
+    catalog, index = store.snapshot()
+    mix = session_mix(catalog.category_names(), sessions)
+    results = {}
+    for mode in ("previous app", "recompute every rerun", "shared view cache"):
+        cached = mode == "shared view cache"
+        store.views.clear()
+        store.views.hits = store.views.misses = 0
+        latencies = []
+        for views in mix:
+            for category, restrictions, query in views:
+                start = time.perf_counter()
+                if cached:
+                    rows = store.view(catalog, index, category, restrictions, query)
+                elif query is not None:
+                    rows = index.search(query, catalog.matches(restrictions))
+                else:
+                    rows = catalog.filter(category, restrictions)
+                (first_page_of_all if mode == "previous app" else first_page)(catalog, rows)
+                latencies.append(time.perf_counter() - start)
+        results[mode] = np.array(latencies) * 1e3
+    lookups = store.views.hits + store.views.misses
+    print(f"{label}: {len(catalog)} items, {sessions} sessions x {RERUNS} reruns")
+    for mode, latencies in results.items():
+        print(f"    {mode:<22}"
+              f" p50 {np.percentile(latencies, 50):7.3f} ms  p95 {np.percentile(latencies, 95):7.3f} ms"
+              f"  p99 {np.percentile(latencies, 99):7.3f} ms")
+    print(f"    hit rate {store.views.hits / lookups:.1%}, {len(store.views)} views cached")
+
+
+if __name__ == "__main__":
+    sessions = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    run("real menu", MenuStore(), sessions)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "menu.json")
+        categories, items = synthetic_menu(100_000)
+        with open(path, "w") as f:
+            json.dump({"categories": categories, "items": items}, f)
+        run("100k", MenuStore(path), sessions)
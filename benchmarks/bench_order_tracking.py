@@ -0,0 +1,46 @@
+# Benchmark: track many concurrent orders with the background OrderTracker.
+# The old Track Order page slept 2s per stage in the script thread, so every
+# viewer pinned a server thread for 12s; here all orders share one thread.
+#
+#     python benchmarks/bench_order_tracking.py [orders]
+import os
+import sys
+import tempfile
+import threading
+import time
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from migrations import ensure_schema
+from orders import DELIVERED, ORDER_STATUS, OrderTracker
+
+STAGE_SECONDS = 0.2
+
+
+if __name__ == "__main__":
+    orders = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    os.chdir(tempfile.mkdtemp())
+    ensure_schema()
+    tracker = OrderTracker(stage_seconds=STAGE_SECONDS)
+    tracker.start()
+    threads_before = threading.active_count()
+
+    start = time.perf_counter()
+    ids = [tracker.place(f"user{i % 500}", ["Caesar Salad"]) for i in range(orders)]
+    placed = time.perf_counter() - start
+
+    lookup = min(timeit.repeat(lambda: tracker.status(ids[-1]), number=10_000, repeat=3)) / 10_000
+    while tracker.status(ids[-1]) != DELIVERED:
+        time.sleep(0.01)
+    done = time.perf_counter() - start
+    assert all(tracker.status(order_id) == DELIVERED for order_id in ids)
+    tracker.stop()
+
+    ideal = STAGE_SECONDS * (len(ORDER_STATUS) - 1)
+    print(f"{orders} orders, {STAGE_SECONDS}s per stage")
+    print(f"place         : {placed:.3f}s ({orders / placed:,.0f} orders/s)")
+    print(f"status lookup : {lookup * 1e6:.2f} us")
+    print(f"all delivered : {done:.3f}s (ideal {ideal + placed:.3f}s)")
+    print(f"threads       : {threads_before} while tracking {orders} orders"
+          f" (sleep loop: one per viewer, held {len(ORDER_STATUS) * 2}s each)")
@@ -0,0 +1,85 @@
+# Benchmark: a burst of 500 concurrent logins against scrypt hashes, with the
+# hash pool at several sizes. Each login runs on its own thread, as Streamlit
+# sessions do; reports logins/s, latency percentiles and how long a cheap
+# request (a pooled query) waits while the burst is in flight. Also checks that
+# legacy SHA-256 hashes are upgraded on the first successful login. Login rate
+# limits are lifted so only hashing is measured.
+#
+#     python benchmarks/bench_password_hashing.py [logins]
+import os
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import auth
+import passwords
+from db import APP_DB, get_pool
+from migrations import ensure_schema
+from passwords import algorithm_of, hash_password
+from ratelimit import TokenBucketLimiter
+
+USERS = 100
+
+
+def burst(logins, workers):
+    passwords._pool = None
+    passwords.HASH_WORKERS = workers
+    latencies = []
+
+    def login(i):
+        start = time.perf_counter()
+        role = auth.authenticate_user(f"user{i % USERS}", "secret")
+        latencies.append(time.perf_counter() - start)
+        return role
+
+    # Meanwhile another session runs a cheap query every 50 ms
+    stalls, done = [], threading.Event()
+
+    def other_session():
+        while not done.is_set():
+            start = time.perf_counter()
+            auth.get_user_role("user0")
+            stalls.append(time.perf_counter() - start)
+            time.sleep(0.05)
+
+    watcher = threading.Thread(target=other_session)
+    watcher.start()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(logins) as sessions:
+        roles = list(sessions.map(login, range(logins)))
+    elapsed = time.perf_counter() - start
+    done.set()
+    watcher.join()
+    assert all(role == 'user' for role in roles)
+    latencies = np.array(latencies) * 1e3
+    stalls = np.array(stalls) * 1e3
+    print(f"    {workers} hash workers: {logins / elapsed:6.1f} logins/s  latency p50 {np.percentile(latencies, 50):7.0f}"
+          f" ms p99 {np.percentile(latencies, 99):7.0f} ms  other session query max {stalls.max():6.1f} ms")
+
+
+if __name__ == "__main__":
+    logins = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    auth.USER_LIMITER = TokenBucketLimiter(rate=0, burst=float('inf'))
+    os.chdir(tempfile.mkdtemp())
+    ensure_schema()
+    with get_pool(APP_DB).connection() as conn:
+        conn.executemany('INSERT INTO users (username, password, role) VALUES (?, ?, ?)',
+                         [(f"user{i}", hash_password("secret", 'sha256'), 'user') for i in range(USERS)])
+
+    # The first login of each legacy user verifies SHA-256 and stores a scrypt hash
+    for i in range(USERS):
+        assert auth.authenticate_user(f"user{i}", "secret") == 'user'
+    with get_pool(APP_DB).connection() as conn:
+        algorithms = {algorithm_of(row[0]) for row in conn.execute("SELECT password FROM users WHERE role = 'user'")}
+    assert algorithms == {'scrypt'}, algorithms
+    assert auth.authenticate_user("user0", "wrong") is None
+
+    print(f"{logins} concurrent logins, scrypt n=2^14 r=8 p=1, {os.cpu_count()} CPU(s)")
+    for workers in (1, 2, 4, 8):
+        burst(logins, workers)
@@ -0,0 +1,103 @@
+# Benchmark: "goes well with" recommendations over a synthetic order history
+# (benchmarks/gen_orders.py, default 1M orders) plus random favorites. Reports
+# the first full build of the co-occurrence counts and ranked lists, an
+# incremental refresh after a few new orders, peak memory of the build, and
+# serving latency for carts of one to four items with and without
+# restrictions, against answering a one-item cart with a co-occurrence query
+# over order_items as it is asked.
+#
+#     python benchmarks/bench_recommendations.py [orders]
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from gen_orders import generate_orders
+from menu_store import MenuStore
+from migrations import ensure_schema
+from recommendations import Recommender
+from storage import SqliteStorage
+
+USERS = 10_000
+FAVORITES = 8
+RESTRICTIONS = [(), ("Vegan",), ("Vegetarian", "Gluten-Free")]
+QUERIES = 2_000
+CO_ORDERED = ('SELECT b.item, COUNT(*) FROM order_items a JOIN order_items b'
+              ' ON b.order_id = a.order_id AND b.item <> a.item WHERE a.item = ?'
+              ' GROUP BY b.item ORDER BY COUNT(*) DESC LIMIT 5')
+
+
+def add_favorites(storage, catalog, seed=0):
+    rng = random.Random(seed)
+    ids = catalog.ids.tolist()
+    for user in range(USERS):
+        storage.add_favorites(f"user{user}", rng.sample(ids, rng.randint(1, FAVORITES)))
+
+
+def percentiles(timings):
+    return "  ".join(f"p{q} {np.percentile(timings, q) * 1e3:7.3f} ms" for q in (50, 95, 99))
+
+
+def serving(recommender, catalog, restrictions, seed=0):
+    rng = random.Random(seed)
+    ids = catalog.ids.tolist()
+    timings = []
+    for _ in range(QUERIES):
+        cart = rng.sample(ids, rng.randint(1, 4))
+        start = time.perf_counter()
+        recommender.goes_with(catalog, cart, restrictions)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    os.chdir(tempfile.mkdtemp())
+    ensure_schema()
+    start = time.perf_counter()
+    generate_orders(count, USERS)
+    print(f"generated {count} orders in {time.perf_counter() - start:.1f}s")
+    storage = SqliteStorage()
+    store = MenuStore()
+    catalog, _ = store.snapshot()
+    add_favorites(storage, catalog)
+
+    recommender = Recommender(storage, store)
+    start = time.perf_counter()
+    recommender.refresh()
+    build = time.perf_counter() - start
+    pairs = len(recommender._counts[0])
+    # Traced separately: tracing slows the build down several times
+    tracemalloc.start()
+    Recommender(storage, store).refresh()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    print(f"  full build              {build:8.2f} s   {pairs} item pairs, peak {peak / 2 ** 20:.0f} MiB traced")
+
+    generate_orders(1_000, USERS, seed=1)
+    start = time.perf_counter()
+    recommender.refresh()
+    print(f"  refresh, 1k new orders  {time.perf_counter() - start:8.2f} s")
+    start = time.perf_counter()
+    recommender.refresh()
+    print(f"  refresh, nothing new    {time.perf_counter() - start:8.2f} s")
+
+    for restrictions in RESTRICTIONS:
+        label = ", ".join(restrictions) or "no restriction"
+        print(f"  serve, {label:<24} {percentiles(serving(recommender, catalog, restrictions))}")
+
+    names = catalog.names
+    timings = []
+    with storage._connection(readonly=True) as conn:
+        for name in random.Random(0).sample(names, 10):
+            start = time.perf_counter()
+            conn.execute(CO_ORDERED, (name,)).fetchall()
+            timings.append(time.perf_counter() - start)
+    print(f"  co-occurrence query per one-item cart   {percentiles(timings)}")
@@ -0,0 +1,57 @@
+# Benchmark: global menu search. Compares the old per-category substring scan
+# (re-lowercasing every name per keystroke) with MenuSearchIndex over the real
+# menu and over a synthetic catalog of 1M dish names.
+#
+#     python benchmarks/bench_search.py [size]
+import os
+import random
+import sys
+import time
+import timeit
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from catalog import load_catalog
+from search import MenuSearchIndex
+
+STYLES = ("Classic Spicy Smoky Creamy Roasted Grilled Baked Crispy Zesty Garlic Herb Lemon Honey Chili "
+          "Sesame Tandoori Cajun Mediterranean Thai Korean Mexican Tuscan Rustic Golden Wild Fresh "
+          "Summer Winter Harvest Garden Farmhouse Coastal Street Signature Homestyle Mini Jumbo Double").split()
+SIZES = "Bowl Plate Platter Wrap Special Combo Bites Deluxe Lite Box".split()
+QUERIES = ["qui", "quinoa salad", "ceasar salad", "choclate lava cake", "spicy grilled chiken", "lentl soup"]
+
+
+def synthetic_names(size, seed=0):
+    rng = random.Random(seed)
+    base = sorted(load_catalog().names)
+    return [f"{rng.choice(STYLES)} {rng.choice(base)} {rng.choice(SIZES)}" for _ in range(size)]
+
+
+def substring_scan(names, query):
+    query = query.lower()
+    return [row for row, name in enumerate(names) if query in name.lower()]
+
+
+def run(label, names):
+    start = time.perf_counter()
+    index = MenuSearchIndex(names)
+    built = time.perf_counter() - start
+    allowed = np.random.default_rng(0).random(len(names)) < 0.3
+    print(f"{label}: {len(names)} names, index built in {built:.2f}s")
+    for query in QUERIES:
+        number = 200 if len(names) < 10_000 else 20
+        indexed = min(timeit.repeat(lambda: index.search(query), number=number, repeat=3)) / number
+        filtered = min(timeit.repeat(lambda: index.search(query, allowed), number=number, repeat=3)) / number
+        scan = min(timeit.repeat(lambda: substring_scan(names, query), number=max(1, number // 10), repeat=3))
+        scan /= max(1, number // 10)
+        top = names[index.search(query, limit=1)[0]] if len(index.search(query, limit=1)) else "-"
+        print(f"    {query!r:24} index {indexed * 1e3:7.3f} ms  +restriction {filtered * 1e3:7.3f} ms"
+              f"  substring scan {scan * 1e3:8.2f} ms  top: {top}")
+
+
+if __name__ == "__main__":
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    run("real menu", load_catalog().names)
+    run("synthetic", synthetic_names(size))
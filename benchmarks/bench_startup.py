@@ -0,0 +1,53 @@
+# Benchmark: per-rerun schema cost. Before, every script run executed
+# init_db() + setup_sample_admin() (a CREATE TABLE and a SELECT/INSERT on
+# fresh connections); now ensure_schema() migrates once per process and is a
+# flag check afterwards.
+#
+#     python benchmarks/bench_startup.py
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from auth import hash_password
+from migrations import ensure_schema
+
+RERUNS = 2000
+
+
+# What app.py ran at the top of every rerun before migrations
+def legacy_setup():
+    conn = sqlite3.connect('users.db')
+    c = conn.cursor()
+    c.execute('''CREATE TABLE IF NOT EXISTS users
+                 (username TEXT PRIMARY KEY, password TEXT, role TEXT)''')
+    conn.commit()
+    conn.close()
+    conn = sqlite3.connect('users.db')
+    c = conn.cursor()
+    c.execute('SELECT * FROM users WHERE username = ?', ('admin',))
+    if not c.fetchone():
+        c.execute('INSERT INTO users (username, password, role) VALUES (?, ?, ?)',
+                  ('admin', hash_password('admin123'), 'admin'))
+        conn.commit()
+    conn.close()
+
+
+if __name__ == "__main__":
+    os.chdir(tempfile.mkdtemp())
+    legacy_setup()
+    before = min(timeit.repeat(legacy_setup, number=RERUNS, repeat=3)) / RERUNS
+
+    os.chdir(tempfile.mkdtemp())
+    start = time.perf_counter()
+    ensure_schema()
+    first = time.perf_counter() - start
+    after = min(timeit.repeat(ensure_schema, number=RERUNS, repeat=3)) / RERUNS
+
+    print(f"legacy setup per rerun      : {before * 1e6:10.1f} us")
+    print(f"ensure_schema, first call   : {first * 1e6:10.1f} us (once per process)")
+    print(f"ensure_schema, later reruns : {after * 1e6:10.3f} us")
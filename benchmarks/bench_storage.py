@@ -0,0 +1,53 @@
+# Benchmark: per-operation cost of each storage backend. Runs the same mix
+# (user lookup, feedback page and search, order insert and page, cart write and
+# load, favorites read) against SqliteStorage and PostgresStorage over the
+# local stand-in, plus a real server when a postgresql:// URL is given. The
+# stand-in row measures the adapter's own overhead (placeholder translation,
+# prepared-statement bookkeeping), not a network round trip.
+#
+#     python benchmarks/bench_storage.py [postgresql://user@host/db]
+import os
+import sys
+import tempfile
+import time
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db import close_pools
+from storage import SqliteStorage, open_storage
+
+ROWS = 20_000
+
+
+def run(label, storage):
+    storage.migrate()
+    now = time.time()
+    storage.add_feedback([(f"user{i % 500}", f"Order {i}: the soup was great", now) for i in range(ROWS)])
+    for i in range(200):
+        storage.add_order(f"user{i % 50}", {"Tomato Soup": 2, "Caesar Salad": 1}, now + i)
+    storage.add_favorites("user1", range(50))
+    cart = [("user1", item_id, 2) for item_id in range(20)]
+    ops = {
+        "find_user": lambda: storage.find_user("admin"),
+        "feedback_page": lambda: storage.feedback_page(limit=51),
+        "feedback search": lambda: storage.feedback_page(limit=51, query="soup gre"),
+        "add_order": lambda: storage.add_order("user1", {"Tomato Soup": 1}, time.time()),
+        "order_page": lambda: storage.order_page(limit=21),
+        "save_cart_entries": lambda: storage.save_cart_entries(cart),
+        "load_cart": lambda: storage.load_cart("user1"),
+        "favorites": lambda: storage.favorites("user1"),
+    }
+    print(f"  {label}")
+    for name, op in ops.items():
+        per_op = min(timeit.repeat(op, number=100, repeat=3)) / 100
+        print(f"    {name:<18} {per_op * 1e6:9.1f} us")
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as tmp:
+        run("SqliteStorage", SqliteStorage(os.path.join(tmp, "app.db")))
+        run("PostgresStorage over the stand-in", open_storage("standin:" + os.path.join(tmp, "server.db")))
+        if len(sys.argv) > 1:
+            run("PostgresStorage", open_storage(sys.argv[1]))
+        close_pools()
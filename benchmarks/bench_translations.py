@@ -0,0 +1,97 @@
+# Benchmark: menu translation cost, cold and warm. Uses the offline
+# LocalBackend with `latency` seconds per request (default 0.3) standing in for
+# a Google Translate round trip, so the numbers show request counts and cache
+# behaviour rather than Google's speed. Reports a locale's first lookup with
+# an empty cache (one batched pass over every menu string), the first lookup
+# in a new process with the translations already stored, the per-rerun cost
+# once warm, a menu edit (only changed strings are sent), and the View Menu
+# rerun through AppTest when switching to a language for the first time and
+# back and forth afterwards.
+#
+#     python benchmarks/bench_translations.py [latency]
+import os
+import sys
+import tempfile
+import time
+import timeit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from streamlit.testing.v1 import AppTest
+
+import translations
+from catalog import load_catalog, read_menu
+from storage import SqliteStorage
+from translations import LocalBackend, MenuTranslator, menu_strings
+
+
+def timed_lookup(translator, catalog, locale):
+    start = time.perf_counter()
+    translator.table(catalog, locale)
+    return time.perf_counter() - start
+
+
+def run_translator(latency):
+    db = SqliteStorage()
+    db.migrate()
+    catalog = load_catalog()
+    strings = len(menu_strings(catalog))
+    print(f"  {strings} menu strings, {latency * 1e3:.0f} ms per backend request")
+    print(f"    one request per string would be {strings} requests, {strings * latency:.1f}s per locale")
+
+    backend = LocalBackend(latency)
+    cold = timed_lookup(MenuTranslator(db, backend), catalog, 'es')
+    print(f"    cold (empty cache)       {cold * 1e3:9.1f} ms  {backend.requests} batched requests")
+
+    backend = LocalBackend(latency)
+    translator = MenuTranslator(db, backend)
+    stored = timed_lookup(translator, catalog, 'es')
+    print(f"    new process, stored      {stored * 1e3:9.1f} ms  {backend.requests} requests")
+    warm = min(timeit.repeat(lambda: translator.table(catalog, 'es'), number=10_000, repeat=3)) / 10_000
+    print(f"    warm, per rerun          {warm * 1e6:9.2f} us  {backend.requests} requests")
+
+    categories, items = read_menu()
+    for item in items[:10]:
+        item["name"] += " Deluxe"
+    edited = catalog.updated(categories, [], items[:10], [])
+    edit = timed_lookup(translator, edited, 'es')
+    print(f"    menu edit, 10 renames    {edit * 1e3:9.1f} ms  {backend.requests} request(s)")
+
+
+def menu_session():
+    at = AppTest.from_file(os.path.join(ROOT, "app.py"), default_timeout=60).run()
+    [button for button in at.button if button.label == "Go to Register"][0].click().run()
+    at.run()
+    at.text_input[0].input("bench")
+    at.text_input[1].input("bench")
+    [button for button in at.button if button.label == "Register"][0].click().run()
+    at = AppTest.from_file(os.path.join(ROOT, "app.py"), default_timeout=60).run()
+    at.text_input[0].input("bench")
+    at.text_input[1].input("bench")
+    [button for button in at.button if button.label == "Login"][0].click().run()
+    at.run()
+    at.sidebar.selectbox[0].select("View Menu").run()
+    return at
+
+
+def switch(at, language):
+    start = time.perf_counter()
+    at.sidebar.selectbox[1].select(language).run()
+    assert not at.exception, at.exception
+    return time.perf_counter() - start
+
+
+def run_app(latency):
+    translations._translator = MenuTranslator(backend=LocalBackend(latency))
+    at = menu_session()
+    cold = switch(at, "Français")
+    warm = min(switch(at, language) for _ in range(5) for language in ("English", "Français"))
+    print(f"  View Menu language switch: first time {cold * 1e3:.1f} ms, afterwards {warm * 1e3:.1f} ms")
+
+
+if __name__ == "__main__":
+    latency = float(sys.argv[1]) if len(sys.argv) > 1 else 0.3
+    os.chdir(tempfile.mkdtemp())
+    run_translator(latency)
+    run_app(latency)
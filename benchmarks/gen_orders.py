@@ -0,0 +1,45 @@
+# Synthetic order history for benchmarks: delivered orders spread over the past
+# year, each with one to four menu items.
+#
+#     python benchmarks/gen_orders.py 1000000   (writes into ./app.db)
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from catalog import load_catalog
+from db import APP_DB, get_pool
+from migrations import ensure_schema
+from orders import DELIVERED
+
+CHUNK = 50_000
+YEAR = 365 * 24 * 3600
+
+
+def generate_orders(count, users=10_000, path=APP_DB, seed=0):
+    rng = random.Random(seed)
+    names = sorted(load_catalog().names)
+    now = time.time()
+    with get_pool(path).connection() as conn:
+        next_id = conn.execute('SELECT COALESCE(MAX(id), 0) + 1 FROM orders').fetchone()[0]
+    for start in range(0, count, CHUNK):
+        orders, items = [], []
+        for order_id in range(next_id + start, next_id + min(start + CHUNK, count)):
+            created = now - rng.random() * YEAR
+            orders.append((order_id, f"user{rng.randrange(users)}", DELIVERED, created, created))
+            for item in rng.sample(names, rng.randint(1, 4)):
+                items.append((order_id, item, rng.randint(1, 3)))
+        with get_pool(path).connection() as conn:
+            conn.executemany('INSERT INTO orders (id, username, status, created_at, updated_at) VALUES (?, ?, ?, ?, ?)',
+                             orders)
+            conn.executemany('INSERT INTO order_items (order_id, item, quantity) VALUES (?, ?, ?)', items)
+
+
+if __name__ == "__main__":
+    ensure_schema()
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    start = time.perf_counter()
+    generate_orders(count)
+    print(f"generated {count} orders in {time.perf_counter() - start:.1f}s")
@@ -0,0 +1,166 @@
+import atexit
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from storage import get_storage
+from writebehind import WriteBehind
+
+# Longest a cart change waits in memory before it is written
+FLUSH_SECONDS = 1.0
+# Pending changes that trigger a write without waiting for FLUSH_SECONDS
+FLUSH_BATCH = 500
+# Seconds a cart with nothing left to write stays in memory after its last use
+IDLE_SECONDS = 1800.0
+# Carts kept in memory at most; the least recently used clean ones go first
+MAX_CARTS = 10_000
+
+# Shared by every loaded cart that is empty, so browsing sessions cost no dict each
+_EMPTY = {}
+
+
+# Shopping carts for every logged-in user, kept in memory as {item_id: quantity}
+# and written behind to the carts table. Adding to a cart is a dict update plus
+# marking (username, item_id) dirty; the WriteBehind thread writes all dirty
+# entries in a single transaction once FLUSH_BATCH have piled up or the oldest
+# is FLUSH_SECONDS old, so a burst of clicks costs one commit, not one each.
+# Sessions that end without logging out never release their cart, so carts
+# are kept in least recently used order: whenever a cart is loaded or a write
+# lands, clean ones idle for `idle_seconds` (or beyond `max_carts`) are
+# dropped, and are read from the database again on their next use.
+class CartStore(WriteBehind):
+    def __init__(self, storage=None, flush_seconds=FLUSH_SECONDS, batch_size=FLUSH_BATCH, idle_seconds=IDLE_SECONDS,
+                 max_carts=MAX_CARTS):
+        super().__init__("cart-writer", flush_seconds, batch_size)
+        self.storage = storage or get_storage()
+        self.idle_seconds = idle_seconds
+        self.max_carts = max_carts
+        self._carts = OrderedDict()
+        self._used = {}
+        self._dirty = set()
+        # Users in the batch being written, kept in memory until the write is done
+        self._writing = set()
+
+    # {item_id: quantity} for a user, read from the database on first use (at login)
+    def get(self, username):
+        with self._editing(username, copy=True) as cart:
+            return cart
+
+    def add(self, username, item_id, quantity=1):
+        with self._editing(username) as cart:
+            self._mark(username, item_id)
+            cart[item_id] = cart.get(item_id, 0) + quantity
+
+    # Set an item's quantity; 0 removes it
+    def set_quantity(self, username, item_id, quantity):
+        with self._editing(username) as cart:
+            self._mark(username, item_id)
+            if quantity > 0:
+                cart[item_id] = quantity
+            else:
+                cart.pop(item_id, None)
+
+    def clear(self, username):
+        with self._editing(username) as cart:
+            for item_id in cart:
+                self._mark(username, item_id)
+            self._carts[username] = _EMPTY
+
+    # Persist a user's pending changes and drop their cart from memory (on logout).
+    # If the write fails the cart stays in memory and the writer retries it.
+    def release(self, username):
+        try:
+            self.flush()
+        except Exception:
+            pass
+        with self._cond:
+            if not any(user == username for user, _ in self._dirty):
+                self._carts.pop(username, None)
+                self._used.pop(username, None)
+
+    # Hold the lock over the user's cart, loading it from the database first if
+    # needed. Yields the user's own dict to change, or a copy with `copy=True`.
+    @contextmanager
+    def _editing(self, username, copy=False):
+        while True:
+            if username not in self._carts:
+                rows = self.storage.load_cart(username)
+                with self._cond:
+                    # Another session may have loaded and changed it meanwhile; keep that copy
+                    self._carts.setdefault(username, dict(rows) if rows else _EMPTY)
+                    self._used[username] = time.monotonic()
+                    self._evict(keep=username)
+            with self._cond:
+                cart = self._carts.get(username)
+                # None if released or evicted between loading and locking: load it again
+                if cart is not None:
+                    self._carts.move_to_end(username)
+                    self._used[username] = time.monotonic()
+                    if cart is _EMPTY and not copy:
+                        cart = self._carts[username] = {}
+                    yield dict(cart) if copy else cart
+                    return
+
+    # Drop clean carts from the least recently used end while they are idle or
+    # over max_carts, sparing `keep`; caller holds self._cond
+    def _evict(self, keep=None):
+        busy = {username for username, _ in self._dirty} | self._writing
+        idle_since = time.monotonic() - self.idle_seconds
+        excess = len(self._carts) - self.max_carts
+        evicted = []
+        for username in self._carts:
+            if excess <= 0 and self._used[username] > idle_since:
+                break
+            if username != keep and username not in busy:
+                evicted.append(username)
+                excess -= 1
+        for username in evicted:
+            del self._carts[username], self._used[username]
+
+    # Caller holds self._cond
+    def _mark(self, username, item_id):
+        self._dirty.add((username, item_id))
+        self._queued()
+
+    def _size(self):
+        return len(self._dirty)
+
+    # The dirty entries as (username, item_id, quantity) rows, quantity 0 for removed ones
+    def _take(self):
+        dirty, self._dirty = self._dirty, set()
+        self._writing = {username for username, _ in dirty}
+        return [(username, item_id, self._carts.get(username, {}).get(item_id, 0)) for username, item_id in dirty]
+
+    # Mark the entries dirty again; their quantities are read afresh at the next write
+    def _restore(self, rows):
+        self._dirty.update((username, item_id) for username, item_id, _ in rows)
+
+    def _write(self, rows):
+        self.storage.save_cart_entries(rows)
+        return len(rows)
+
+    # The written carts may be clean now, and evictable
+    def _done(self, rows):
+        self._writing = set()
+        self._evict()
+
+    def _failed(self, rows, error):
+        self._writing = set()
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+# Process-wide cart store, started on first use and flushed at interpreter exit
+def get_cart_store():
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                store = CartStore()
+                store.start()
+                atexit.register(store.stop)
+                _store = store
+    return _store
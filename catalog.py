@@ -0,0 +1,226 @@
+import copy
+import json
+import os
+
+import numpy as np
+
+# Menu data file: category order plus one entry per dish with a stable id
+MENU_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'menu.json')
+
+# Dietary restrictions offered on the ordering page; each maps to a lower-case menu tag
+DIETARY_RESTRICTIONS = ["Vegan", "Vegetarian", "Gluten-Free", "Dairy-Free", "Low-Sugar", "Low-Sodium", "High-Protein"]
+
+# Every tag a menu item may carry; each one owns the bit at its position
+TAG_VOCABULARY = [
+    "vegan", "vegetarian", "gluten-free", "dairy-free", "low-sugar", "low-sodium", "high-protein",
+    "high-fiber", "rich in omega-3", "contains gluten", "contains dairy", "contains nuts", "contains soy",
+]
+TAG_BITS = {tag: 1 << bit for bit, tag in enumerate(TAG_VOCABULARY)}
+
+# Nutrition figures an item may carry, per serving: kcal, grams of protein,
+# carbs and sugar, milligrams of sodium. Each is a column of MenuCatalog.nutrition.
+NUTRIENTS = ("calories", "protein", "carbs", "sugar", "sodium")
+
+_no_rows = np.empty(0, dtype=np.int32)
+
+
+# Normalize a tag or restriction label to the form used as an index key
+def normalize_tag(tag):
+    return tag.strip().lower()
+
+
+def _item_tags(item):
+    return tuple(normalize_tag(tag) for tag in item.get("tags", ()))
+
+
+# An item's nutrition figures in NUTRIENTS order, NaN when it has none
+def _item_nutrition(item):
+    nutrition = item.get("nutrition")
+    if nutrition is None:
+        return (np.nan,) * len(NUTRIENTS)
+    return tuple(float(nutrition[nutrient]) for nutrient in NUTRIENTS)
+
+
+# Check a parsed menu file and return (categories, items); raises ValueError on the first problem
+def validate_menu(data):
+    categories = data.get("categories")
+    items = data.get("items")
+    if not isinstance(categories, list) or not isinstance(items, list):
+        raise ValueError("Menu needs a 'categories' list and an 'items' list")
+    known_categories = set(categories)
+    if len(known_categories) != len(categories):
+        raise ValueError("Menu lists a category more than once")
+    ids, names = set(), set()
+    for item in items:
+        item_id, name = item.get("id"), item.get("name")
+        if not isinstance(item_id, int) or not isinstance(name, str) or not name:
+            raise ValueError(f"Menu item needs an integer 'id' and a 'name': {item!r}")
+        if item_id in ids:
+            raise ValueError(f"Duplicate menu item id {item_id}")
+        if name.lower() in names:
+            raise ValueError(f"Duplicate menu item {name!r}")
+        ids.add(item_id)
+        names.add(name.lower())
+        for tag in item.get("tags", []):
+            if normalize_tag(tag) not in TAG_BITS:
+                raise ValueError(f"Unknown tag {tag!r} on {name!r}")
+        nutrition = item.get("nutrition")
+        if nutrition is not None and (
+                not isinstance(nutrition, dict) or set(nutrition) != set(NUTRIENTS)
+                or not all(isinstance(value, (int, float)) and value >= 0 for value in nutrition.values())):
+            raise ValueError(f"Nutrition of {name!r} needs a non-negative number for each of "
+                             f"{', '.join(NUTRIENTS)}")
+        if not item.get("categories"):
+            raise ValueError(f"{name!r} is not in any category")
+        for category in item["categories"]:
+            if category not in known_categories:
+                raise ValueError(f"Unknown category {category!r} on {name!r}")
+    return categories, items
+
+
+# Read-only menu catalog.
+# Each dish is one row; its tags are stored as a uint64 bitmask over
+# TAG_VOCABULARY, and each category is an array of row numbers (a dish can sit
+# in several), so filtering a category by any combination of restrictions is a
+# single vectorized AND/compare. Nutrition is a (rows x NUTRIENTS) float32
+# array, NaN for dishes without figures.
+class MenuCatalog:
+    def __init__(self, categories, items, version=1):
+        self.version = version
+        self.ids = np.array([item["id"] for item in items], dtype=np.int32)
+        self.rows_by_id = {item["id"]: row for row, item in enumerate(items)}
+        self.names = [item["name"] for item in items]
+        self.tags = [_item_tags(item) for item in items]
+        self.row_categories = [tuple(item["categories"]) for item in items]
+        self.masks = np.array([self.mask_for(tags) for tags in self.tags], dtype=np.uint64)
+        self.nutrition = np.array([_item_nutrition(item) for item in items],
+                                  dtype=np.float32).reshape(-1, len(NUTRIENTS))
+        # Rows of removed items stay in place (dead) until the catalog is rebuilt
+        self.live = np.ones(len(items), dtype=bool)
+        self.dead = 0
+        members = {category: [] for category in categories}
+        for row, item_categories in enumerate(self.row_categories):
+            for category in item_categories:
+                members[category].append(row)
+        self.categories = {category: np.array(rows, dtype=np.int32) for category, rows in members.items()}
+
+    # A new catalog (version + 1) with a diff applied; this one is left untouched.
+    # `added` and `changed` are item dicts, `removed` a list of ids. Changed items
+    # keep their row, added ones get new rows at the end and removed ones are
+    # only marked dead, so row numbers held by indexes stay valid.
+    def updated(self, categories, added, changed, removed):
+        new = copy.copy(self)
+        new.version = self.version + 1
+        new.names = self.names + [item["name"] for item in added]
+        new.tags = self.tags + [()] * len(added)
+        new.row_categories = self.row_categories + [()] * len(added)
+        new.rows_by_id = dict(self.rows_by_id)
+        new.rows_by_id.update((item["id"], len(self.names) + offset) for offset, item in enumerate(added))
+        new.ids = np.concatenate([self.ids, np.array([item["id"] for item in added], dtype=np.int32)])
+        new.masks = np.concatenate([self.masks, np.zeros(len(added), dtype=np.uint64)])
+        new.nutrition = np.concatenate([self.nutrition, np.full((len(added), len(NUTRIENTS)), np.nan, np.float32)])
+        new.live = np.concatenate([self.live, np.ones(len(added), dtype=bool)])
+        new.dead = self.dead + len(removed)
+        leaving, joining = {}, {}
+        for item_id in removed:
+            row = new.rows_by_id.pop(item_id)
+            new.live[row] = False
+            for category in new.row_categories[row]:
+                leaving.setdefault(category, []).append(row)
+        for item in changed + added:
+            row = new.rows_by_id[item["id"]]
+            before, after = set(new.row_categories[row]), set(item["categories"])
+            for category in before - after:
+                leaving.setdefault(category, []).append(row)
+            for category in after - before:
+                joining.setdefault(category, []).append(row)
+            new.names[row] = item["name"]
+            new.tags[row] = _item_tags(item)
+            new.row_categories[row] = tuple(item["categories"])
+            new.masks[row] = self.mask_for(new.tags[row])
+            new.nutrition[row] = _item_nutrition(item)
+        new.categories = {}
+        for category in categories:
+            rows = self.categories.get(category, _no_rows)
+            if category in leaving:
+                rows = rows[~np.isin(rows, leaving[category])]
+            if category in joining:
+                rows = np.sort(np.concatenate([rows, np.array(joining[category], dtype=np.int32)]))
+            new.categories[category] = rows
+        return new
+
+    # Combined bitmask for a set of restrictions, or None if one of them is not a known tag
+    @staticmethod
+    def mask_for(restrictions):
+        mask = 0
+        for restriction in restrictions:
+            bit = TAG_BITS.get(normalize_tag(restriction))
+            if bit is None:
+                return None
+            mask |= bit
+        return mask
+
+    def category_names(self):
+        return list(self.categories)
+
+    # Row numbers of the items in `category` that carry every tag in `restrictions`
+    def filter(self, category, restrictions=()):
+        rows = self.categories.get(category)
+        if rows is None:
+            return np.empty(0, dtype=np.int32)
+        return self.restrict(rows, restrictions)
+
+    # The rows among `rows` (an int array) whose items carry every tag in `restrictions`
+    def restrict(self, rows, restrictions=()):
+        wanted = self.mask_for(restrictions)
+        if wanted is None:
+            return rows[:0]
+        if wanted:
+            wanted = np.uint64(wanted)
+            rows = rows[(self.masks[rows] & wanted) == wanted]
+        return rows
+
+    # Boolean array over all rows: True where the item is on the menu and carries every tag in `restrictions`
+    def matches(self, restrictions):
+        wanted = self.mask_for(restrictions)
+        if wanted is None:
+            return np.zeros(len(self.names), dtype=bool)
+        wanted = np.uint64(wanted)
+        return ((self.masks & wanted) == wanted) & self.live
+
+    # (name, tags) pairs for a sequence of row numbers
+    def items(self, rows):
+        return [(self.names[row], self.tags[row]) for row in rows]
+
+    # Number of items on the menu (dead rows excluded)
+    def __len__(self):
+        return len(self.names) - self.dead
+
+
+# Compare a parsed menu's items with a catalog by id. Returns (added, changed,
+# removed): item dicts that are new or differ in name, tags, categories or
+# nutrition, and the ids that are gone.
+def diff_menu(catalog, items):
+    added, changed = [], []
+    for item in items:
+        row = catalog.rows_by_id.get(item["id"])
+        if row is None:
+            added.append(item)
+        elif (item["name"], _item_tags(item), tuple(item["categories"])) != (
+                catalog.names[row], catalog.tags[row], catalog.row_categories[row]) or not np.array_equal(
+                np.array(_item_nutrition(item), dtype=np.float32), catalog.nutrition[row], equal_nan=True):
+            changed.append(item)
+    present = {item["id"] for item in items}
+    removed = [item_id for item_id in catalog.rows_by_id if item_id not in present]
+    return added, changed, removed
+
+
+# Parse and validate a menu file into (categories, items)
+def read_menu(path=MENU_PATH):
+    with open(path, encoding='utf-8') as f:
+        return validate_menu(json.load(f))
+
+
+# Build a fresh catalog from a menu file
+def load_catalog(path=MENU_PATH):
+    return MenuCatalog(*read_menu(path))
@@ -0,0 +1,217 @@
+import re
+import threading
+from collections import namedtuple
+
+import numpy as np
+
+from cache import LRUCache
+from search import normalize
+
+# Parsed messages kept for reuse across sessions
+PARSE_CACHE_SIZE = 4096
+# Words in a phrase the lexicon is matched against, longest first
+MAX_PHRASE = 3
+
+# A chat message as a catalog query: tags every item must carry, categories
+# it must sit in (any of them), tags, categories and name words it must not
+# have, and free-text keywords for the search index. Tuples, so it can be
+# cached and compared.
+ChatQuery = namedtuple("ChatQuery", "tags categories excluded_tags excluded_categories excluded_words keywords")
+
+# Phrases naming a tag an item should carry
+TAG_PHRASES = {
+    "vegan": "vegan", "plant based": "vegan",
+    "vegetarian": "vegetarian", "veggie": "vegetarian", "meatless": "vegetarian", "meat free": "vegetarian",
+    "gluten free": "gluten-free", "gf": "gluten-free", "celiac": "gluten-free", "coeliac": "gluten-free",
+    "dairy free": "dairy-free", "lactose free": "dairy-free", "non dairy": "dairy-free",
+    "low sugar": "low-sugar", "sugar free": "low-sugar", "no added sugar": "low-sugar", "diabetic": "low-sugar",
+    "low sodium": "low-sodium", "low salt": "low-sodium",
+    "high protein": "high-protein", "protein rich": "high-protein", "protein": "high-protein",
+    "high fiber": "high-fiber", "high fibre": "high-fiber", "fiber": "high-fiber", "fibre": "high-fiber",
+    "omega 3": "rich in omega-3", "rich in omega 3": "rich in omega-3",
+}
+# What a negated phrase asks for: ("require", tag) to require, ("exclude", tag) to rule out
+NEGATED_PHRASES = {
+    "meat": ("require", "vegetarian"), "animal products": ("require", "vegan"),
+    "gluten": ("require", "gluten-free"), "wheat": ("require", "gluten-free"),
+    "dairy": ("require", "dairy-free"), "milk": ("require", "dairy-free"), "lactose": ("require", "dairy-free"),
+    "cheese": ("require", "dairy-free"),
+    "sugar": ("require", "low-sugar"), "salt": ("require", "low-sodium"), "sodium": ("require", "low-sodium"),
+    "nuts": ("exclude", "contains nuts"), "nut": ("exclude", "contains nuts"),
+    "peanuts": ("exclude", "contains nuts"),
+    "soy": ("exclude", "contains soy"), "soya": ("exclude", "contains soy"),
+}
+# Everyday words for menu categories, beyond the categories' own names
+CATEGORY_PHRASES = {
+    "main": ["Main Courses"], "mains": ["Main Courses"], "entree": ["Main Courses"], "entrees": ["Main Courses"],
+    "drink": ["Drinks", "Beverages", "Smoothies & Juices"], "drinks": ["Drinks", "Beverages", "Smoothies & Juices"],
+    "beverage": ["Drinks", "Beverages", "Smoothies & Juices"], "juice": ["Smoothies & Juices"],
+    "smoothie": ["Smoothies & Juices"], "sweet": ["Desserts"], "sweets": ["Desserts"],
+    "starter": ["Appetizers", "Appetizer Platter"], "starters": ["Appetizers", "Appetizer Platter"],
+    "appetizer": ["Appetizers", "Appetizer Platter"], "fish": ["Seafood"], "sandwich": ["Sandwiches & Wraps"],
+    "wrap": ["Sandwiches & Wraps"], "wraps": ["Sandwiches & Wraps"], "noodles": ["Pasta"],
+    "bread": ["Breads & Pastries"], "pastry": ["Breads & Pastries"], "pastries": ["Breads & Pastries"],
+    "kids": ["Kids’ Menu"], "children": ["Kids’ Menu"], "sauce": ["Sauces & Condiments"],
+    "healthy": ["Healthy Options"], "side": ["Sides"],
+}
+# Words that turn the rest of their clause into exclusions. Messages lose their
+# apostrophes before matching, so "don't" arrives as "dont"; an allergy or
+# intolerance rules out what follows just like "no" does.
+NEGATIONS = {
+    "no", "not", "without", "except", "excluding", "exclude", "avoid", "skip", "hold", "minus", "nothing", "never",
+    "dont", "dont want", "cant", "cannot", "cant have", "allergic", "allergic to", "allergy", "allergy to",
+    "intolerant", "intolerant to",
+}
+# Words carrying no query meaning
+STOPWORDS = set("""
+    a an and any anything are be can could do dish dishes does eat eating else food for from get give got have
+    am i im in is it items like looking me meal menu might my of on or order please recommend see show some
+    something suggest that the there thing things to today want what which with would you your yes
+    really very maybe also just only kind sort type id ill ive lets whats hi hello hey thanks thank
+""".split())
+# Clause boundaries: a negation reaches to the end of its clause
+_CLAUSES = re.compile(r"[,;.!?]|\bbut\b|\bthough\b|\bhowever\b", re.IGNORECASE)
+
+
+# Singular of a plural English word, close enough for menu words
+def _singular(word):
+    if word.endswith("ies") and len(word) > 4:
+        return word[:-3] + "y"
+    if word.endswith(("ches", "shes", "xes", "sses")):
+        return word[:-2]
+    if word.endswith("s") and not word.endswith("ss") and len(word) > 3:
+        return word[:-1]
+    return word
+
+
+# Rule-based parser from chat messages to ChatQuery for one set of menu
+# categories. Each clause of a message is matched left to right against the
+# lexicon, longest phrase first; a negation word makes everything after it
+# in the clause an exclusion. Words the lexicon doesn't know become search
+# keywords, or name words to exclude when negated. Parses are memoized by
+# message text, shared by every session.
+class ChatParser:
+    def __init__(self, categories, cache_size=PARSE_CACHE_SIZE):
+        self.categories = tuple(categories)
+        self.parsed = LRUCache(cache_size)
+        self.category_phrases = {}
+        for category in self.categories:
+            key = normalize(category)
+            for phrase in (key, " ".join(_singular(word) for word in key.split())):
+                self.category_phrases.setdefault(phrase, []).append(category)
+        for phrase, names in CATEGORY_PHRASES.items():
+            known = self.category_phrases.get(phrase, []) + [name for name in names if name in self.categories]
+            if known:
+                self.category_phrases[phrase] = list(dict.fromkeys(known))
+
+    def parse(self, message):
+        key = " ".join(message.lower().split())
+        query = self.parsed.get(key)
+        if query is None:
+            query = self._parse(key)
+            self.parsed.put(key, query)
+        return query
+
+    def _parse(self, message):
+        tags, categories, excluded_tags, excluded_categories, excluded_words, keywords = (
+            set(), set(), set(), set(), set(), [])
+        for clause in _CLAUSES.split(message.replace("'", "").replace("’", "")):
+            words = normalize(clause).split()
+            negated = False
+            i = 0
+            while i < len(words):
+                kind, value, size = self._match(words, i, negated)
+                if kind == "negation":
+                    negated = True
+                elif kind == "tag":
+                    (excluded_tags if negated else tags).add(value)
+                elif kind == "require":
+                    tags.add(value)
+                elif kind == "exclude":
+                    excluded_tags.add(value)
+                elif kind == "category":
+                    (excluded_categories if negated else categories).update(value)
+                elif value not in STOPWORDS and not value.isdigit():
+                    if negated:
+                        excluded_words.add(_singular(value))
+                    else:
+                        keywords.append(value)
+                i += size
+        return ChatQuery(tuple(sorted(tags)), tuple(sorted(categories - excluded_categories)),
+                         tuple(sorted(excluded_tags)), tuple(sorted(excluded_categories)),
+                         tuple(sorted(excluded_words)), " ".join(keywords))
+
+    # (kind, value, words used) for the longest known phrase starting at
+    # words[i], or ("word", the word, 1) when there is none
+    def _match(self, words, i, negated):
+        for size in range(min(MAX_PHRASE, len(words) - i), 0, -1):
+            meaning = self._lookup(" ".join(words[i:i + size]), negated)
+            if meaning is not None:
+                return (*meaning, size)
+        return "word", words[i], 1
+
+    # (kind, value) for a phrase, or None if the lexicon doesn't know it
+    def _lookup(self, phrase, negated):
+        if phrase in NEGATIONS:
+            return "negation", None
+        if negated and phrase in NEGATED_PHRASES:
+            return NEGATED_PHRASES[phrase]
+        if phrase in TAG_PHRASES:
+            return "tag", TAG_PHRASES[phrase]
+        categories = self.category_phrases.get(phrase) or self.category_phrases.get(_singular(phrase))
+        if categories:
+            return "category", categories
+        return None
+
+
+# A query read back in words, for the chat's reply; empty when the message
+# asked for nothing the parser recognized
+def describe(query):
+    parts = []
+    if query.tags:
+        parts.append(", ".join(query.tags))
+    if query.categories:
+        parts.append("in " + " or ".join(query.categories))
+    if query.keywords:
+        parts.append(f"matching '{query.keywords}'")
+    excluded = [*query.excluded_tags, *query.excluded_categories, *(f"'{word}'" for word in query.excluded_words)]
+    if excluded:
+        parts.append("without " + ", ".join(excluded))
+    return "; ".join(parts)
+
+
+# Rows of `catalog` answering `query`, best first when it has keywords (then
+# at most `limit`), else in menu order. `restrictions` (the sidebar's) are
+# required on top of the query's own tags. Every condition is a boolean mask
+# over the rows or a lookup in the search index.
+def run_query(catalog, index, query, restrictions=(), limit=50):
+    allowed = catalog.matches(set(query.tags) | set(restrictions))
+    if query.excluded_tags:
+        excluded = np.uint64(catalog.mask_for(query.excluded_tags))
+        allowed &= (catalog.masks & excluded) == 0
+    if query.categories:
+        in_category = np.zeros(len(allowed), dtype=bool)
+        for category in query.categories:
+            in_category[catalog.categories.get(category, [])] = True
+        allowed &= in_category
+    for category in query.excluded_categories:
+        allowed[catalog.categories.get(category, [])] = False
+    for word in query.excluded_words:
+        allowed[index.prefix_rows(word)] = False
+    if query.keywords:
+        return index.search(query.keywords, allowed, limit)
+    return np.flatnonzero(allowed)
+
+
+_parsers = {}
+_parsers_lock = threading.Lock()
+
+
+# The parser for a catalog's categories, built once per set of categories
+def get_parser(catalog):
+    categories = tuple(catalog.categories)
+    parser = _parsers.get(categories)
+    if parser is None:
+        with _parsers_lock:
+            parser = _parsers.setdefault(categories, ChatParser(categories))
+    return parser
@@ -0,0 +1,119 @@
+import os
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from urllib.request import pathname2url
+
+from metrics import timed
+
+# The application's single database file
+APP_DB = 'app.db'
+
+# Pragmas applied to every pooled connection
+PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA busy_timeout=5000",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-8000",
+    "PRAGMA foreign_keys=ON",
+)
+# Pragmas for read-only connections; in WAL mode their reads never wait on writers
+READ_PRAGMAS = (
+    "PRAGMA query_only=ON",
+    "PRAGMA busy_timeout=5000",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-8000",
+)
+
+
+# Thread-safe pool of SQLite connections to one database file.
+# Connections are created lazily up to `size` and reused across Streamlit reruns
+# and sessions, so a request never pays for sqlite3.connect() or pragma setup.
+class ConnectionPool:
+    def __init__(self, path, size=8, timeout=10.0, readonly=False):
+        self.path = path
+        self.size = size
+        self.timeout = timeout
+        self.readonly = readonly
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._created = 0
+
+    @timed("db.connect")
+    def _connect(self):
+        if self.readonly:
+            uri = 'file:' + pathname2url(os.path.abspath(self.path)) + '?mode=ro'
+            conn = sqlite3.connect(uri, timeout=self.timeout, check_same_thread=False, uri=True)
+        else:
+            conn = sqlite3.connect(self.path, timeout=self.timeout, check_same_thread=False)
+        for pragma in READ_PRAGMAS if self.readonly else PRAGMAS:
+            conn.execute(pragma)
+        return conn
+
+    def _acquire(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if self._created < self.size:
+                self._created += 1
+                create = True
+            else:
+                create = False
+        if create:
+            try:
+                return self._connect()
+            except Exception:
+                with self._lock:
+                    self._created -= 1
+                raise
+        try:
+            return self._idle.get(timeout=self.timeout)
+        except queue.Empty:
+            raise TimeoutError(f"No free connection to {self.path} after {self.timeout}s")
+
+    # Borrow a connection; commits on success, rolls back on error, then returns it to the pool
+    @contextmanager
+    def connection(self):
+        conn = self._acquire()
+        try:
+            with conn:
+                yield conn
+        finally:
+            self._idle.put(conn)
+
+    def close(self):
+        with self._lock:
+            while True:
+                try:
+                    self._idle.get_nowait().close()
+                except queue.Empty:
+                    break
+                self._created -= 1
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+# Process-wide pool for a database file, shared by every session. Read-only
+# pools are separate, so dashboard reads never queue behind writes for a connection.
+def get_pool(path, readonly=False):
+    key = (path, readonly)
+    pool = _pools.get(key)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(key)
+            if pool is None:
+                pool = _pools[key] = ConnectionPool(path, readonly=readonly)
+    return pool
+
+
+def close_pools():
+    with _pools_lock:
+        for pool in _pools.values():
+            pool.close()
+        _pools.clear()
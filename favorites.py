@@ -0,0 +1,30 @@
+import numpy as np
+
+from storage import get_storage
+
+
+# Mark items as favorites; ones already marked are left as they are
+def add_favorites(username, item_ids):
+    get_storage().add_favorites(username, item_ids)
+
+
+def remove_favorite(username, item_id):
+    get_storage().remove_favorite(username, item_id)
+
+
+# Set of a user's favorite item ids
+def get_favorites(username):
+    return get_storage().favorites(username)
+
+
+# Catalog rows of the favorites still on the menu, in menu order
+def favorite_rows(catalog, favorites):
+    return np.array(sorted(catalog.rows_by_id[item_id] for item_id in favorites if item_id in catalog.rows_by_id),
+                    dtype=np.int32)
+
+
+# The catalog rows among `rows` whose item id is in the `favorites` set
+def only_favorites(catalog, rows, favorites):
+    rows = np.asarray(rows, dtype=np.int32)
+    keep = [item_id in favorites for item_id in catalog.ids[rows].tolist()]
+    return rows[np.array(keep, dtype=bool)] if keep else rows
@@ -0,0 +1,116 @@
+import atexit
+import threading
+import time
+
+from metrics import span, timed
+from storage import get_storage
+from writebehind import WriteBehind
+
+# Longest a submission waits in the queue before it is written
+FLUSH_SECONDS = 0.5
+# Queued submissions that trigger a write without waiting for FLUSH_SECONDS
+FLUSH_BATCH = 256
+# Whether submit_feedback waits until its row is committed
+DURABLE = False
+
+
+# Queue of feedback submissions drained by the WriteBehind thread, which writes
+# everything queued in a single executemany transaction once FLUSH_BATCH are
+# waiting or the oldest is FLUSH_SECONDS old. A submit is an append under a
+# lock; with durable=True it also waits for the commit of the batch its row
+# lands in. The writer flushes at once for a waiting submitter, and whatever
+# queues up during that commit goes out together in the next one. A failed
+# write is retried; durable submitters waiting on it get its error.
+class FeedbackWriter(WriteBehind):
+    def __init__(self, storage=None, flush_seconds=FLUSH_SECONDS, batch_size=FLUSH_BATCH, durable=DURABLE):
+        super().__init__("feedback-writer", flush_seconds, batch_size)
+        self.storage = storage or get_storage()
+        self.durable = durable
+        self._pending = []
+        self._tickets = 0
+        self._written = 0
+        self._waiters = 0
+        self._failures = 0
+
+    # Queue a submission. A durable one returns once its row is committed, or
+    # raises the error of a failed write it was waiting on; the row then stays
+    # queued and goes out with the writer's retry.
+    def submit(self, username, text, durable=None):
+        with self._cond:
+            self._pending.append((username, text, time.time()))
+            self._tickets += 1
+            ticket = self._tickets
+            self._queued()
+            if self.durable if durable is None else durable:
+                # A waiting submitter makes the writer flush at once
+                self._waiters += 1
+                self._cond.notify_all()
+                failures = self._failures
+                try:
+                    while self._written < ticket and not self._stopped:
+                        if self._failures != failures:
+                            raise self.last_error
+                        self._cond.wait()
+                finally:
+                    self._waiters -= 1
+        if self._stopped:
+            self.flush()
+
+    def _size(self):
+        return len(self._pending)
+
+    def _take(self):
+        rows, self._pending = self._pending, []
+        return rows
+
+    def _restore(self, rows):
+        self._pending[:0] = rows
+
+    def _write(self, rows):
+        with span("feedback.insert"):
+            self.storage.add_feedback(rows)
+        return len(rows)
+
+    def _urgent(self):
+        return self._waiters > 0
+
+    # Rows are written in ticket order, so the count written is the last ticket done
+    def _done(self, rows):
+        self._written += len(rows)
+
+    def _failed(self, rows, error):
+        self._failures += 1
+
+
+_writer = None
+_writer_lock = threading.Lock()
+
+
+# Process-wide feedback writer, started on first use and flushed at interpreter exit
+def get_feedback_writer():
+    global _writer
+    if _writer is None:
+        with _writer_lock:
+            if _writer is None:
+                writer = FeedbackWriter()
+                writer.start()
+                atexit.register(writer.stop)
+                _writer = writer
+    return _writer
+
+
+# Function to store one piece of feedback; queued and written in the background
+@timed("feedback.submit")
+def submit_feedback(username, text, durable=None):
+    get_feedback_writer().submit(username, text, durable)
+
+
+# One page of feedback, newest first, optionally restricted to rows matching `query`.
+# Returns (rows, next_cursor) where rows are (id, username, feedback, created_at)
+# tuples and next_cursor is None on the last page.
+@timed("feedback.list")
+def list_feedback(cursor=None, limit=50, query=None):
+    rows = get_storage().feedback_page(cursor, limit + 1, query)
+    more = len(rows) > limit
+    rows = rows[:limit]
+    return rows, rows[-1][0] if more else None
@@ -0,0 +1,143 @@
+import os
+import threading
+import time
+
+from cache import LRUCache
+from catalog import MENU_PATH, MenuCatalog, diff_menu, read_menu
+from chat import run_query
+from search import MenuSearchIndex, normalize
+
+# Seconds between checks of the menu file's modification time
+CHECK_SECONDS = 1.0
+# Filtered menu views kept for reuse across sessions
+VIEW_CACHE_SIZE = 1024
+
+
+# Serves the current menu catalog and its search index, reloading the menu
+# file in the background when it changes. A reload diffs the file against the
+# live catalog by item id and patches copies of the catalog and index with just
+# the added, changed and removed items, then swaps the pair in with one
+# assignment: readers never wait on a reload and never see half of one. Each
+# applied change bumps the catalog's version, so sessions can tell that views
+# they built from an older version are stale, and cached views of an old
+# version are simply never asked for again and age out of the LRU.
+class MenuStore:
+    def __init__(self, path=MENU_PATH, check_seconds=CHECK_SECONDS, view_cache_size=VIEW_CACHE_SIZE):
+        self.path = path
+        self.check_seconds = check_seconds
+        self.last_error = None
+        self.views = LRUCache(view_cache_size)
+        self._lock = threading.Lock()
+        self._reloading = False
+        self._mtime = os.stat(path).st_mtime_ns
+        catalog = MenuCatalog(*read_menu(path))
+        self._current = (catalog, MenuSearchIndex(catalog.names))
+        self._checked = time.monotonic()
+
+    @property
+    def version(self):
+        return self._current[0].version
+
+    # (catalog, search index) for the current menu version; every `check_seconds`
+    # it also looks at the file and starts a background reload if it changed
+    def snapshot(self):
+        now = time.monotonic()
+        if now - self._checked >= self.check_seconds:
+            self._checked = now
+            self.check()
+        return self._current
+
+    # Rows of a menu view of `catalog` (from this store's snapshot()): the
+    # search results for `query` across the menu if one is given, else the items in
+    # `category`, keeping only items with every tag in `restrictions`. Views
+    # are shared by every session through an LRU keyed by (catalog version,
+    # category, restriction set, normalized query), so a rerun that only
+    # changed another widget reuses the last result. Callers must not modify
+    # the returned array.
+    def view(self, catalog, index, category=None, restrictions=(), query=None):
+        if query is not None:
+            query, category = normalize(query), None
+        key = (catalog.version, category, frozenset(restrictions), query)
+        rows = self.views.get(key)
+        if rows is None:
+            if query is not None:
+                rows = index.search(query, catalog.matches(restrictions))
+            else:
+                rows = catalog.filter(category, restrictions)
+            self.views.put(key, rows)
+        return rows
+
+    # Rows answering a parsed chat query (chat.run_query), cached in the same
+    # LRU as view() under (catalog version, query, restriction set)
+    def chat_view(self, catalog, index, query, restrictions=()):
+        key = (catalog.version, query, frozenset(restrictions))
+        rows = self.views.get(key)
+        if rows is None:
+            rows = run_query(catalog, index, query, restrictions)
+            self.views.put(key, rows)
+        return rows
+
+    # Start a background reload if the file changed since it was last read
+    def check(self):
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except OSError:
+            return
+        with self._lock:
+            if mtime == self._mtime or self._reloading:
+                return
+            self._reloading = True
+        threading.Thread(target=self._background_reload, name="menu-reload", daemon=True).start()
+
+    def _background_reload(self):
+        try:
+            self.reload()
+        finally:
+            with self._lock:
+                self._reloading = False
+
+    # Read the file and apply its differences to the current menu. Returns
+    # (added, changed, removed) counts. A file that fails validation is skipped
+    # (the error is kept in `last_error`) and the current menu stays in service.
+    def reload(self):
+        mtime = os.stat(self.path).st_mtime_ns
+        try:
+            categories, items = read_menu(self.path)
+        except ValueError as error:
+            self._mtime, self.last_error = mtime, error
+            return 0, 0, 0
+        catalog, index = self._current
+        added, changed, removed = diff_menu(catalog, items)
+        if added or changed or removed or categories != catalog.category_names():
+            if (catalog.dead + len(removed)) * 2 > len(catalog.names) + len(added):
+                # Mostly dead rows: rebuilding is cheaper than carrying them
+                catalog = MenuCatalog(categories, items, catalog.version + 1)
+                index = MenuSearchIndex(catalog.names)
+            else:
+                previous = catalog
+                catalog = previous.updated(categories, added, changed, removed)
+                renames = [(row, previous.names[row], None)
+                           for row in (previous.rows_by_id[item_id] for item_id in removed)]
+                for item in changed + added:
+                    row = catalog.rows_by_id[item["id"]]
+                    old_name = previous.names[row] if row < len(previous.names) else None
+                    if item["name"] != old_name:
+                        renames.append((row, old_name, item["name"]))
+                index = index.updated(renames)
+            self._current = (catalog, index)
+        self._mtime, self.last_error = mtime, None
+        return len(added), len(changed), len(removed)
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+# Process-wide menu store, loaded on first use
+def get_menu_store():
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = MenuStore()
+    return _store
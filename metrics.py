@@ -0,0 +1,192 @@
+import functools
+import os
+import threading
+import time
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Upper bounds (seconds) of the latency buckets every span is counted into
+BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Set METRICS=0 to turn recording off
+ENABLED = os.environ.get('METRICS', '1') != '0'
+# Port serving the Prometheus text export at /metrics; 0 to not serve it
+METRICS_PORT = int(os.environ.get('METRICS_PORT', '0'))
+
+
+# Counts of observed durations per bucket, plus their count, sum and maximum.
+# Recording is a bisect and a few additions under a lock, cheap enough for
+# every page rerun and helper call.
+class Histogram:
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # the last one is +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds):
+        i = bisect_left(self.buckets, seconds)
+        with self._lock:
+            self.counts[i] += 1
+            self.count += 1
+            self.sum += seconds
+            if seconds > self.max:
+                self.max = seconds
+
+    # Estimated q-quantile, interpolated within its bucket like Prometheus'
+    # histogram_quantile; None before the first observation
+    def quantile(self, q):
+        with self._lock:
+            counts, count, largest = list(self.counts), self.count, self.max
+        if not count:
+            return None
+        rank, seen = q * count, 0
+        for i, n in enumerate(counts):
+            if n and seen + n >= rank:
+                lower = self.buckets[i - 1] if i else 0.0
+                upper = self.buckets[i] if i < len(self.buckets) else largest
+                return min(largest, lower + (upper - lower) * (rank - seen) / n)
+            seen += n
+        return largest
+
+
+_histograms = {}
+_histograms_lock = threading.Lock()
+
+
+def histogram(name):
+    hist = _histograms.get(name)
+    if hist is None:
+        with _histograms_lock:
+            hist = _histograms.setdefault(name, Histogram())
+    return hist
+
+
+# Times a block (`with span("page.Login"):`) or, started by hand, the stretch
+# until stop(). The wall time lands in the histogram of that name.
+class Span:
+    __slots__ = ('name', 'start')
+
+    def __init__(self, name):
+        self.name = name
+        self.start = time.perf_counter()
+
+    def stop(self):
+        if ENABLED:
+            histogram(self.name).observe(time.perf_counter() - self.start)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def span(name):
+    return Span(name)
+
+
+# Decorator recording every call of a function as a span
+def timed(name):
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not ENABLED:
+                return fn(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                histogram(name).observe(time.perf_counter() - start)
+        return wrapper
+    return decorate
+
+
+# {name: histogram} of everything recorded so far, by name
+def histograms():
+    with _histograms_lock:
+        return dict(sorted(_histograms.items()))
+
+
+_counters = {}
+_counters_lock = threading.Lock()
+
+
+# Add `n` to a running total, e.g. count("db.statements") for every statement sent
+def count(name, n=1):
+    if ENABLED:
+        with _counters_lock:
+            _counters[name] = _counters.get(name, 0) + n
+
+
+# {name: total} of every counter so far, by name
+def counters():
+    with _counters_lock:
+        return dict(sorted(_counters.items()))
+
+
+def reset():
+    with _histograms_lock:
+        _histograms.clear()
+    with _counters_lock:
+        _counters.clear()
+
+
+def _label(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+# All histograms in the Prometheus text exposition format
+def prometheus_text():
+    lines = ['# HELP app_span_seconds Wall time of instrumented pages and helpers.',
+             '# TYPE app_span_seconds histogram']
+    for name, hist in histograms().items():
+        with hist._lock:
+            counts, count, total = list(hist.counts), hist.count, hist.sum
+        label = _label(name)
+        cumulative = 0
+        for bound, n in zip(hist.buckets + (float('inf'),), counts):
+            cumulative += n
+            le = '+Inf' if bound == float('inf') else repr(bound)
+            lines.append(f'app_span_seconds_bucket{{span="{label}",le="{le}"}} {cumulative}')
+        lines.append(f'app_span_seconds_sum{{span="{label}"}} {total!r}')
+        lines.append(f'app_span_seconds_count{{span="{label}"}} {count}')
+    lines += ['# HELP app_events_total Running totals of counted events.', '# TYPE app_events_total counter']
+    for name, total in counters().items():
+        lines.append(f'app_events_total{{event="{_label(name)}"}} {total}')
+    return '\n'.join(lines) + '\n'
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path != '/metrics':
+            self.send_error(404)
+            return
+        body = prometheus_text().encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+_server = None
+_server_lock = threading.Lock()
+
+
+# Serve /metrics on METRICS_PORT from a background thread, once per process
+def ensure_metrics_server(port=None):
+    global _server
+    port = METRICS_PORT if port is None else port
+    if _server is not None or not port:
+        return _server
+    with _server_lock:
+        if _server is None:
+            server = ThreadingHTTPServer(('', port), _MetricsHandler)
+            threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True).start()
+            _server = server
+    return _server
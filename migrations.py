@@ -0,0 +1,239 @@
+import os
+import sqlite3
+import threading
+
+from db import APP_DB, get_pool
+from passwords import hash_password
+
+# Files the data lived in before it was consolidated into APP_DB
+LEGACY_USERS_DB = 'users.db'
+LEGACY_FEEDBACK_DB = 'feedback.db'
+
+
+def _seed_admin(conn):
+    conn.execute('INSERT OR IGNORE INTO users (username, password, role) VALUES (?, ?, ?)',
+                 ('admin', hash_password('admin123'), 'admin'))
+
+
+# Schema history of the two legacy files, as shipped. Frozen: they are replayed
+# at the start of APP_DB's history and used to bring old files up to date
+# before their data is imported.
+USERS_STEPS = [
+    ['''CREATE TABLE IF NOT EXISTS users
+        (username TEXT PRIMARY KEY, password TEXT, role TEXT)'''],
+    _seed_admin,
+    ['CREATE INDEX IF NOT EXISTS idx_users_role ON users (role)'],
+    ['''CREATE TABLE IF NOT EXISTS orders
+        (id INTEGER PRIMARY KEY, username TEXT NOT NULL, status INTEGER NOT NULL,
+         created_at REAL NOT NULL, updated_at REAL NOT NULL)''',
+     'CREATE INDEX IF NOT EXISTS idx_orders_status ON orders (status)'],
+    ['''CREATE TABLE IF NOT EXISTS order_items
+        (order_id INTEGER NOT NULL REFERENCES orders (id), item TEXT NOT NULL,
+         quantity INTEGER NOT NULL, PRIMARY KEY (order_id, item)) WITHOUT ROWID''',
+     'CREATE INDEX IF NOT EXISTS idx_orders_username_created ON orders (username, created_at)',
+     'CREATE INDEX IF NOT EXISTS idx_orders_created ON orders (created_at)'],
+    ['''CREATE TABLE IF NOT EXISTS carts
+        (username TEXT NOT NULL, item_id INTEGER NOT NULL, quantity INTEGER NOT NULL,
+         PRIMARY KEY (username, item_id)) WITHOUT ROWID'''],
+    ['''CREATE TABLE IF NOT EXISTS favorites
+        (username TEXT NOT NULL, item_id INTEGER NOT NULL,
+         PRIMARY KEY (username, item_id)) WITHOUT ROWID'''],
+]
+FEEDBACK_STEPS = [
+    ['''CREATE TABLE IF NOT EXISTS feedback
+        (username TEXT, feedback TEXT)'''],
+    # Explicit id for keyset paging, a timestamp, and a full-text index kept in sync by triggers
+    ['''CREATE TABLE feedback_new
+        (id INTEGER PRIMARY KEY, username TEXT, feedback TEXT, created_at REAL)''',
+     'INSERT INTO feedback_new (id, username, feedback) SELECT rowid, username, feedback FROM feedback',
+     'DROP TABLE feedback',
+     'ALTER TABLE feedback_new RENAME TO feedback',
+     '''CREATE VIRTUAL TABLE feedback_fts USING fts5
+        (feedback, content='feedback', content_rowid='id')''',
+     "INSERT INTO feedback_fts (feedback_fts) VALUES ('rebuild')",
+     '''CREATE TRIGGER feedback_ai AFTER INSERT ON feedback BEGIN
+            INSERT INTO feedback_fts (rowid, feedback) VALUES (new.id, new.feedback);
+        END''',
+     '''CREATE TRIGGER feedback_ad AFTER DELETE ON feedback BEGIN
+            INSERT INTO feedback_fts (feedback_fts, rowid, feedback) VALUES ('delete', old.id, old.feedback);
+        END''',
+     '''CREATE TRIGGER feedback_au AFTER UPDATE ON feedback BEGIN
+            INSERT INTO feedback_fts (feedback_fts, rowid, feedback) VALUES ('delete', old.id, old.feedback);
+            INSERT INTO feedback_fts (rowid, feedback) VALUES (new.id, new.feedback);
+        END'''],
+]
+
+# Tables copied from each legacy file, in dependency order
+_LEGACY_TABLES = {
+    LEGACY_USERS_DB: ['users', 'orders', 'order_items', 'carts', 'favorites'],
+    LEGACY_FEEDBACK_DB: ['feedback'],
+}
+
+
+# Copy the rows of the legacy files next to the database, if there are any.
+# Each is first brought to its final legacy schema, then streamed in; imported
+# users replace the freshly seeded admin.
+def _import_legacy_databases(conn):
+    folder = os.path.dirname(conn.execute('PRAGMA database_list').fetchone()[2])
+    for name, steps in LEGACY_MIGRATIONS.items():
+        path = os.path.join(folder, name)
+        if not os.path.exists(path):
+            continue
+        migrate(path, steps)
+        legacy = sqlite3.connect(path)
+        try:
+            for table in _LEGACY_TABLES[name]:
+                columns = [row[1] for row in legacy.execute(f'PRAGMA table_info({table})')]
+                names, marks = ', '.join(columns), ', '.join('?' * len(columns))
+                verb = 'INSERT OR REPLACE' if table == 'users' else 'INSERT'
+                conn.executemany(f'{verb} INTO {table} ({names}) VALUES ({marks})',
+                                 legacy.execute(f'SELECT {names} FROM {table}'))
+        finally:
+            legacy.close()
+
+
+# Summary tables behind the admin dashboard, kept current by storage.Storage's
+# writes and filled here from the rows already stored, plus an index that lets
+# the dashboard page through users in name order. `day_of` turns an epoch
+# timestamp column into a whole day number in each dialect.
+def _dashboard_steps(day_of):
+    return [
+        'CREATE INDEX IF NOT EXISTS idx_users_role_username ON users (role, username)',
+        'DROP INDEX IF EXISTS idx_users_role',
+        '''CREATE TABLE IF NOT EXISTS role_counts
+           (role TEXT PRIMARY KEY, users INTEGER NOT NULL)''',
+        '''CREATE TABLE IF NOT EXISTS feedback_days
+           (day INTEGER PRIMARY KEY, feedback INTEGER NOT NULL)''',
+        '''CREATE TABLE IF NOT EXISTS item_orders
+           (item TEXT PRIMARY KEY, quantity INTEGER NOT NULL)''',
+        'CREATE INDEX IF NOT EXISTS idx_item_orders_quantity ON item_orders (quantity)',
+        '''CREATE TABLE IF NOT EXISTS restriction_picks
+           (restriction TEXT PRIMARY KEY, picks INTEGER NOT NULL)''',
+        'INSERT INTO role_counts (role, users) SELECT role, COUNT(*) FROM users WHERE role IS NOT NULL GROUP BY role',
+        f'''INSERT INTO feedback_days (day, feedback)
+            SELECT {day_of('created_at')}, COUNT(*) FROM feedback WHERE created_at IS NOT NULL
+            GROUP BY {day_of('created_at')}''',
+        'INSERT INTO item_orders (item, quantity) SELECT item, SUM(quantity) FROM order_items GROUP BY item',
+    ]
+
+
+# Ordered schema changes for each database file. A step is a list of SQL
+# statements or a callable taking the connection; its version is its 1-based
+# position. Never edit a step that has shipped, append a new one instead.
+MIGRATIONS = {
+    APP_DB: USERS_STEPS + FEEDBACK_STEPS + [
+        _import_legacy_databases,
+        _dashboard_steps(lambda column: f'CAST({column} / 86400 AS INTEGER)'),
+        # Menu text translated by translations.MenuTranslator
+        ['''CREATE TABLE IF NOT EXISTS translations
+            (locale TEXT NOT NULL, source TEXT NOT NULL, text TEXT NOT NULL,
+             PRIMARY KEY (locale, source)) WITHOUT ROWID'''],
+    ],
+}
+LEGACY_MIGRATIONS = {LEGACY_USERS_DB: USERS_STEPS, LEGACY_FEEDBACK_DB: FEEDBACK_STEPS}
+
+
+def _seed_admin_server(conn):
+    conn.execute('INSERT INTO users (username, password, role) VALUES (%s, %s, %s) ON CONFLICT DO NOTHING',
+                 ('admin', hash_password('admin123'), 'admin'))
+
+
+# Schema history for a networked PostgreSQL server (storage.PostgresStorage).
+# It starts from the current SQLite schema in PostgreSQL's dialect; feedback
+# search uses a GIN index over the text instead of an FTS5 table. Same rules
+# as MIGRATIONS: append, never edit.
+SERVER_STEPS = [
+    ['''CREATE TABLE IF NOT EXISTS users
+        (username TEXT PRIMARY KEY, password TEXT, role TEXT)''',
+     'CREATE INDEX IF NOT EXISTS idx_users_role ON users (role)'],
+    _seed_admin_server,
+    ['''CREATE TABLE IF NOT EXISTS orders
+        (id BIGSERIAL PRIMARY KEY, username TEXT NOT NULL, status INTEGER NOT NULL,
+         created_at DOUBLE PRECISION NOT NULL, updated_at DOUBLE PRECISION NOT NULL)''',
+     'CREATE INDEX IF NOT EXISTS idx_orders_status ON orders (status)',
+     'CREATE INDEX IF NOT EXISTS idx_orders_username_created ON orders (username, created_at)',
+     'CREATE INDEX IF NOT EXISTS idx_orders_created ON orders (created_at)',
+     '''CREATE TABLE IF NOT EXISTS order_items
+        (order_id BIGINT NOT NULL REFERENCES orders (id), item TEXT NOT NULL,
+         quantity INTEGER NOT NULL, PRIMARY KEY (order_id, item))'''],
+    ['''CREATE TABLE IF NOT EXISTS carts
+        (username TEXT NOT NULL, item_id INTEGER NOT NULL, quantity INTEGER NOT NULL,
+         PRIMARY KEY (username, item_id))''',
+     '''CREATE TABLE IF NOT EXISTS favorites
+        (username TEXT NOT NULL, item_id INTEGER NOT NULL, PRIMARY KEY (username, item_id))'''],
+    ['''CREATE TABLE IF NOT EXISTS feedback
+        (id BIGSERIAL PRIMARY KEY, username TEXT, feedback TEXT, created_at DOUBLE PRECISION)''',
+     "CREATE INDEX IF NOT EXISTS idx_feedback_search ON feedback USING GIN (to_tsvector('simple', feedback))"],
+    _dashboard_steps(lambda column: f'CAST(FLOOR({column} / 86400) AS INTEGER)'),
+    ['''CREATE TABLE IF NOT EXISTS translations
+        (locale TEXT NOT NULL, source TEXT NOT NULL, text TEXT NOT NULL, PRIMARY KEY (locale, source))'''],
+]
+# Advisory lock key serializing migrations across every node sharing the server
+SERVER_SCHEMA_LOCK = 7_300_001
+
+
+def schema_version(conn):
+    row = conn.execute('SELECT version FROM schema_version').fetchone()
+    return row[0] if row else 0
+
+
+# Bring one database up to date; each step runs in its own IMMEDIATE transaction
+# so concurrent processes starting at once apply it exactly once
+def migrate(path, steps=None):
+    steps = MIGRATIONS[path] if steps is None else steps
+    with get_pool(path).connection() as conn:
+        conn.execute('CREATE TABLE IF NOT EXISTS schema_version (version INTEGER NOT NULL)')
+        while True:
+            conn.execute('BEGIN IMMEDIATE')
+            version = schema_version(conn)
+            if version >= len(steps):
+                conn.commit()
+                return version
+            step = steps[version]
+            if callable(step):
+                step(conn)
+            else:
+                for statement in step:
+                    conn.execute(statement)
+            conn.execute('DELETE FROM schema_version')
+            conn.execute('INSERT INTO schema_version (version) VALUES (?)', (version + 1,))
+            conn.commit()
+
+
+# Bring a server database up to date through a pool of DB-API connections
+# (psycopg's, or the local stand-in's). Each step runs in its own transaction
+# under an advisory lock, so nodes starting at once apply it exactly once.
+def migrate_server(pool, steps=SERVER_STEPS):
+    while True:
+        with pool.connection() as conn:
+            conn.execute('SELECT pg_advisory_xact_lock(%s)', (SERVER_SCHEMA_LOCK,))
+            conn.execute('CREATE TABLE IF NOT EXISTS schema_version (version INTEGER NOT NULL)')
+            version = schema_version(conn)
+            if version >= len(steps):
+                return version
+            step = steps[version]
+            if callable(step):
+                step(conn)
+            else:
+                for statement in step:
+                    conn.execute(statement)
+            conn.execute('DELETE FROM schema_version')
+            conn.execute('INSERT INTO schema_version (version) VALUES (%s)', (version + 1,))
+
+
+_migrated = False
+_migrate_lock = threading.Lock()
+
+
+# Migrate the configured storage the first time it is called in this process;
+# later calls are free
+def ensure_schema():
+    global _migrated
+    if _migrated:
+        return
+    # storage builds on this module, so it is imported on first use
+    from storage import get_storage
+    with _migrate_lock:
+        if not _migrated:
+            get_storage().migrate()
+            _migrated = True
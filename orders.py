@@ -0,0 +1,141 @@
+import heapq
+import threading
+import time
+from collections import Counter
+
+from metrics import timed
+from storage import get_storage
+
+ORDER_STATUS = [
+    "Order Received", "Preparing Your Order", "Cooking In Progress", "Order Packed", "Out for Delivery", "Delivered"
+]
+DELIVERED = len(ORDER_STATUS) - 1
+
+# Seconds an order spends in each stage before it advances
+STAGE_SECONDS = 2.0
+# Seconds before advances whose write failed are tried again
+RETRY_SECONDS = 1.0
+
+
+# Moves every open order through ORDER_STATUS from one background thread.
+# Pending advances sit in a heap ordered by due time; each wake-up pops all
+# the orders that are due and persists their new stage in one transaction, so
+# tracking thousands of orders costs one sleeping thread, not one per viewer.
+# New stages count only once written: a failed write (kept in `last_error`)
+# leaves the orders where they were and is retried after `retry_seconds`.
+class OrderTracker:
+    def __init__(self, storage=None, stage_seconds=STAGE_SECONDS, retry_seconds=RETRY_SECONDS):
+        self.storage = storage or get_storage()
+        self.stage_seconds = stage_seconds
+        self.retry_seconds = retry_seconds
+        self.last_error = None
+        self._heap = []
+        self._stages = {}
+        self._cond = threading.Condition()
+        self._thread = None
+        self._stopped = False
+
+    # Start the worker and reschedule orders that were still open when the process last stopped
+    def start(self):
+        with self._cond:
+            if self._thread is not None:
+                return
+            for order_id, stage, updated_at in self.storage.open_orders(DELIVERED):
+                self._stages[order_id] = stage
+                heapq.heappush(self._heap, (updated_at + self.stage_seconds, order_id))
+            self._thread = threading.Thread(target=self._run, name="order-tracker", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        with self._cond:
+            self._stopped = True
+            self._cond.notify()
+        if self._thread is not None:
+            self._thread.join()
+
+    # Record a new order and its items (names, or {name: quantity}) in one transaction,
+    # then schedule its first advance
+    @timed("orders.place")
+    def place(self, username, items):
+        now = time.time()
+        order_id = self.storage.add_order(username, Counter(items), now)
+        self._schedule(order_id, now)
+        return order_id
+
+    def _schedule(self, order_id, now):
+        with self._cond:
+            self._stages[order_id] = 0
+            heapq.heappush(self._heap, (now + self.stage_seconds, order_id))
+            self._cond.notify()
+
+    # Index into ORDER_STATUS for an order, or None if it doesn't exist
+    def status(self, order_id):
+        stage = self._stages.get(order_id)
+        if stage is not None:
+            return stage
+        return self.storage.order_status(order_id)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._stopped and (not self._heap or self._heap[0][0] > time.time()):
+                    self._cond.wait(self._heap[0][0] - time.time() if self._heap else None)
+                if self._stopped:
+                    return
+                now = time.time()
+                advanced = []
+                while self._heap and self._heap[0][0] <= now:
+                    _, order_id = heapq.heappop(self._heap)
+                    advanced.append((self._stages[order_id] + 1, now, order_id))
+            try:
+                self.storage.set_order_statuses(advanced)
+            except Exception as error:
+                self.last_error = error
+                with self._cond:
+                    for _, _, order_id in advanced:
+                        heapq.heappush(self._heap, (now + self.retry_seconds, order_id))
+                continue
+            with self._cond:
+                for stage, _, order_id in advanced:
+                    if stage < DELIVERED:
+                        self._stages[order_id] = stage
+                        heapq.heappush(self._heap, (now + self.stage_seconds, order_id))
+                    else:
+                        # Delivered orders are final; the row answers for them from now on
+                        self._stages.pop(order_id, None)
+
+
+_tracker = None
+_tracker_lock = threading.Lock()
+
+
+# Process-wide tracker, started on first use
+def get_tracker():
+    global _tracker
+    if _tracker is None:
+        with _tracker_lock:
+            if _tracker is None:
+                tracker = OrderTracker()
+                tracker.start()
+                _tracker = tracker
+    return _tracker
+
+
+# One page of order history, newest first, optionally for a single user.
+# Pages are keyset-paginated: pass the `cursor` returned with a page to get the
+# next (older) one; it is None on the last page. Each order is a dict with its
+# items as {item: quantity}. Runs on a read-only connection, like every dashboard query.
+@timed("orders.list")
+def list_orders(username=None, cursor=None, limit=20, storage=None):
+    rows, items = (storage or get_storage()).order_page(username, cursor, limit + 1)
+    more = len(rows) > limit
+    rows = rows[:limit]
+    orders = {order_id: {"id": order_id, "username": user, "status": ORDER_STATUS[status],
+                         "created_at": created_at, "items": {}}
+              for order_id, user, status, created_at in rows}
+    for order_id, item, quantity in items:
+        if order_id in orders:
+            orders[order_id]["items"][item] = quantity
+    page = list(orders.values())
+    next_cursor = (rows[-1][3], rows[-1][0]) if more else None
+    return page, next_cursor
@@ -0,0 +1,119 @@
+import base64
+import hashlib
+import hmac
+import os
+import secrets
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# Algorithm used for new passwords; others still verify and are upgraded at login
+DEFAULT_ALGORITHM = 'scrypt'
+# Hashes computed at once. Each scrypt hash holds ~16 MB, so this bounds both
+# CPU and memory under a burst of logins; override with the HASH_WORKERS variable.
+HASH_WORKERS = int(os.environ.get('HASH_WORKERS', '4'))
+
+
+def _b64(data):
+    return base64.b64encode(data).decode()
+
+
+# scrypt (memory-hard) stored as scrypt$n$r$p$salt$hash
+class ScryptHasher:
+    name = 'scrypt'
+
+    def __init__(self, n=2 ** 14, r=8, p=1):
+        self.n, self.r, self.p = n, r, p
+
+    def _derive(self, password, salt, n, r, p):
+        return hashlib.scrypt(password.encode(), salt=salt, n=n, r=r, p=p, maxmem=256 * n * r * p, dklen=32)
+
+    def encode(self, password):
+        salt = secrets.token_bytes(16)
+        digest = self._derive(password, salt, self.n, self.r, self.p)
+        return f"{self.name}${self.n}${self.r}${self.p}${_b64(salt)}${_b64(digest)}"
+
+    def verify(self, password, encoded):
+        _, n, r, p, salt, digest = encoded.split('$')
+        derived = self._derive(password, base64.b64decode(salt), int(n), int(r), int(p))
+        return hmac.compare_digest(derived, base64.b64decode(digest))
+
+    # True if the hash was made with weaker parameters than the current ones
+    def outdated(self, encoded):
+        return [int(value) for value in encoded.split('$')[1:4]] != [self.n, self.r, self.p]
+
+
+# PBKDF2-HMAC-SHA256 stored as pbkdf2_sha256$iterations$salt$hash
+class Pbkdf2Hasher:
+    name = 'pbkdf2_sha256'
+
+    def __init__(self, iterations=600_000):
+        self.iterations = iterations
+
+    def encode(self, password):
+        salt = secrets.token_bytes(16)
+        digest = hashlib.pbkdf2_hmac('sha256', password.encode(), salt, self.iterations)
+        return f"{self.name}${self.iterations}${_b64(salt)}${_b64(digest)}"
+
+    def verify(self, password, encoded):
+        _, iterations, salt, digest = encoded.split('$')
+        derived = hashlib.pbkdf2_hmac('sha256', password.encode(), base64.b64decode(salt), int(iterations))
+        return hmac.compare_digest(derived, base64.b64decode(digest))
+
+    def outdated(self, encoded):
+        return int(encoded.split('$')[1]) < self.iterations
+
+
+# The original unsalted hex SHA-256; only verified, never produced for new passwords
+class Sha256Hasher:
+    name = 'sha256'
+
+    def encode(self, password):
+        return hashlib.sha256(password.encode()).hexdigest()
+
+    def verify(self, password, encoded):
+        return hmac.compare_digest(self.encode(password), encoded)
+
+    def outdated(self, encoded):
+        return True
+
+
+HASHERS = {hasher.name: hasher for hasher in (ScryptHasher(), Pbkdf2Hasher(), Sha256Hasher())}
+
+
+# Algorithm id of a stored hash; legacy SHA-256 hashes carry none
+def algorithm_of(encoded):
+    return encoded.split('$', 1)[0] if '$' in encoded else Sha256Hasher.name
+
+
+def hash_password(password, algorithm=DEFAULT_ALGORITHM):
+    return HASHERS[algorithm].encode(password)
+
+
+# Check a password against a stored hash. Returns (matches, needs_upgrade), where
+# needs_upgrade means the hash should be replaced with a DEFAULT_ALGORITHM one.
+def verify_password(password, encoded):
+    hasher = HASHERS.get(algorithm_of(encoded))
+    if hasher is None or not hasher.verify(password, encoded):
+        return False, False
+    return True, hasher.name != DEFAULT_ALGORITHM or hasher.outdated(encoded)
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+# Process-wide pool the slow hashes run on. hashlib releases the GIL while
+# hashing, so at most HASH_WORKERS hashes run in parallel and other sessions'
+# scripts keep running; excess logins queue instead of piling up memory.
+def get_hash_pool():
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ThreadPoolExecutor(HASH_WORKERS, thread_name_prefix='password-hash')
+    return _pool
+
+
+# Run fn(*args) on the hash pool and wait for its result
+def offload(fn, *args):
+    return get_hash_pool().submit(fn, *args).result()
@@ -0,0 +1,94 @@
+import numpy as np
+
+from catalog import NUTRIENTS
+from metrics import timed
+
+# Courses of a planned meal and the menu categories each draws from; a dish
+# listed under categories of several courses counts for the first of them
+COURSES = {
+    "Main": ["Main Courses", "Seafood", "Pasta", "Pizza", "Burgers", "Sandwiches & Wraps", "Specialty Items"],
+    "Side": ["Sides", "Salads", "Soups", "Appetizers", "Breads & Pastries"],
+    "Drink": ["Drinks", "Beverages", "Smoothies & Juices"],
+    "Dessert": ["Desserts"],
+}
+# Share of the meal's targets each course is expected to cover when shortlisting its dishes
+COURSE_SHARES = {"Main": 0.5, "Side": 0.2, "Drink": 0.1, "Dessert": 0.2}
+# Dishes shortlisted per course, and main+side / drink+dessert pairs kept, before whole meals are scored
+CANDIDATES = 64
+PAIRS = 256
+# Per-meal targets in NUTRIENTS units (kcal, g, g, g, mg) when the user sets none
+DEFAULT_TARGETS = {"calories": 800, "protein": 35, "carbs": 90, "sugar": 30, "sodium": 1000}
+# Which side of a target counts against a plan: calories and carbs should be
+# close, protein at least the target, sugar and sodium at most the target
+_BELOW = np.array([nutrient in ("calories", "protein", "carbs") for nutrient in NUTRIENTS], dtype=np.float32)
+_ABOVE = np.array([nutrient in ("calories", "carbs", "sugar", "sodium") for nutrient in NUTRIENTS],
+                  dtype=np.float32)
+
+
+# Distance of nutrition totals (an array ending in a NUTRIENTS axis) from
+# `targets`: the misses that count, each relative to its target, summed
+def score(totals, targets):
+    miss = totals - targets
+    return ((np.maximum(miss, 0) * _ABOVE + np.maximum(-miss, 0) * _BELOW) / targets).sum(axis=-1)
+
+
+# Course of each catalog row as an index into COURSES, -1 for dishes in none
+def course_codes(catalog):
+    codes = np.full(len(catalog.names), -1, dtype=np.int8)
+    for code, categories in reversed(list(enumerate(COURSES.values()))):
+        for category in categories:
+            rows = catalog.categories.get(category)
+            if rows is not None:
+                codes[rows] = code
+    return codes
+
+
+# The `keep` best (rows_a[i], rows_b[j]) pairs for `targets`, as an (n, 2)
+# row array and the pairs' (n, NUTRIENTS) totals, scoring every pair at once
+def _best_pairs(nutrition, rows_a, rows_b, targets, keep):
+    totals = (nutrition[rows_a][:, None, :] + nutrition[rows_b][None, :, :]).reshape(-1, len(NUTRIENTS))
+    best = _smallest(score(totals, targets), keep)
+    pairs = np.stack([rows_a[best // len(rows_b)], rows_b[best % len(rows_b)]], axis=1)
+    return pairs, totals[best]
+
+
+# Positions of the `k` smallest scores, in no particular order
+def _smallest(scores, k):
+    if len(scores) <= k:
+        return np.arange(len(scores))
+    return np.argpartition(scores, k)[:k]
+
+
+# A main, side, drink and dessert whose nutrition together comes closest to
+# `targets` ({nutrient: per-meal amount}, missing ones from DEFAULT_TARGETS),
+# among dishes with nutrition figures that carry every tag in `restrictions`.
+# Returns ({course: row}, {nutrient: total}), or None when a course has no
+# such dish. Each course is shortlisted to the CANDIDATES dishes closest to
+# its share of the targets; every main+side and drink+dessert pair of those
+# is scored, and every combination of the PAIRS best of each, all as array
+# operations, so the cost barely grows with the menu. Not offered in the app
+# yet: menu.json carries no nutrition figures to plan with.
+@timed("planner.plan_meal")
+def plan_meal(catalog, targets=None, restrictions=()):
+    targets = {**DEFAULT_TARGETS, **(targets or {})}
+    wanted = np.array([max(float(targets[nutrient]), 1e-3) for nutrient in NUTRIENTS], dtype=np.float32)
+    nutrition = catalog.nutrition
+    usable = catalog.matches(restrictions) & ~np.isnan(nutrition).any(axis=1)
+    codes = course_codes(catalog)
+    shortlists = []
+    for code, course in enumerate(COURSES):
+        rows = np.flatnonzero(usable & (codes == code))
+        if not len(rows):
+            return None
+        shortlists.append(rows[_smallest(score(nutrition[rows], wanted * COURSE_SHARES[course]), CANDIDATES)])
+    main, side, drink, dessert = shortlists
+    shares = COURSE_SHARES
+    first, first_totals = _best_pairs(nutrition, main, side, wanted * (shares["Main"] + shares["Side"]), PAIRS)
+    second, second_totals = _best_pairs(nutrition, drink, dessert, wanted * (shares["Drink"] + shares["Dessert"]),
+                                        PAIRS)
+    meals = first_totals[:, None, :] + second_totals[None, :, :]
+    best = int(np.argmin(score(meals, wanted)))
+    i, j = divmod(best, len(second))
+    rows = [*first[i], *second[j]]
+    return ({course: int(row) for course, row in zip(COURSES, rows)},
+            {nutrient: float(total) for nutrient, total in zip(NUTRIENTS, meals[i, j])})
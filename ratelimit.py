@@ -0,0 +1,36 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+# Token buckets keyed by an arbitrary string (a username, a client address).
+# Each key starts with `burst` tokens and regains `rate` per second up to
+# `burst`; an attempt spends one or is refused. Only the `max_keys` most
+# recently seen keys are kept: a bucket idle long enough to be evicted would
+# have refilled anyway.
+class TokenBucketLimiter:
+    def __init__(self, rate, burst, max_keys=100_000):
+        self.rate = rate
+        self.burst = burst
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    # Spend a token for `key`; False if its bucket is empty
+    def allow(self, key):
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.pop(key, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - updated) * self.rate)
+            allowed = tokens >= 1
+            self._buckets[key] = (tokens - 1 if allowed else tokens, now)
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+            return allowed
+
+    def reset(self, key=None):
+        with self._lock:
+            if key is None:
+                self._buckets.clear()
+            else:
+                self._buckets.pop(key, None)
@@ -0,0 +1,247 @@
+import atexit
+import threading
+
+import numpy as np
+
+from catalog import DIETARY_RESTRICTIONS
+from menu_store import get_menu_store
+from metrics import timed
+from storage import get_storage
+
+# Seconds between refreshes from new orders and the current favorites
+REFRESH_SECONDS = 30.0
+# Partners kept per item for each restriction
+TOP_K = 10
+# Orders read per query while catching up
+ORDER_BATCH = 100_000
+# Items of one order, or of one user's favorites, paired with each other at most
+MAX_BASKET = 50
+# Weight of two items favorited by the same user, against two items ordered together
+FAVORITE_WEIGHT = 1.0
+# Rankings precomputed per item: every partner, then partners carrying each restriction
+RANKINGS = (None, *DIETARY_RESTRICTIONS)
+# A pair of item codes a < b is stored as the key a * _KEY_SPACE + b
+_KEY_SPACE = 1 << 31
+
+
+# Rank of each entry within its run of equal values in `groups` (sorted), from 0
+def _ranks(groups):
+    if not len(groups):
+        return np.empty(0, dtype=np.int64)
+    starts = np.flatnonzero(np.r_[True, groups[1:] != groups[:-1]])
+    return np.arange(len(groups)) - np.repeat(starts, np.diff(np.r_[starts, len(groups)]))
+
+
+# Pair keys (with repeats) of every two different items sharing a group, e.g.
+# an order; at most MAX_BASKET items of a group are paired. Items are compared
+# with the ones d places further along for each distance d, so the work is a
+# few array passes rather than a loop over groups.
+def _pair_keys(groups, items):
+    order = np.argsort(groups, kind="stable")
+    groups, items = groups[order], items[order]
+    keep = _ranks(groups) < MAX_BASKET
+    groups, items = groups[keep], items[keep]
+    keys = [np.empty(0, dtype=np.int64)]
+    for d in range(1, MAX_BASKET):
+        same = groups[d:] == groups[:-d]
+        if not same.any():
+            break
+        a, b = items[:-d][same], items[d:][same]
+        keys.append(np.minimum(a, b) * _KEY_SPACE + np.maximum(a, b))
+    return np.concatenate(keys)
+
+
+# (keys, weights) with `new_keys` (weighing `weight` each) added in
+def _merge(keys, weights, new_keys, weight):
+    merged, inverse = np.unique(np.concatenate([keys, new_keys]), return_inverse=True)
+    return merged, np.bincount(inverse, np.concatenate([weights, np.full(len(new_keys), weight)]), len(merged))
+
+
+# `counts` zero-padded to `size` entries
+def _grown(counts, size):
+    return np.concatenate([counts, np.zeros(size - len(counts))])
+
+
+# "Goes well with" lists built from items ordered together and favorited by
+# the same users. Co-occurrences are a sparse matrix kept as sorted pair keys
+# with weights; a background thread folds in only the orders placed since its
+# last pass (favorites, far fewer, are recounted each time) and then ranks
+# every item's partners by cosine similarity, weight / sqrt(count a * count b),
+# keeping the TOP_K best per item for no restriction and for each dietary
+# restriction. Serving a cart is then a few array lookups.
+class Recommender:
+    def __init__(self, storage=None, menu_store=None, refresh_seconds=REFRESH_SECONDS, top_k=TOP_K):
+        self.storage = storage or get_storage()
+        self.menu_store = menu_store or get_menu_store()
+        self.refresh_seconds = refresh_seconds
+        self.top_k = top_k
+        self.last_order = 0
+        self.last_error = None
+        # Items are known by name, as orders record them; codes index the count arrays
+        self._codes = {}
+        self._names = []
+        self._order_keys = np.empty(0, dtype=np.int64)
+        self._order_weights = np.empty(0)
+        self._order_counts = np.empty(0)
+        # (pair keys, pair weights, item counts, item names) of orders and favorites together
+        self._counts = None
+        # (catalog version, partner rows, scores, items matching each ranking), rows
+        # and scores shaped (RANKINGS, catalog rows, top_k) with -1 for no partner
+        self._lists = None
+        self._refresh_lock = threading.Lock()
+        self._rank_lock = threading.Lock()
+        self._cond = threading.Condition()
+        self._thread = None
+        self._stopped = False
+
+    def start(self):
+        with self._cond:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, name="recommendations", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        with self._cond:
+            self._stopped = True
+            self._cond.notify()
+        if self._thread is not None:
+            self._thread.join()
+
+    # Fold in new orders, recount favorites and rank partners for the current menu
+    @timed("recommendations.refresh")
+    def refresh(self):
+        with self._refresh_lock:
+            catalog, _ = self.menu_store.snapshot()
+            self._read_orders()
+            favorite_keys, favorite_counts = self._favorites(catalog)
+            keys, weights = _merge(self._order_keys, self._order_weights, favorite_keys, FAVORITE_WEIGHT)
+            counts = _grown(self._order_counts, len(self._names)) + FAVORITE_WEIGHT * favorite_counts
+            self._counts = (keys, weights, counts, list(self._names))
+            self._lists = self._rank(catalog, self._counts)
+
+    # Up to `limit` catalog rows going well with the items in `item_ids`, best
+    # first: the cart items' partners with their scores summed, leaving out the
+    # cart's own items and any without every tag in `restrictions`
+    @timed("recommendations.goes_with")
+    def goes_with(self, catalog, item_ids, restrictions=(), limit=5):
+        lists = self._lists_for(catalog)
+        cart = np.array([catalog.rows_by_id[item_id] for item_id in item_ids if item_id in catalog.rows_by_id],
+                        dtype=np.int64)
+        if lists is None or not len(cart):
+            return np.empty(0, dtype=np.int32)
+        _, partners, scores, sizes = lists
+        # The most selective restriction's list leaves the most candidates after filtering for the rest
+        ranking = min((RANKINGS.index(restriction) for restriction in restrictions if restriction in RANKINGS),
+                      key=lambda n: sizes[n], default=0)
+        found, found_scores = partners[ranking, cart].ravel(), scores[ranking, cart].ravel()
+        keep = found >= 0
+        found, found_scores = found[keep], found_scores[keep]
+        keep = catalog.matches(restrictions)[found] & ~np.isin(found, cart)
+        rows, inverse = np.unique(found[keep], return_inverse=True)
+        totals = np.bincount(inverse, found_scores[keep], len(rows))
+        return rows[np.argsort(-totals, kind="stable")[:limit]].astype(np.int32)
+
+    # Ranked lists for `catalog`, re-ranked from the current counts when the menu changed since
+    def _lists_for(self, catalog):
+        lists = self._lists
+        if lists is None or lists[0] == catalog.version:
+            return lists
+        with self._rank_lock:
+            lists = self._lists
+            if lists[0] != catalog.version:
+                lists = self._lists = self._rank(catalog, self._counts)
+        return lists
+
+    def _code(self, name):
+        code = self._codes.get(name)
+        if code is None:
+            code = self._codes[name] = len(self._names)
+            self._names.append(name)
+        return code
+
+    # Add the pairs of every order placed since the last pass, ORDER_BATCH orders at a time
+    def _read_orders(self):
+        while True:
+            rows = self.storage.order_items_after(self.last_order, ORDER_BATCH)
+            if not rows:
+                return
+            orders, names = zip(*rows)
+            codes = {name: self._code(name) for name in set(names)}
+            orders = np.array(orders, dtype=np.int64)
+            items = np.fromiter(map(codes.__getitem__, names), dtype=np.int64, count=len(names))
+            self._order_keys, self._order_weights = _merge(self._order_keys, self._order_weights,
+                                                           _pair_keys(orders, items), 1.0)
+            counts = np.bincount(items, minlength=len(self._names))
+            self._order_counts = _grown(self._order_counts, len(self._names)) + counts
+            self.last_order = int(orders[-1])
+
+    # (pair keys, counts per item code) of the favorites of items still on the menu
+    def _favorites(self, catalog):
+        users, items = {}, []
+        groups = []
+        for username, item_id in self.storage.all_favorites():
+            row = catalog.rows_by_id.get(item_id)
+            if row is not None:
+                groups.append(users.setdefault(username, len(users)))
+                items.append(self._code(catalog.names[row]))
+        items = np.array(items, dtype=np.int64)
+        return _pair_keys(np.array(groups, dtype=np.int64), items), np.bincount(items, minlength=len(self._names))
+
+    # Each catalog row's top_k partners and scores per ranking, from `counts`.
+    # Both directions of every pair are sorted once by (item, score); each
+    # restriction then only filters that order and cuts it per item.
+    def _rank(self, catalog, counts):
+        keys, weights, item_counts, names = counts
+        rows_by_name = {catalog.names[row]: row for row in np.flatnonzero(catalog.live).tolist()}
+        rows = np.array([rows_by_name.get(name, -1) for name in names], dtype=np.int64)
+        first, second = keys // _KEY_SPACE, keys % _KEY_SPACE
+        similarity = weights / np.sqrt(item_counts[first] * item_counts[second])
+        first, second = rows[first], rows[second]
+        known = (first >= 0) & (second >= 0)
+        items = np.concatenate([first[known], second[known]])
+        partners = np.concatenate([second[known], first[known]])
+        similarity = np.tile(similarity[known], 2)
+        order = np.lexsort((-similarity, items))
+        items, partners, similarity = items[order], partners[order], similarity[order]
+        top = np.full((len(RANKINGS), len(catalog.names), self.top_k), -1, dtype=np.int32)
+        scores = np.zeros(top.shape, dtype=np.float32)
+        sizes = []
+        for n, restriction in enumerate(RANKINGS):
+            allowed = catalog.matches(() if restriction is None else (restriction,))
+            sizes.append(int(allowed.sum()))
+            keep = allowed[partners]
+            ranked, rank = partners[keep], _ranks(items[keep])
+            cut = rank < self.top_k
+            top[n, items[keep][cut], rank[cut]] = ranked[cut]
+            scores[n, items[keep][cut], rank[cut]] = similarity[keep][cut]
+        return catalog.version, top, scores, sizes
+
+    def _run(self):
+        while True:
+            try:
+                self.refresh()
+            except Exception as error:
+                self.last_error = error
+            with self._cond:
+                if not self._stopped:
+                    self._cond.wait(self.refresh_seconds)
+                if self._stopped:
+                    return
+
+
+_recommender = None
+_recommender_lock = threading.Lock()
+
+
+# Process-wide recommender, refreshing in the background from first use
+def get_recommender():
+    global _recommender
+    if _recommender is None:
+        with _recommender_lock:
+            if _recommender is None:
+                recommender = Recommender()
+                recommender.start()
+                atexit.register(recommender.stop)
+                _recommender = recommender
+    return _recommender
@@ -0,0 +1,219 @@
+import copy
+import heapq
+import math
+import re
+from bisect import bisect_left, bisect_right
+
+import numpy as np
+
+# Share of the query's trigrams a name must contain to count as a (fuzzy) match
+MIN_COVERAGE = 0.5
+# Weight of the share of the name's own trigrams that matched; breaks ties toward closer names
+NAME_SHARE_WEIGHT = 0.1
+# Candidate lists shorter than 1/SPARSE_RATIO of the catalog are merged and probed
+# instead of counting matches over the whole catalog
+SPARSE_RATIO = 16
+
+# Edits a misspelled one-word query may be from a menu word, by the query's
+# length: none below 4 letters, 1 up to 5, 2 from 6. Only tried when the
+# trigrams match nothing, e.g. 'ceasar' shares a single trigram with 'caesar'.
+TYPO_LENGTHS = ((6, 2), (4, 1))
+
+_non_word = re.compile(r"[^0-9a-z]+")
+_no_rows = np.empty(0, dtype=np.int32)
+
+
+# Lower-case a name or query and collapse punctuation to single spaces
+def normalize(text):
+    return _non_word.sub(" ", text.lower()).strip()
+
+
+# Character trigrams of each word padded with spaces, so word starts and ends count
+def trigrams(text):
+    grams = set()
+    for word in text.split():
+        padded = f" {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+# Like trigrams(), but the last word is treated as a prefix still being typed
+def query_trigrams(text):
+    words = text.split()
+    grams = trigrams(" ".join(words[:-1]))
+    padded = f" {words[-1]}"
+    grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def _max_typos(word):
+    return next((typos for length, typos in TYPO_LENGTHS if len(word) >= length), 0)
+
+
+# Edit distance counting a swap of adjacent letters as one edit (optimal
+# string alignment), or `limit` + 1 as soon as it must exceed `limit`
+def _distance(a, b, limit):
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    before, previous = None, list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (a[i - 1] != b[j - 1]))
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], before[j - 2] + 1)
+        if min(current) > limit:
+            return limit + 1
+        before, previous = previous, current
+    return previous[-1]
+
+
+# Search index over item names, built once and patched as the menu changes.
+# A trigram inverted index gives typo-tolerant prefix matching: a query scores
+# each name by the share of its trigrams the name contains. A name needing k of
+# the query's n trigrams must contain one of the n - k + 1 rarest, so when those
+# posting lists are short only they are merged into candidates and the rest are
+# counted against the candidates with a binary search; otherwise every match is
+# counted at once with np.bincount. A one-word query matching nothing falls
+# back to the menu words within a typo or two of it.
+class MenuSearchIndex:
+    def __init__(self, names):
+        self.size = len(names)
+        postings = {}
+        words = []
+        self.gram_counts = np.zeros(len(names), dtype=np.float32)
+        for row, name in enumerate(names):
+            key = normalize(name)
+            grams = trigrams(key)
+            self.gram_counts[row] = len(grams)
+            for gram in grams:
+                postings.setdefault(gram, []).append(row)
+            words.extend((word, row) for word in set(key.split()))
+        self.postings = {gram: np.array(rows, dtype=np.int32) for gram, rows in postings.items()}
+        words.sort()
+        self.words = [word for word, _ in words]
+        self.word_rows = np.array([row for _, row in words], dtype=np.int32)
+        # Distinct words, for the typo fallback; listed on first use
+        self._vocabulary = None
+
+    # A new index with some rows renamed; this one is left untouched. `changes`
+    # holds (row, old_name, new_name) with old_name None for a new row and
+    # new_name None for a removed one. Only the posting lists of the trigrams
+    # involved are rebuilt.
+    def updated(self, changes):
+        new = copy.copy(self)
+        new.size = max([self.size] + [row + 1 for row, _, _ in changes])
+        new.gram_counts = np.concatenate([self.gram_counts, np.zeros(new.size - self.size, dtype=np.float32)])
+        dropped, added = {}, {}
+        old_words, new_words = set(), []
+        for row, old_name, new_name in changes:
+            if old_name is not None:
+                key = normalize(old_name)
+                for gram in trigrams(key):
+                    dropped.setdefault(gram, []).append(row)
+                old_words.update((word, row) for word in key.split())
+            if new_name is not None:
+                key = normalize(new_name)
+                grams = trigrams(key)
+                new.gram_counts[row] = len(grams)
+                for gram in grams:
+                    added.setdefault(gram, []).append(row)
+                new_words.extend((word, row) for word in set(key.split()))
+        words = list(heapq.merge(
+            (entry for entry in zip(self.words, self.word_rows.tolist()) if entry not in old_words),
+            sorted(new_words)))
+        new.words = [word for word, _ in words]
+        new.word_rows = np.array([row for _, row in words], dtype=np.int32)
+        new._vocabulary = None
+        new.postings = dict(self.postings)
+        for gram in dropped.keys() | added.keys():
+            rows = new.postings.get(gram, _no_rows)
+            if gram in dropped:
+                rows = rows[~np.isin(rows, dropped[gram])]
+            if gram in added:
+                rows = np.union1d(rows, np.array(added[gram], dtype=np.int32))
+            if len(rows):
+                new.postings[gram] = rows
+            else:
+                new.postings.pop(gram, None)
+        return new
+
+    # Rows having a word that starts with `prefix`
+    def prefix_rows(self, prefix):
+        start = bisect_left(self.words, prefix)
+        end = bisect_left(self.words, prefix + "￿", start)
+        return np.unique(self.word_rows[start:end])
+
+    # Best-matching rows for `query`, best first. `allowed` is an optional
+    # boolean array over all rows (e.g. the restriction filter) to intersect with.
+    def search(self, query, allowed=None, limit=50):
+        key = normalize(query)
+        if not key:
+            return _no_rows
+        grams = query_trigrams(key)
+        if grams:
+            need = max(1, math.ceil(MIN_COVERAGE * len(grams)))
+            lists = sorted((self.postings.get(gram, _no_rows) for gram in grams), key=len)
+            rarest = lists[:len(grams) - need + 1]
+            if sum(len(posting) for posting in rarest) * SPARSE_RATIO < self.size:
+                rows = np.unique(np.concatenate(rarest))
+                if allowed is not None:
+                    rows = rows[allowed[rows]]
+                shared = np.zeros(len(rows), dtype=np.float32)
+                for posting in lists:
+                    if len(posting):
+                        found = np.minimum(np.searchsorted(posting, rows), len(posting) - 1)
+                        shared += posting[found] == rows
+                keep = shared >= need
+                rows, shared = rows[keep], shared[keep]
+            else:
+                shared = np.bincount(np.concatenate(lists), minlength=self.size)
+                rows = np.flatnonzero(shared >= need)
+                if allowed is not None:
+                    rows = rows[allowed[rows]]
+                shared = shared[rows]
+            scores = shared / len(grams) + NAME_SHARE_WEIGHT * shared / self.gram_counts[rows]
+        else:
+            # A single character: plain word-prefix lookup, shortest names first
+            rows = self.prefix_rows(key)
+            if allowed is not None:
+                rows = rows[allowed[rows]]
+            scores = -self.gram_counts[rows]
+        if not len(rows) and " " not in key:
+            return self._typo_rows(key, allowed, limit)
+        if len(rows) > limit:
+            best = np.argpartition(-scores, limit - 1)[:limit]
+            rows, scores = rows[best], scores[best]
+        return rows[np.argsort(-scores, kind="stable")]
+
+    # Rows having a word within _max_typos(word) edits of `word`, or whose
+    # start is (the word may still be typed), fewest edits and then shortest
+    # names first
+    def _typo_rows(self, word, allowed=None, limit=50):
+        typos = _max_typos(word)
+        if not typos:
+            return _no_rows
+        if self._vocabulary is None:
+            self._vocabulary = list(dict.fromkeys(self.words))
+        letters = set(word)
+        found, edits = [], []
+        for candidate in self._vocabulary:
+            start = candidate[:len(word)]
+            # Each edit changes at most two letters of the set a word is made of
+            if len(letters.symmetric_difference(start)) > 2 * typos and \
+                    len(letters.symmetric_difference(candidate)) > 2 * typos:
+                continue
+            distance = min(_distance(word, candidate, typos), _distance(word, start, typos))
+            if distance <= typos:
+                found.append(self.word_rows[bisect_left(self.words, candidate):bisect_right(self.words, candidate)])
+                edits.append(distance)
+        if not found:
+            return _no_rows
+        distances = np.repeat(edits, [len(rows) for rows in found])
+        rows = np.concatenate(found)
+        if allowed is not None:
+            keep = allowed[rows]
+            rows, distances = rows[keep], distances[keep]
+        rows = rows[np.lexsort((self.gram_counts[rows], distances))]
+        _, first = np.unique(rows, return_index=True)
+        return rows[np.sort(first)][:limit]
@@ -0,0 +1,147 @@
+import functools
+import re
+import sqlite3
+
+from db import ConnectionPool
+from metrics import timed
+
+# A local stand-in for a PostgreSQL server: a DB-API driver over an SQLite file
+# that speaks just enough of psycopg's interface and PostgreSQL's dialect for
+# the statements storage.PostgresStorage and migrations.SERVER_STEPS issue.
+# Tests and single-machine runs exercise the server code path with it, no
+# server required (STORAGE_URL=standin:app-server.db).
+
+paramstyle = 'format'
+IntegrityError = sqlite3.IntegrityError
+
+# PostgreSQL-isms rewritten to SQLite, applied in order after %s -> ?
+_REWRITES = (
+    (re.compile(r'\bBIGSERIAL PRIMARY KEY\b'), 'INTEGER PRIMARY KEY'),
+    (re.compile(r"to_tsvector\('simple', ([\w.]+)\) @@ to_tsquery\('simple', \?\)"), r'ts_match(\1, ?)'),
+)
+# Statements with no SQLite counterpart, accepted and ignored (GIN indexes)
+_IGNORED = re.compile(r'\bUSING GIN\b')
+_WORDS = re.compile(r'\w+')
+_TERM = re.compile(r"'((?:[^']|'')*)'(:\*)?")
+
+
+@functools.lru_cache(maxsize=512)
+def _translate(sql):
+    if _IGNORED.search(sql):
+        return None
+    sql = sql.replace('%s', '?')
+    for pattern, replacement in _REWRITES:
+        sql = pattern.sub(replacement, sql)
+    return sql
+
+
+# to_tsvector('simple', text) @@ to_tsquery('simple', query) for queries of
+# the form 'word' & 'word':*  (every term must match, :* as a prefix)
+def _ts_match(text, query):
+    terms = _TERM.findall(query)
+    if not terms:
+        return False
+    words = _WORDS.findall((text or '').lower())
+    for term, prefix in terms:
+        term = term.replace("''", "'").lower()
+        if not any(word.startswith(term) if prefix else word == term for word in words):
+            return False
+    return True
+
+
+class Cursor:
+    def __init__(self, conn):
+        self._conn = conn
+        self._cursor = conn.cursor()
+
+    # `prepare` is accepted for psycopg compatibility; SQLite already caches
+    # compiled statements per connection
+    def execute(self, sql, params=(), prepare=None):
+        sql = _translate(sql)
+        if sql is not None:
+            self._begin(sql)
+            self._cursor.execute(sql, params)
+        return self
+
+    def executemany(self, sql, rows):
+        sql = _translate(sql)
+        if sql is not None:
+            self._begin(sql)
+            self._cursor.executemany(sql, rows)
+        return self
+
+    # Like PostgreSQL, every statement runs inside a transaction that lasts
+    # until commit. Ones that write (or take the advisory lock) take SQLite's
+    # write lock up front, so a transaction never fails upgrading a read lock.
+    def _begin(self, sql):
+        if not self._conn.in_transaction:
+            reads = sql.lstrip()[:6].upper() == 'SELECT' and 'pg_advisory' not in sql
+            self._conn.execute('BEGIN' if reads else 'BEGIN IMMEDIATE')
+
+    def fetchone(self):
+        return self._cursor.fetchone()
+
+    def fetchall(self):
+        return self._cursor.fetchall()
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    @property
+    def rowcount(self):
+        return self._cursor.rowcount
+
+    def close(self):
+        self._cursor.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class Connection:
+    def __init__(self, path, timeout=10.0):
+        self._conn = sqlite3.connect(path, timeout=timeout, check_same_thread=False, isolation_level=None)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute('PRAGMA foreign_keys=ON')
+        self._conn.create_function('ts_match', 2, _ts_match, deterministic=True)
+        self._conn.create_function('pg_advisory_xact_lock', 1, lambda key: None)
+
+    def cursor(self):
+        return Cursor(self._conn)
+
+    def execute(self, sql, params=(), prepare=None):
+        return self.cursor().execute(sql, params, prepare)
+
+    def commit(self):
+        self._conn.commit()
+
+    def rollback(self):
+        self._conn.rollback()
+
+    def close(self):
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    # Commit on success, roll back on error, like psycopg's connection block
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.commit()
+        else:
+            self.rollback()
+
+
+def connect(path, timeout=10.0):
+    return Connection(path, timeout)
+
+
+# ConnectionPool handing out stand-in connections, in place of psycopg_pool's
+class StandInPool(ConnectionPool):
+    @timed("db.connect")
+    def _connect(self):
+        return connect(self.path, self.timeout)
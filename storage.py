@@ -0,0 +1,363 @@
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import Counter
+
+import standin
+from db import APP_DB, get_pool
+from metrics import count, timed
+from migrations import MIGRATIONS, migrate, migrate_server
+
+# Where application data lives: empty for the local SQLite file (APP_DB),
+# postgresql://user@host/db for a server every node shares, or
+# standin:<path> for the local stand-in of one (see standin.py)
+STORAGE_URL = os.environ.get('STORAGE_URL', '')
+# Connections each node keeps open to a server
+SERVER_POOL_SIZE = int(os.environ.get('SERVER_POOL_SIZE', '8'))
+
+_WORDS = re.compile(r'\w+')
+DAY = 24 * 3600
+
+
+# Persistence for users, feedback, orders, carts, favorites and menu
+# translations. The modules that own those (auth, feedback, orders, carts,
+# favorites, translations) only go through these methods, so the backend can
+# change without touching them. The SQL is written once, with ? placeholders,
+# in the subset SQLite and PostgreSQL share; subclasses supply connections,
+# statement execution, the schema and the one real dialect difference,
+# feedback search.
+class Storage:
+    # Raised by the driver when a unique key is violated
+    IntegrityError = Exception
+    # Bumped by every write on this node that changes the dashboard summary
+    summary_version = 0
+
+    # Bring the schema up to date
+    def migrate(self):
+        raise NotImplementedError
+
+    # Context manager yielding a connection and committing on success.
+    # Dashboard listings ask for a read-only one.
+    def _connection(self, readonly=False):
+        raise NotImplementedError
+
+    # (FROM clause, WHERE condition, parameter) restricting feedback aliased
+    # `f` to rows matching free text `query`, or None when it has no words to
+    # search for (blank or only punctuation), which lists all feedback
+    def _feedback_search(self, query):
+        raise NotImplementedError
+
+    def _execute(self, conn, sql, params=()):
+        count("db.statements")
+        return conn.execute(sql, params)
+
+    def _executemany(self, conn, sql, rows):
+        count("db.statements")
+        conn.executemany(sql, rows)
+
+    def _summary_changed(self):
+        self.summary_version += 1
+
+    # (password hash, role) for a username, or None
+    def find_user(self, username):
+        with self._connection() as conn:
+            return self._execute(conn, 'SELECT password, role FROM users WHERE username = ?', (username,)).fetchone()
+
+    # Replace a password hash, unless it changed since `old` was read
+    def replace_password(self, username, old, new):
+        with self._connection() as conn:
+            self._execute(conn, 'UPDATE users SET password = ? WHERE username = ? AND password = ?',
+                          (new, username, old))
+
+    # Returns False if the username is taken
+    def add_user(self, username, password, role):
+        try:
+            with self._connection() as conn:
+                self._execute(conn, 'INSERT INTO users (username, password, role) VALUES (?, ?, ?)',
+                              (username, password, role))
+                self._execute(conn, 'INSERT INTO role_counts (role, users) VALUES (?, 1)'
+                                    ' ON CONFLICT (role) DO UPDATE SET users = role_counts.users + 1', (role,))
+        except self.IntegrityError:
+            return False
+        self._summary_changed()
+        return True
+
+    # Up to `limit` usernames with a role in name order, after `cursor` if given
+    def usernames(self, role, cursor=None, limit=50):
+        sql, params = 'SELECT username FROM users WHERE role = ?', [role]
+        if cursor:
+            sql += ' AND username > ?'
+            params.append(cursor)
+        sql += ' ORDER BY username LIMIT ?'
+        params.append(limit)
+        with self._connection(readonly=True) as conn:
+            return [row[0] for row in self._execute(conn, sql, params)]
+
+    # Insert (username, feedback, created_at) rows in one transaction
+    def add_feedback(self, rows):
+        days = Counter(int(created_at // DAY) for _, _, created_at in rows)
+        with self._connection() as conn:
+            self._executemany(conn, 'INSERT INTO feedback (username, feedback, created_at) VALUES (?, ?, ?)', rows)
+            self._executemany(conn, 'INSERT INTO feedback_days (day, feedback) VALUES (?, ?) ON CONFLICT (day)'
+                                    ' DO UPDATE SET feedback = feedback_days.feedback + excluded.feedback',
+                              list(days.items()))
+        self._summary_changed()
+
+    # Up to `limit` (id, username, feedback, created_at) rows, newest first,
+    # older than id `cursor` if given and matching free text `query` if given
+    def feedback_page(self, cursor=None, limit=50, query=None):
+        source, where, params = 'feedback f', [], []
+        search = self._feedback_search(query) if query else None
+        if search:
+            source, condition, param = search
+            where.append(condition)
+            params.append(param)
+        if cursor:
+            where.append('f.id < ?')
+            params.append(cursor)
+        sql = f'SELECT f.id, f.username, f.feedback, f.created_at FROM {source}'
+        if where:
+            sql += ' WHERE ' + ' AND '.join(where)
+        sql += ' ORDER BY f.id DESC LIMIT ?'
+        params.append(limit)
+        with self._connection(readonly=True) as conn:
+            return self._execute(conn, sql, params).fetchall()
+
+    # (id, status, updated_at) of every order whose status is below `status`
+    def open_orders(self, status):
+        with self._connection() as conn:
+            return self._execute(conn, 'SELECT id, status, updated_at FROM orders WHERE status < ?',
+                                 (status,)).fetchall()
+
+    # Insert an order at status 0 and its {item: quantity} in one transaction; returns its id
+    def add_order(self, username, items, now):
+        with self._connection() as conn:
+            order_id = self._execute(conn, 'INSERT INTO orders (username, status, created_at, updated_at)'
+                                           ' VALUES (?, 0, ?, ?) RETURNING id', (username, now, now)).fetchone()[0]
+            self._executemany(conn, 'INSERT INTO order_items (order_id, item, quantity) VALUES (?, ?, ?)',
+                              [(order_id, item, quantity) for item, quantity in items.items()])
+            self._executemany(conn, 'INSERT INTO item_orders (item, quantity) VALUES (?, ?) ON CONFLICT (item)'
+                                    ' DO UPDATE SET quantity = item_orders.quantity + excluded.quantity',
+                              list(items.items()))
+        self._summary_changed()
+        return order_id
+
+    # (order_id, item) rows of the first `limit` orders with an id above `order_id`, by order
+    def order_items_after(self, order_id, limit=100_000):
+        with self._connection(readonly=True) as conn:
+            return self._execute(conn, 'SELECT order_id, item FROM order_items WHERE order_id IN'
+                                 ' (SELECT id FROM orders WHERE id > ? ORDER BY id LIMIT ?) ORDER BY order_id',
+                                 (order_id, limit)).fetchall()
+
+    # An order's status, or None if it doesn't exist
+    def order_status(self, order_id):
+        with self._connection() as conn:
+            row = self._execute(conn, 'SELECT status FROM orders WHERE id = ?', (order_id,)).fetchone()
+        return row[0] if row else None
+
+    # Apply (status, updated_at, id) rows in one transaction
+    def set_order_statuses(self, rows):
+        with self._connection() as conn:
+            self._executemany(conn, 'UPDATE orders SET status = ?, updated_at = ? WHERE id = ?', rows)
+
+    # Up to `limit` (id, username, status, created_at) orders, newest first,
+    # optionally for one user and before the (created_at, id) `cursor`, plus
+    # the (order_id, item, quantity) rows of their items
+    def order_page(self, username=None, cursor=None, limit=20):
+        sql = 'SELECT id, username, status, created_at FROM orders'
+        where, params = [], []
+        if username:
+            where.append('username = ?')
+            params.append(username)
+        if cursor:
+            where.append('(created_at, id) < (?, ?)')
+            params.extend(cursor)
+        if where:
+            sql += ' WHERE ' + ' AND '.join(where)
+        sql += ' ORDER BY created_at DESC, id DESC LIMIT ?'
+        params.append(limit)
+        with self._connection(readonly=True) as conn:
+            rows = self._execute(conn, sql, params).fetchall()
+            items = []
+            if rows:
+                marks = ', '.join('?' * len(rows))
+                items = self._execute(conn, f'SELECT order_id, item, quantity FROM order_items'
+                                            f' WHERE order_id IN ({marks})', [row[0] for row in rows]).fetchall()
+        return rows, items
+
+    # (item_id, quantity) rows of a user's saved cart
+    def load_cart(self, username):
+        with self._connection() as conn:
+            return self._execute(conn, 'SELECT item_id, quantity FROM carts WHERE username = ?',
+                                 (username,)).fetchall()
+
+    # Write (username, item_id, quantity) rows in one transaction; quantity 0 removes the item
+    def save_cart_entries(self, rows):
+        with self._connection() as conn:
+            self._executemany(conn, 'DELETE FROM carts WHERE username = ? AND item_id = ?',
+                              [(username, item_id) for username, item_id, quantity in rows if not quantity])
+            self._executemany(conn, 'INSERT INTO carts (username, item_id, quantity) VALUES (?, ?, ?)'
+                                    ' ON CONFLICT (username, item_id) DO UPDATE SET quantity = excluded.quantity',
+                              [row for row in rows if row[2]])
+
+    # Mark items as favorites; ones already marked are left as they are
+    def add_favorites(self, username, item_ids):
+        with self._connection() as conn:
+            self._executemany(conn, 'INSERT INTO favorites (username, item_id) VALUES (?, ?) ON CONFLICT DO NOTHING',
+                              [(username, item_id) for item_id in item_ids])
+
+    def remove_favorite(self, username, item_id):
+        with self._connection() as conn:
+            self._execute(conn, 'DELETE FROM favorites WHERE username = ? AND item_id = ?', (username, item_id))
+
+    # (username, item_id) rows of every user's favorites
+    def all_favorites(self):
+        with self._connection(readonly=True) as conn:
+            return self._execute(conn, 'SELECT username, item_id FROM favorites').fetchall()
+
+    # Set of a user's favorite item ids
+    def favorites(self, username):
+        with self._connection() as conn:
+            return {item_id for item_id, in self._execute(conn, 'SELECT item_id FROM favorites WHERE username = ?',
+                                                          (username,))}
+
+    # {source text: translation} of every string stored for a locale
+    def translations(self, locale):
+        with self._connection(readonly=True) as conn:
+            return dict(self._execute(conn, 'SELECT source, text FROM translations WHERE locale = ?',
+                                      (locale,)).fetchall())
+
+    # Store (source text, translation) pairs for a locale; ones already stored are kept
+    def add_translations(self, locale, pairs):
+        with self._connection() as conn:
+            self._executemany(conn, 'INSERT INTO translations (locale, source, text) VALUES (?, ?, ?)'
+                                    ' ON CONFLICT DO NOTHING',
+                              [(locale, source, text) for source, text in pairs])
+
+    # Count a session starting to filter the menu by each of `restrictions`
+    def count_restriction_picks(self, restrictions):
+        with self._connection() as conn:
+            self._executemany(conn, 'INSERT INTO restriction_picks (restriction, picks) VALUES (?, 1)'
+                                    ' ON CONFLICT (restriction) DO UPDATE SET picks = restriction_picks.picks + 1',
+                              [(restriction,) for restriction in restrictions])
+        self._summary_changed()
+
+    # The admin dashboard's figures, read from the summary tables the writes
+    # above keep up to date, so the cost doesn't grow with users, feedback or
+    # orders: users per role, feedback per day for the last `days` days (as
+    # (day number since the epoch, count)), the `top` items by units ordered,
+    # and how often each restriction was picked
+    @timed("storage.dashboard_summary")
+    def dashboard_summary(self, days=30, top=10, now=None):
+        today = int((time.time() if now is None else now) // DAY)
+        with self._connection(readonly=True) as conn:
+            return {
+                "users": dict(self._execute(conn, 'SELECT role, users FROM role_counts').fetchall()),
+                "feedback_per_day": self._execute(conn, 'SELECT day, feedback FROM feedback_days WHERE day > ?'
+                                                        ' ORDER BY day', (today - days,)).fetchall(),
+                "top_items": self._execute(conn, 'SELECT item, quantity FROM item_orders'
+                                                 ' ORDER BY quantity DESC LIMIT ?', (top,)).fetchall(),
+                "restrictions": self._execute(conn, 'SELECT restriction, picks FROM restriction_picks'
+                                                    ' ORDER BY picks DESC').fetchall(),
+            }
+
+
+# The single-node backend: one SQLite file through the process-wide pools,
+# with dashboard reads on the read-only pool
+class SqliteStorage(Storage):
+    IntegrityError = sqlite3.IntegrityError
+
+    def __init__(self, path=APP_DB):
+        self.path = path
+
+    def migrate(self):
+        migrate(self.path, MIGRATIONS[APP_DB])
+
+    def _connection(self, readonly=False):
+        return get_pool(self.path, readonly=readonly).connection()
+
+    # Turn free text into an FTS5 query: every word must match, the last one as a prefix
+    def _feedback_search(self, query):
+        terms = ['"' + term.replace('"', '""') + '"' for term in query.split() if _WORDS.search(term)]
+        if not terms:
+            return None
+        terms[-1] += '*'
+        return 'feedback_fts JOIN feedback f ON f.id = feedback_fts.rowid', 'feedback_fts MATCH ?', ' '.join(terms)
+
+
+# A PostgreSQL server shared by every node, through a connection pool whose
+# connection() blocks commit on success (psycopg_pool's, or standin's). Every
+# statement is sent as a prepared statement, so the server plans each query
+# once per connection. `driver` is the DB-API module behind the pool; an
+# optional `read_pool` (a replica) serves dashboard reads.
+class PostgresStorage(Storage):
+    def __init__(self, pool, driver, read_pool=None):
+        self.pool = pool
+        self.read_pool = read_pool or pool
+        self.IntegrityError = driver.IntegrityError
+        self._statements = {}
+
+    # Open a psycopg pool to the server at `url`. psycopg and psycopg_pool are
+    # only needed for this backend: pip install "psycopg[binary,pool]"
+    @classmethod
+    def connect(cls, url, size=SERVER_POOL_SIZE):
+        import psycopg
+        from psycopg_pool import ConnectionPool
+        return cls(ConnectionPool(url, min_size=1, max_size=size, open=True), psycopg)
+
+    def migrate(self):
+        migrate_server(self.pool)
+
+    def _connection(self, readonly=False):
+        return (self.read_pool if readonly else self.pool).connection()
+
+    # The statement with %s placeholders, translated once
+    def _sql(self, sql):
+        statement = self._statements.get(sql)
+        if statement is None:
+            statement = self._statements[sql] = sql.replace('?', '%s')
+        return statement
+
+    def _execute(self, conn, sql, params=()):
+        count("db.statements")
+        return conn.execute(self._sql(sql), params, prepare=True)
+
+    def _executemany(self, conn, sql, rows):
+        count("db.statements")
+        with conn.cursor() as cursor:
+            cursor.executemany(self._sql(sql), rows)
+
+    # A tsquery of the words: every one must match, the last one as a prefix
+    def _feedback_search(self, query):
+        terms = ["'" + word + "'" for word in _WORDS.findall(query.lower())]
+        if not terms:
+            return None
+        terms[-1] += ':*'
+        return 'feedback f', "to_tsvector('simple', f.feedback) @@ to_tsquery('simple', ?)", ' & '.join(terms)
+
+
+# Storage for a STORAGE_URL (see above)
+def open_storage(url=''):
+    if not url:
+        return SqliteStorage(APP_DB)
+    if url.startswith(('postgresql://', 'postgres://')):
+        return PostgresStorage.connect(url)
+    if url.startswith('standin:'):
+        return PostgresStorage(standin.StandInPool(url[len('standin:'):]), standin)
+    raise ValueError(f"Unsupported STORAGE_URL {url!r}")
+
+
+_storage = None
+_storage_lock = threading.Lock()
+
+
+# Process-wide storage for STORAGE_URL, opened on first use
+def get_storage():
+    global _storage
+    if _storage is None:
+        with _storage_lock:
+            if _storage is None:
+                _storage = open_storage(STORAGE_URL)
+    return _storage
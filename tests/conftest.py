@@ -0,0 +1,36 @@
+# Shared fixtures. Every test runs in its own temporary folder, so databases
+# the code opens by relative path (app.db, the legacy files) never land in the
+# checkout, and the process-wide connection pools are closed afterwards.
+#
+#     python -m pytest -q
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import standin
+from db import close_pools
+from storage import PostgresStorage, SqliteStorage
+
+
+@pytest.fixture(autouse=True)
+def workdir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    yield tmp_path
+    close_pools()
+
+
+# Each backend, migrated: the SQLite file and the server code path through
+# the local stand-in (standin.py)
+@pytest.fixture(params=["sqlite", "server"])
+def storage(request, workdir):
+    if request.param == "sqlite":
+        storage = SqliteStorage(str(workdir / "app.db"))
+    else:
+        storage = PostgresStorage(standin.StandInPool(str(workdir / "app-server.db")), standin)
+    storage.migrate()
+    yield storage
+    if request.param == "server":
+        storage.pool.close()
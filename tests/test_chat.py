@@ -0,0 +1,89 @@
+# The menu chat's parser: what a message asks for, and what it rules out
+import pytest
+
+from catalog import load_catalog
+from chat import NEGATED_PHRASES, ChatParser, ChatQuery, describe, run_query
+from search import MenuSearchIndex
+
+
+@pytest.fixture(scope="module")
+def catalog():
+    return load_catalog()
+
+
+@pytest.fixture(scope="module")
+def parser(catalog):
+    return ChatParser(catalog.category_names())
+
+
+def test_tags_categories_and_keywords(parser):
+    query = parser.parse("Something vegan and high protein, maybe a salad")
+    assert query.tags == ("high-protein", "vegan")
+    assert query.categories == ("Salads",)
+    assert query.keywords == ""
+    assert parser.parse("any quinoa dishes?").keywords == "quinoa"
+    assert parser.parse("show me drinks").categories == ("Beverages", "Drinks", "Smoothies & Juices")
+
+
+@pytest.mark.parametrize("message", [
+    "I don't want nuts", "I dont want nuts", "I don’t want any nuts", "I'm allergic to nuts",
+    "allergic to peanuts", "no nuts please", "I can't have nuts", "never nuts", "without nuts",
+])
+def test_negations_exclude_nuts(parser, message):
+    query = parser.parse(message)
+    assert query.excluded_tags == ("contains nuts",)
+    assert query.keywords == "" and query.tags == ()
+
+
+def test_negated_nuts_never_suggests_nut_dishes(parser, catalog):
+    index = MenuSearchIndex(catalog.names)
+    for message in ["I don't want nuts", "I'm allergic to nuts"]:
+        rows = run_query(catalog, index, parser.parse(message))
+        assert len(rows)
+        assert not any("contains nuts" in catalog.tags[row] for row in rows)
+        assert describe(parser.parse(message)) == "without contains nuts"
+
+
+def test_negation_ends_with_its_clause(parser):
+    query = parser.parse("no soup, but something vegan")
+    assert query.excluded_categories == ("Soups",)
+    assert query.tags == ("vegan",)
+    query = parser.parse("I'm allergic to dairy though I love pasta")
+    assert query.tags == ("dairy-free",)
+    assert query.categories == ("Pasta",)
+    assert query.keywords == "love"
+
+
+def test_negated_unknown_words_exclude_names(parser):
+    query = parser.parse("pasta without mushrooms")
+    assert query.categories == ("Pasta",)
+    assert query.excluded_words == ("mushroom",)
+    assert query.keywords == ""
+
+
+def test_negated_tag_phrase_is_excluded(parser):
+    assert parser.parse("nothing vegan").excluded_tags == ("vegan",)
+
+
+@pytest.mark.parametrize("phrase, meaning", sorted(NEGATED_PHRASES.items()))
+def test_negated_phrases(parser, phrase, meaning):
+    kind, tag = meaning
+    query = parser.parse(f"no {phrase}")
+    if kind == "require":
+        assert query.tags == (tag,) and query.excluded_tags == ()
+    else:
+        assert query.excluded_tags == (tag,) and query.tags == ()
+    assert query.keywords == "" and query.excluded_words == ()
+    # The same word without a negation is a plain search
+    assert parser.parse(phrase).excluded_tags == ()
+
+
+def test_parses_are_memoized(parser):
+    first = parser.parse("Vegan   SOUP")
+    assert parser.parse("vegan soup") is first
+    assert first == ChatQuery(("vegan",), ("Soups",), (), (), (), "")
+
+
+def test_nothing_recognized(parser):
+    query = parser.parse("hi, thanks!")
+    assert describe(query) == ""
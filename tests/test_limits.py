@@ -0,0 +1,108 @@
+# Login throttling: the token buckets and the client address they are keyed on
+import types
+
+import pytest
+
+import auth
+import ratelimit
+from auth import LoginThrottled, authenticate_user, client_address
+from cache import LRUCache
+from ratelimit import TokenBucketLimiter
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = types.SimpleNamespace(now=100.0)
+    monkeypatch.setattr(ratelimit, "time", types.SimpleNamespace(monotonic=lambda: clock.now))
+    return clock
+
+
+def test_burst_then_refused(clock):
+    limiter = TokenBucketLimiter(rate=1.0, burst=3)
+    assert [limiter.allow("bob") for _ in range(4)] == [True, True, True, False]
+    assert limiter.allow("amy")
+
+
+def test_refill_at_rate_up_to_burst(clock):
+    limiter = TokenBucketLimiter(rate=0.5, burst=2)
+    limiter.allow("bob")
+    limiter.allow("bob")
+    clock.now += 1.0
+    assert not limiter.allow("bob")
+    clock.now += 1.0
+    assert limiter.allow("bob")
+    assert not limiter.allow("bob")
+    clock.now += 1_000.0
+    assert [limiter.allow("bob") for _ in range(3)] == [True, True, False]
+
+
+def test_refused_attempts_spend_nothing(clock):
+    limiter = TokenBucketLimiter(rate=1.0, burst=1)
+    limiter.allow("bob")
+    for _ in range(4):
+        clock.now += 0.125
+        assert not limiter.allow("bob")
+    clock.now += 0.5
+    assert limiter.allow("bob")
+
+
+def test_reset(clock):
+    limiter = TokenBucketLimiter(rate=0.0, burst=1)
+    limiter.allow("bob")
+    limiter.allow("amy")
+    limiter.reset("bob")
+    assert limiter.allow("bob")
+    assert not limiter.allow("amy")
+    limiter.reset()
+    assert limiter.allow("amy")
+
+
+def test_only_recent_keys_kept(clock):
+    limiter = TokenBucketLimiter(rate=0.0, burst=1, max_keys=2)
+    for key in ["a", "b", "a", "c"]:
+        limiter.allow(key)
+    assert list(limiter._buckets) == ["a", "c"]
+    # An evicted key starts over with a full bucket
+    assert limiter.allow("b")
+
+
+def test_client_address_without_a_trusted_proxy_is_the_peer():
+    # Anyone can send the header, so it is ignored
+    assert client_address("203.0.113.7", "198.51.100.2", hops=0) == "198.51.100.2"
+    assert client_address("", None, hops=0) is None
+
+
+def test_client_address_takes_the_proxys_entry():
+    # Entries left of the proxy's own are whatever the client sent
+    assert client_address("1.2.3.4, 203.0.113.7", "10.0.0.1", hops=1) == "203.0.113.7"
+    assert client_address(" 1.2.3.4 ,203.0.113.7, 10.0.0.2 ", "10.0.0.1", hops=2) == "203.0.113.7"
+    # Shorter than the proxy chain: it did not come through the proxies
+    assert client_address("10.0.0.2", "198.51.100.2", hops=2) == "198.51.100.2"
+
+
+@pytest.fixture
+def limits(monkeypatch, storage):
+    monkeypatch.setattr(auth, "get_storage", lambda: storage)
+    monkeypatch.setattr(auth, "MISSING_USERS", LRUCache(100))
+    for name in ("USER_LIMITER", "CLIENT_LIMITER", "UNKNOWN_CLIENT_LIMITER"):
+        monkeypatch.setattr(auth, name, TokenBucketLimiter(rate=0.0, burst=2))
+
+
+def test_login_limits_per_client_and_username(limits):
+    for n in range(2):
+        assert authenticate_user(f"nobody{n}", "pw", "198.51.100.2") is None
+    with pytest.raises(LoginThrottled):
+        authenticate_user("nobody9", "pw", "198.51.100.2")
+    assert authenticate_user("nobody9", "pw", "198.51.100.3") is None
+    authenticate_user("admin", "wrong", "198.51.100.4")
+    authenticate_user("admin", "wrong", "198.51.100.5")
+    with pytest.raises(LoginThrottled):
+        authenticate_user("admin", "admin123", "198.51.100.6")
+
+
+def test_clients_without_an_address_share_a_bucket(limits):
+    authenticate_user("nobody0", "pw")
+    authenticate_user("nobody1", "pw", None)
+    with pytest.raises(LoginThrottled):
+        authenticate_user("nobody2", "pw")
+    assert authenticate_user("nobody2", "pw", "198.51.100.2") is None
@@ -0,0 +1,146 @@
+# Menu reloads: a catalog and search index patched with a diff must answer
+# exactly like ones built afresh from the new menu
+import json
+
+import numpy as np
+import pytest
+
+from catalog import DIETARY_RESTRICTIONS, MENU_PATH, MenuCatalog, diff_menu, load_catalog, read_menu
+from menu_store import MenuStore
+from search import MenuSearchIndex
+
+QUERIES = ["salad", "quinoa sal", "chiken", "ceasar", "lentl", "soup", "q", "burger", "green goddess", "zzz"]
+
+
+def write_menu(path, categories, items):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"categories": categories, "items": items}, f)
+
+
+# The menu with a bit of everything changed: renames, new tags and categories,
+# removed dishes, new dishes (one of them reusing a removed dish's name) and a new category
+def edited(categories, items):
+    items = [dict(item) for item in items]
+    removed = [items.pop(10), items.pop(20)]
+    items[0]["name"] = "Green Goddess Salad"
+    items[1]["tags"] = ["vegan"]
+    items[2]["categories"] = ["Soups", "Healthy Options"]
+    items[3]["nutrition"] = {"calories": 420, "protein": 30, "carbs": 12, "sugar": 3, "sodium": 800}
+    added = [{"id": 10_000, "name": "Chicken Pho", "tags": ["dairy-free"], "categories": ["Soups", "Noodles"]},
+             {"id": 10_001, "name": removed[0]["name"], "tags": [], "categories": ["Noodles"]}]
+    return categories + ["Noodles"], items + added
+
+
+@pytest.fixture
+def menus(workdir):
+    categories, items = read_menu(MENU_PATH)
+    path = workdir / "menu.json"
+    write_menu(path, categories, items)
+    return path, (categories, items), edited(categories, items)
+
+
+# Ids per category and restriction, and per search query, as the app would show them
+def answers(catalog, index):
+    by_category = {(category, restriction): sorted(catalog.ids[catalog.filter(category, restrictions)].tolist())
+                   for category in catalog.category_names()
+                   for restriction, restrictions in [(None, ())] + [(r, (r,)) for r in DIETARY_RESTRICTIONS]}
+    by_query = {query: sorted(catalog.ids[index.search(query, catalog.matches(()))].tolist()) for query in QUERIES}
+    return by_category, by_query
+
+
+def test_diff_menu(menus):
+    _, (categories, items), (_, new_items) = menus
+    catalog = MenuCatalog(categories, items)
+    assert diff_menu(catalog, items) == ([], [], [])
+    added, changed, removed = diff_menu(catalog, new_items)
+    assert [item["id"] for item in added] == [10_000, 10_001]
+    assert sorted(item["id"] for item in changed) == sorted(item["id"] for item in new_items[:4])
+    assert sorted(removed) == sorted({item["id"] for item in items} - {item["id"] for item in new_items})
+
+
+def test_updated_catalog_matches_rebuild(menus):
+    _, (categories, items), (new_categories, new_items) = menus
+    catalog = MenuCatalog(categories, items)
+    before = answers(catalog, MenuSearchIndex(catalog.names))
+    patched = catalog.updated(new_categories, *diff_menu(catalog, new_items))
+    fresh = MenuCatalog(new_categories, new_items)
+    assert patched.version == catalog.version + 1
+    assert len(patched) == len(fresh)
+    assert patched.category_names() == fresh.category_names()
+    for item in new_items:
+        row, fresh_row = patched.rows_by_id[item["id"]], fresh.rows_by_id[item["id"]]
+        assert patched.names[row] == fresh.names[fresh_row]
+        assert patched.tags[row] == fresh.tags[fresh_row]
+        np.testing.assert_array_equal(patched.nutrition[row], fresh.nutrition[fresh_row])
+    assert answers(patched, MenuSearchIndex(patched.names))[0] == answers(fresh, MenuSearchIndex(fresh.names))[0]
+    # The original is left untouched
+    assert answers(catalog, MenuSearchIndex(catalog.names)) == before
+
+
+def test_reload_patches_catalog_and_index(menus):
+    path, _, (new_categories, new_items) = menus
+    store = MenuStore(str(path), check_seconds=3600)
+    write_menu(path, new_categories, new_items)
+    assert store.reload() == (2, 4, 2)
+    catalog, index = store.snapshot()
+    assert catalog.dead == 2
+    fresh = load_catalog(str(path))
+    assert answers(catalog, index) == answers(fresh, MenuSearchIndex(fresh.names))
+    # A renamed dish is found by its new name only
+    assert catalog.rows_by_id[new_items[0]["id"]] in index.search("goddess")
+    assert not any(catalog.ids[row] == new_items[0]["id"] for row in index.search("caesar"))
+
+
+def test_reload_rebuilds_mostly_dead_catalog(menus):
+    path, (categories, items), _ = menus
+    store = MenuStore(str(path), check_seconds=3600)
+    write_menu(path, categories, items[:len(items) // 3])
+    store.reload()
+    catalog, index = store.snapshot()
+    assert catalog.dead == 0 and len(catalog.names) == len(items) // 3
+    assert answers(catalog, index) == answers(load_catalog(str(path)), MenuSearchIndex(catalog.names))
+
+
+def test_invalid_menu_keeps_current(menus):
+    path, _, _ = menus
+    store = MenuStore(str(path), check_seconds=3600)
+    before = store.snapshot()
+    path.write_text('{"categories": ["Soups"], "items": [{"id": 1}]}')
+    assert store.reload() == (0, 0, 0)
+    assert isinstance(store.last_error, ValueError)
+    assert store.snapshot() is before
+
+
+def test_index_updated_matches_rebuild():
+    names = ["Tomato Soup", "Caesar Salad", "Quinoa Salad", "Chicken Burger"]
+    index = MenuSearchIndex(names)
+    # Lists the words for the typo fallback, which the patched index must not reuse
+    assert index.search("ceasar").tolist() == [1]
+    patched = index.updated([(0, "Tomato Soup", "Pumpkin Soup"), (1, "Caesar Salad", None),
+                             (4, None, "Veggie Burger")])
+    fresh = MenuSearchIndex(["Pumpkin Soup", "", "Quinoa Salad", "Chicken Burger", "Veggie Burger"])
+    assert patched.size == fresh.size == 5
+    for query in ["soup", "tomato", "caesar", "ceasar", "pumpkn", "salad", "burger", "veg", "p", "c"]:
+        assert sorted(patched.search(query).tolist()) == sorted(fresh.search(query).tolist()), query
+    assert patched.words == fresh.words
+    assert sorted(index.search("tomato").tolist()) == [0]
+
+
+def test_single_word_typos():
+    catalog = load_catalog()
+    index = MenuSearchIndex(catalog.names)
+
+    def found(query, allowed=None, limit=50):
+        return [catalog.names[row] for row in index.search(query, allowed, limit)]
+
+    # 'ceasar' shares only "sar" with "caesar", so only the fallback finds it; shorter names first
+    assert found("ceasar")[:3] == ["Caesar Salad", "Chicken Caesar Wrap", "Chicken Caesar Salad"]
+    assert all("Caesar" in name for name in found("ceasar"))
+    assert found("lentl") and all("Lentil" in name for name in found("lentl"))
+    # A word still being typed is matched by its start
+    assert found("ceasa")[0] == "Caesar Salad"
+    assert found("ceasar", limit=1) == ["Caesar Salad"]
+    allowed = np.array(["Wrap" in name for name in catalog.names])
+    assert found("ceasar", allowed) == ["Chicken Caesar Wrap"]
+    # Too far from every word, too short to guess at, or more than one word
+    assert found("zzzzzz") == found("cesr") == found("ceasar zzzzzz") == []
@@ -0,0 +1,102 @@
+# Schema migrations of both backends, and importing the legacy users.db and feedback.db
+import sqlite3
+import threading
+
+import standin
+from db import APP_DB, get_pool
+from migrations import FEEDBACK_STEPS, MIGRATIONS, SERVER_STEPS, USERS_STEPS, migrate, migrate_server, schema_version
+from storage import SqliteStorage
+
+
+def version(path):
+    with get_pool(path).connection() as conn:
+        return schema_version(conn)
+
+
+def test_sqlite_migrates_once(workdir):
+    path = str(workdir / "app.db")
+    assert migrate(path, MIGRATIONS[APP_DB]) == len(MIGRATIONS[APP_DB])
+    storage = SqliteStorage(path)
+    storage.add_user("bob", "hash", "user")
+    # Running again changes nothing: no step is replayed, no admin seeded twice
+    assert migrate(path, MIGRATIONS[APP_DB]) == len(MIGRATIONS[APP_DB])
+    assert version(path) == len(MIGRATIONS[APP_DB])
+    assert storage.dashboard_summary()["users"] == {"admin": 1, "user": 1}
+
+
+def test_concurrent_migrations_apply_each_step_once(workdir):
+    path = str(workdir / "app.db")
+    threads = [threading.Thread(target=migrate, args=(path, MIGRATIONS[APP_DB])) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    storage = SqliteStorage(path)
+    assert version(path) == len(MIGRATIONS[APP_DB])
+    assert storage.usernames("admin") == ["admin"]
+    assert storage.dashboard_summary()["users"] == {"admin": 1}
+
+
+def test_server_migrates_once(workdir):
+    pool = standin.StandInPool(str(workdir / "app-server.db"))
+    try:
+        assert migrate_server(pool) == len(SERVER_STEPS)
+        assert migrate_server(pool) == len(SERVER_STEPS)
+        with pool.connection() as conn:
+            assert schema_version(conn) == len(SERVER_STEPS)
+            assert conn.execute('SELECT role, users FROM role_counts').fetchall() == [("admin", 1)]
+    finally:
+        pool.close()
+
+
+def test_new_step_applies_to_migrated_database(workdir):
+    path = str(workdir / "app.db")
+    migrate(path, MIGRATIONS[APP_DB])
+    steps = MIGRATIONS[APP_DB] + [['CREATE TABLE extra (id INTEGER PRIMARY KEY)']]
+    assert migrate(path, steps) == len(steps)
+    with get_pool(path).connection() as conn:
+        assert conn.execute('SELECT COUNT(*) FROM extra').fetchone() == (0,)
+
+
+# Legacy files as the first release shipped them: no schema_version table,
+# feedback without ids or timestamps
+def write_legacy(folder):
+    users = sqlite3.connect(folder / "users.db")
+    users.execute('CREATE TABLE users (username TEXT PRIMARY KEY, password TEXT, role TEXT)')
+    users.executemany('INSERT INTO users VALUES (?, ?, ?)', [
+        ("admin", "legacy-admin-hash", "admin"), ("bob", "bob-hash", "user"), ("amy", "amy-hash", "user")])
+    users.commit()
+    users.close()
+    feedback = sqlite3.connect(folder / "feedback.db")
+    feedback.execute('CREATE TABLE feedback (username TEXT, feedback TEXT)')
+    feedback.executemany('INSERT INTO feedback VALUES (?, ?)', [("bob", "Great soup"), ("amy", "Too salty")])
+    feedback.commit()
+    feedback.close()
+
+
+def test_legacy_import(workdir):
+    write_legacy(workdir)
+    storage = SqliteStorage(str(workdir / "app.db"))
+    storage.migrate()
+    # Imported users replace the seeded admin
+    assert storage.find_user("admin") == ("legacy-admin-hash", "admin")
+    assert storage.find_user("bob") == ("bob-hash", "user")
+    assert storage.usernames("user") == ["amy", "bob"]
+    assert storage.dashboard_summary()["users"] == {"admin": 1, "user": 2}
+    # Feedback keeps its order, and the full-text index covers it
+    assert [row[1:3] for row in storage.feedback_page()] == [("amy", "Too salty"), ("bob", "Great soup")]
+    assert [row[1] for row in storage.feedback_page(query="sou")] == ["bob"]
+    # Imported data is usable alongside new rows
+    storage.add_feedback([("bob", "Salty again", 1_700_000_000.0)])
+    assert [row[1] for row in storage.feedback_page(query="salty")] == ["bob", "amy"]
+    # The legacy files were brought to their final schema before the import
+    assert version(str(workdir / "users.db")) == len(USERS_STEPS)
+    assert version(str(workdir / "feedback.db")) == len(FEEDBACK_STEPS)
+
+
+def test_migration_without_legacy_files(workdir):
+    storage = SqliteStorage(str(workdir / "app.db"))
+    storage.migrate()
+    assert storage.usernames("user") == []
+    assert storage.feedback_page() == []
+    assert not (workdir / "users.db").exists()
@@ -0,0 +1,84 @@
+# Password hashes: checking each stored format, and replacing outdated ones at login
+import hashlib
+
+import pytest
+
+import auth
+from auth import authenticate_user
+from cache import LRUCache
+from passwords import (HASHERS, Pbkdf2Hasher, ScryptHasher, algorithm_of, hash_password, offload,
+                       verify_password)
+from ratelimit import TokenBucketLimiter
+
+
+def legacy(password):
+    return hashlib.sha256(password.encode()).hexdigest()
+
+
+def test_new_passwords_use_current_scrypt():
+    encoded = hash_password("s3cret")
+    assert algorithm_of(encoded) == "scrypt"
+    assert verify_password("s3cret", encoded) == (True, False)
+    assert verify_password("S3cret", encoded) == (False, False)
+    # Salted: the same password never hashes the same twice
+    assert hash_password("s3cret") != encoded
+
+
+@pytest.mark.parametrize("encoded", [
+    legacy("s3cret"),
+    Pbkdf2Hasher(iterations=1_000).encode("s3cret"),
+    ScryptHasher(n=2 ** 10).encode("s3cret"),
+])
+def test_other_and_weaker_hashes_verify_and_need_an_upgrade(encoded):
+    assert verify_password("s3cret", encoded) == (True, True)
+    assert verify_password("wrong", encoded) == (False, False)
+
+
+def test_unknown_algorithm_never_matches():
+    encoded = HASHERS["scrypt"].encode("s3cret").replace("scrypt", "bcrypt", 1)
+    assert verify_password("s3cret", encoded) == (False, False)
+
+
+def test_offload_runs_on_the_hash_pool():
+    assert offload(verify_password, "s3cret", legacy("s3cret")) == (True, True)
+
+
+@pytest.fixture
+def logins(monkeypatch, storage):
+    monkeypatch.setattr(auth, "get_storage", lambda: storage)
+    monkeypatch.setattr(auth, "MISSING_USERS", LRUCache(100))
+    for name in ("USER_LIMITER", "CLIENT_LIMITER", "UNKNOWN_CLIENT_LIMITER"):
+        monkeypatch.setattr(auth, name, TokenBucketLimiter(rate=0.0, burst=100))
+    return storage
+
+
+def test_legacy_hash_is_upgraded_at_login(logins):
+    logins.add_user("bob", legacy("s3cret"), "user")
+    assert authenticate_user("bob", "s3cret") == "user"
+    upgraded, role = logins.find_user("bob")
+    assert role == "user"
+    assert algorithm_of(upgraded) == "scrypt"
+    assert verify_password("s3cret", upgraded) == (True, False)
+    # Now current, the hash is left alone
+    assert authenticate_user("bob", "s3cret") == "user"
+    assert logins.find_user("bob")[0] == upgraded
+
+
+def test_wrong_password_keeps_legacy_hash(logins):
+    logins.add_user("bob", legacy("s3cret"), "user")
+    assert authenticate_user("bob", "guess") is None
+    assert logins.find_user("bob")[0] == legacy("s3cret")
+
+
+def test_upgrade_skipped_if_the_hash_changed_meanwhile(logins, monkeypatch):
+    logins.add_user("bob", legacy("s3cret"), "user")
+    changed = hash_password("n3w")
+
+    # The password is changed elsewhere while this login hashes the upgrade
+    def hash_then_change(password):
+        logins.replace_password("bob", legacy("s3cret"), changed)
+        return hash_password(password)
+
+    monkeypatch.setattr(auth, "hash_password", hash_then_change)
+    assert authenticate_user("bob", "s3cret") == "user"
+    assert logins.find_user("bob")[0] == changed
@@ -0,0 +1,113 @@
+# The meal planner on small hand-made menus whose best plan is known
+import numpy as np
+
+from catalog import MenuCatalog, NUTRIENTS
+from planner import COURSES, DEFAULT_TARGETS, course_codes, plan_meal, score
+
+TARGETS = np.array([DEFAULT_TARGETS[nutrient] for nutrient in NUTRIENTS], dtype=np.float32)
+CATEGORIES = [category for categories in COURSES.values() for category in categories]
+
+
+def dish(item_id, name, categories, nutrition=None, tags=()):
+    item = {"id": item_id, "name": name, "categories": categories, "tags": list(tags)}
+    if nutrition is not None:
+        item["nutrition"] = dict(zip(NUTRIENTS, nutrition))
+    return item
+
+
+# One dish per course that together hit DEFAULT_TARGETS exactly, plus worse alternatives
+def menu(extra=()):
+    return MenuCatalog(CATEGORIES, [
+        dish(1, "Steak", ["Main Courses"], (400, 20, 40, 5, 500)),
+        dish(2, "Tofu Bowl", ["Main Courses"], (380, 15, 45, 5, 450), ["vegan"]),
+        dish(3, "Fries", ["Sides"], (200, 5, 30, 5, 300), ["vegan"]),
+        dish(4, "Lemonade", ["Drinks"], (80, 0, 10, 10, 100), ["vegan"]),
+        dish(5, "Cake", ["Desserts"], (120, 10, 10, 10, 100)),
+        dish(6, "Sorbet", ["Desserts"], (140, 0, 25, 20, 50), ["vegan"]),
+        dish(7, "Burger Platter", ["Burgers"], (1500, 60, 120, 15, 2500)),
+        *extra,
+    ])
+
+
+def names(catalog, plan):
+    return {course: catalog.names[row] for course, row in plan[0].items()}
+
+
+def test_picks_the_meal_closest_to_targets():
+    catalog = menu()
+    plan = plan_meal(catalog)
+    assert names(catalog, plan) == {"Main": "Steak", "Side": "Fries", "Drink": "Lemonade", "Dessert": "Cake"}
+    assert plan[1] == dict(zip(NUTRIENTS, TARGETS.tolist()))
+
+
+def test_restrictions_filter_every_course():
+    catalog = menu()
+    plan = plan_meal(catalog, restrictions=("Vegan",))
+    assert names(catalog, plan) == {"Main": "Tofu Bowl", "Side": "Fries", "Drink": "Lemonade", "Dessert": "Sorbet"}
+    assert all("vegan" in catalog.tags[row] for row in plan[0].values())
+
+
+def test_targets_override_defaults():
+    catalog = menu()
+    plan = plan_meal(catalog, {"calories": 2_000, "protein": 80, "carbs": 200, "sodium": 3_000})
+    assert names(catalog, plan)["Main"] == "Burger Platter"
+
+
+def test_none_when_a_course_has_no_usable_dish():
+    # Without figures the dessert course is empty
+    catalog = MenuCatalog(CATEGORIES, [dish(1, "Steak", ["Main Courses"], (400, 20, 40, 5, 500)),
+                                       dish(3, "Fries", ["Sides"], (200, 5, 30, 5, 300)),
+                                       dish(4, "Lemonade", ["Drinks"], (80, 0, 10, 10, 100)),
+                                       dish(5, "Cake", ["Desserts"])])
+    assert plan_meal(catalog) is None
+    # Restricted away: the only vegan main has no figures
+    catalog = menu([dish(8, "Mystery Vegan Main", ["Main Courses"], tags=["vegan", "gluten-free"])])
+    assert plan_meal(catalog, restrictions=("Vegan", "Gluten-Free")) is None
+    assert plan_meal(catalog, restrictions=("No Such Tag",)) is None
+
+
+def test_removed_dishes_are_not_planned():
+    catalog = menu()
+    catalog = catalog.updated(CATEGORIES, [], [], [1])
+    assert names(catalog, plan_meal(catalog))["Main"] == "Tofu Bowl"
+
+
+def test_course_mapping():
+    catalog = MenuCatalog(CATEGORIES + ["Kids’ Menu"], [
+        dish(1, "Pasta Salad", ["Salads", "Pasta"]),
+        dish(2, "Soup", ["Soups"]),
+        dish(3, "Smoothie", ["Smoothies & Juices"]),
+        dish(4, "Pie", ["Desserts"]),
+        dish(5, "Nuggets", ["Kids’ Menu"]),
+        dish(6, "Pizza", ["Pizza"]),
+    ])
+    codes = dict(zip(catalog.names, course_codes(catalog).tolist()))
+    courses = list(COURSES)
+    # A dish under categories of several courses counts for the first course
+    assert codes == {"Pasta Salad": courses.index("Main"), "Soup": courses.index("Side"),
+                     "Smoothie": courses.index("Drink"), "Pie": courses.index("Dessert"), "Nuggets": -1,
+                     "Pizza": courses.index("Main")}
+
+
+def test_score_targets_minimums_and_maximums():
+    assert score(TARGETS, TARGETS) == 0
+    calories, protein, carbs, sugar, sodium = (NUTRIENTS.index(n) for n in
+                                               ("calories", "protein", "carbs", "sugar", "sodium"))
+
+    def missed(nutrient, factor):
+        totals = TARGETS.copy()
+        totals[nutrient] *= factor
+        return float(score(totals, TARGETS))
+
+    # Calories and carbs are aimed at: a miss either way counts
+    for nutrient in (calories, carbs):
+        assert missed(nutrient, 1.5) == missed(nutrient, 0.5) == 0.5
+    # Protein is a minimum
+    assert missed(protein, 2.0) == 0 and missed(protein, 0.5) == 0.5
+    # Sugar and sodium are maximums
+    for nutrient in (sugar, sodium):
+        assert missed(nutrient, 0.1) == 0 and missed(nutrient, 1.5) == 0.5
+    # Misses are relative to their targets and add up, over a batch of totals at once
+    both = TARGETS.copy()
+    both[[protein, sodium]] *= [0.5, 1.25]
+    assert np.allclose(score(np.stack([TARGETS, both]), TARGETS), [0, 0.75])
@@ -0,0 +1,104 @@
+# "Goes well with" suggestions on a small menu whose co-occurrence scores are
+# easy to work out by hand
+import types
+
+import numpy as np
+import pytest
+
+from catalog import MenuCatalog
+from recommendations import Recommender
+
+NOW = 1_700_000_000.0
+CATEGORIES = ["Mains", "Sides", "Drinks", "Desserts"]
+VEGAN = ["vegan", "vegetarian"]
+ITEMS = [
+    {"id": 1, "name": "Burger", "categories": ["Mains"], "tags": []},
+    {"id": 2, "name": "Fries", "categories": ["Sides"], "tags": VEGAN},
+    {"id": 3, "name": "Cola", "categories": ["Drinks"], "tags": VEGAN},
+    {"id": 4, "name": "Salad", "categories": ["Mains"], "tags": VEGAN},
+    {"id": 5, "name": "Cake", "categories": ["Desserts"], "tags": ["vegetarian"]},
+    {"id": 6, "name": "Soup", "categories": ["Mains"], "tags": VEGAN},
+]
+# Burger is in 5 orders, Fries 4, Cola 3, the rest 1: Burger goes with Fries
+# 4 / sqrt(5 * 4), with Cola 3 / sqrt(5 * 3) and with Cake 1 / sqrt(5 * 1)
+ORDERS = [["Burger", "Fries", "Cola"]] * 3 + [["Burger", "Fries"], ["Burger", "Cake"], ["Salad", "Soup"]]
+
+
+@pytest.fixture
+def menu():
+    return types.SimpleNamespace(catalog=MenuCatalog(CATEGORIES, ITEMS))
+
+
+@pytest.fixture
+def recommender(storage, menu):
+    for names in ORDERS:
+        storage.add_order("bob", dict.fromkeys(names, 1), NOW)
+    store = types.SimpleNamespace(snapshot=lambda: (menu.catalog, None))
+    return Recommender(storage, store)
+
+
+def suggested(recommender, catalog, item_ids, restrictions=(), limit=5):
+    return [catalog.names[row] for row in recommender.goes_with(catalog, item_ids, restrictions, limit)]
+
+
+def test_partners_ranked_by_cosine_similarity(recommender, menu):
+    recommender.refresh()
+    assert suggested(recommender, menu.catalog, [1]) == ["Fries", "Cola", "Cake"]
+    _, partners, scores, _ = recommender._lists
+    burger = menu.catalog.rows_by_id[1]
+    assert np.allclose(scores[0, burger, :3], [4 / 20 ** 0.5, 3 / 15 ** 0.5, 1 / 5 ** 0.5])
+    # Unused places hold no partner
+    assert (partners[0, burger, 3:] == -1).all() and (scores[0, burger, 3:] == 0).all()
+
+
+def test_nothing_before_the_first_refresh_or_for_an_empty_cart(recommender, menu):
+    assert suggested(recommender, menu.catalog, [1]) == []
+    recommender.refresh()
+    assert suggested(recommender, menu.catalog, []) == []
+    assert suggested(recommender, menu.catalog, [999]) == []
+
+
+def test_restrictions_filter_partners(recommender, menu):
+    recommender.refresh()
+    assert suggested(recommender, menu.catalog, [1], ("Vegan",)) == ["Fries", "Cola"]
+    assert suggested(recommender, menu.catalog, [1], ("Vegetarian",)) == ["Fries", "Cola", "Cake"]
+    assert suggested(recommender, menu.catalog, [1], ("Vegetarian", "Gluten-Free")) == []
+    assert suggested(recommender, menu.catalog, [1], limit=1) == ["Fries"]
+
+
+def test_cart_scores_add_up_and_cart_items_are_left_out(recommender, menu):
+    recommender.refresh()
+    # Cola goes with both Burger and Fries, so it overtakes Cake
+    assert suggested(recommender, menu.catalog, [1, 2]) == ["Cola", "Cake"]
+    assert suggested(recommender, menu.catalog, [1, 2, 3, 5]) == []
+
+
+def test_top_k_partners_kept(recommender, menu):
+    recommender.top_k = 1
+    recommender.refresh()
+    assert suggested(recommender, menu.catalog, [1]) == ["Fries"]
+
+
+def test_favorites_and_new_orders_are_counted_once(recommender, menu, storage):
+    storage.add_favorites("amy", [4, 5])
+    recommender.refresh()
+    # Salad goes with Soup 1 / sqrt(2 * 1), with Cake 1 / sqrt(2 * 2)
+    assert suggested(recommender, menu.catalog, [4]) == ["Soup", "Cake"]
+    storage.add_order("cy", {"Salad": 1, "Cake": 1}, NOW)
+    recommender.refresh()
+    recommender.refresh()
+    # Now 2 / sqrt(3 * 3) against 1 / sqrt(3 * 1)
+    _, _, scores, _ = recommender._lists
+    assert np.allclose(scores[0, menu.catalog.rows_by_id[4], :2], [2 / 3, 1 / 3 ** 0.5])
+    assert suggested(recommender, menu.catalog, [4]) == ["Cake", "Soup"]
+
+
+def test_menu_change_reranks_by_name(recommender, menu):
+    recommender.refresh()
+    # Fries is replaced by a new dish of the same name, and Cola removed
+    catalog = menu.catalog.updated(CATEGORIES, [{"id": 7, "name": "Fries", "categories": ["Sides"], "tags": []}],
+                                   [], [2, 3])
+    found = recommender.goes_with(catalog, [1])
+    assert [catalog.names[row] for row in found] == ["Fries", "Cake"]
+    assert found[0] == catalog.rows_by_id[7]
+    assert recommender._lists[0] == catalog.version
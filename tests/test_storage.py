@@ -0,0 +1,140 @@
+# Conformance: every Storage method behaves the same on each backend
+# (the `storage` fixture runs each test against SQLite and the server stand-in)
+from storage import DAY
+
+NOW = 1_700_000_000.0
+
+
+def test_seeded_admin(storage):
+    assert storage.find_user("admin")[1] == "admin"
+    assert storage.usernames("admin") == ["admin"]
+
+
+def test_users(storage):
+    assert storage.add_user("bob", "hash1", "user")
+    assert not storage.add_user("bob", "other", "user")
+    assert storage.find_user("bob") == ("hash1", "user")
+    assert storage.find_user("nobody") is None
+
+    storage.replace_password("bob", "stale", "hash2")
+    assert storage.find_user("bob")[0] == "hash1"
+    storage.replace_password("bob", "hash1", "hash2")
+    assert storage.find_user("bob")[0] == "hash2"
+
+
+def test_usernames_paging(storage):
+    for name in ["dave", "carol", "erin", "alice"]:
+        storage.add_user(name, "hash", "user")
+    assert storage.usernames("user", limit=2) == ["alice", "carol"]
+    assert storage.usernames("user", cursor="carol", limit=2) == ["dave", "erin"]
+    assert storage.usernames("user", cursor="erin") == []
+
+
+def test_feedback_paging(storage):
+    storage.add_feedback([("bob", f"note {n}", NOW + n) for n in range(5)])
+    page = storage.feedback_page(limit=2)
+    assert [row[2] for row in page] == ["note 4", "note 3"]
+    assert [row[2] for row in storage.feedback_page(cursor=page[-1][0], limit=10)] == ["note 2", "note 1", "note 0"]
+    assert page[0][1] == "bob" and page[0][3] == NOW + 4
+
+
+def test_feedback_search(storage):
+    storage.add_feedback([("bob", "Hello there, great soup!", NOW), ("amy", "The soup was cold.", NOW + 1),
+                          ("eve", "Helpful staff", NOW + 2)])
+
+    def search(query):
+        return [row[1] for row in storage.feedback_page(query=query)]
+
+    assert search("soup") == ["amy", "bob"]
+    assert search("hel") == ["eve", "bob"]
+    assert search("SOUP col") == ["amy"]
+    assert search("soup, great!") == ["bob"]
+    assert search("nope") == []
+    # Nothing to search for lists everything
+    for query in ["", " ", "!!!", "' \" *"]:
+        assert search(query) == ["eve", "amy", "bob"]
+
+
+def test_orders(storage):
+    first = storage.add_order("bob", {"Soup": 2, "Salad": 1}, NOW)
+    second = storage.add_order("amy", {"Soup": 1}, NOW + 10)
+    assert second > first
+    assert storage.order_status(first) == 0
+    assert storage.order_status(second + 1) is None
+
+    storage.set_order_statuses([(3, NOW + 5, first), (5, NOW + 12, second)])
+    assert storage.order_status(first) == 3
+    assert storage.open_orders(5) == [(first, 3, NOW + 5)]
+
+    assert sorted(storage.order_items_after(0)) == [(first, "Salad"), (first, "Soup"), (second, "Soup")]
+    assert storage.order_items_after(first) == [(second, "Soup")]
+    assert [row[0] for row in storage.order_items_after(0, limit=1)] == [first, first]
+
+
+def test_order_page(storage):
+    ids = [storage.add_order("bob" if n % 2 else "amy", {f"Dish {n}": 1}, NOW + n) for n in range(5)]
+    rows, items = storage.order_page(limit=2)
+    assert [row[0] for row in rows] == [ids[4], ids[3]]
+    assert sorted(items) == [(ids[3], "Dish 3", 1), (ids[4], "Dish 4", 1)]
+
+    cursor = (rows[-1][3], rows[-1][0])
+    rows, _ = storage.order_page(cursor=cursor, limit=10)
+    assert [row[0] for row in rows] == [ids[2], ids[1], ids[0]]
+
+    rows, _ = storage.order_page(username="bob")
+    assert [(row[0], row[1]) for row in rows] == [(ids[3], "bob"), (ids[1], "bob")]
+    assert storage.order_page(username="nobody") == ([], [])
+
+
+def test_carts(storage):
+    assert storage.load_cart("bob") == []
+    storage.save_cart_entries([("bob", 1, 2), ("bob", 2, 1), ("amy", 1, 1)])
+    storage.save_cart_entries([("bob", 1, 5), ("bob", 2, 0), ("bob", 3, 0)])
+    assert sorted(storage.load_cart("bob")) == [(1, 5)]
+    assert storage.load_cart("amy") == [(1, 1)]
+
+
+def test_favorites(storage):
+    storage.add_favorites("bob", [1, 2])
+    storage.add_favorites("bob", [2, 3])
+    storage.add_favorites("amy", [1])
+    storage.remove_favorite("bob", 1)
+    storage.remove_favorite("bob", 9)
+    assert storage.favorites("bob") == {2, 3}
+    assert storage.favorites("nobody") == set()
+    assert sorted(storage.all_favorites()) == [("amy", 1), ("bob", 2), ("bob", 3)]
+
+
+def test_translations(storage):
+    storage.add_translations("fr", [("Soup", "Soupe"), ("Salad", "Salade")])
+    storage.add_translations("fr", [("Soup", "Potage")])
+    storage.add_translations("de", [("Soup", "Suppe")])
+    assert storage.translations("fr") == {"Soup": "Soupe", "Salad": "Salade"}
+    assert storage.translations("es") == {}
+
+
+def test_dashboard_summary(storage):
+    storage.add_user("bob", "hash", "user")
+    storage.add_user("amy", "hash", "user")
+    storage.add_feedback([("bob", "a", NOW), ("bob", "b", NOW + 1), ("amy", "c", NOW + DAY)])
+    storage.add_order("bob", {"Soup": 2, "Salad": 1}, NOW)
+    storage.add_order("amy", {"Salad": 3}, NOW)
+    storage.count_restriction_picks(["Vegan", "Low-Sugar"])
+    storage.count_restriction_picks(["Vegan"])
+
+    summary = storage.dashboard_summary(now=NOW + DAY)
+    assert summary["users"] == {"admin": 1, "user": 2}
+    day = int(NOW // DAY)
+    assert [tuple(row) for row in summary["feedback_per_day"]] == [(day, 2), (day + 1, 1)]
+    assert [tuple(row) for row in summary["top_items"]] == [("Salad", 4), ("Soup", 2)]
+    assert [tuple(row) for row in summary["restrictions"]] == [("Vegan", 2), ("Low-Sugar", 1)]
+    assert storage.dashboard_summary(days=0, now=NOW + DAY)["feedback_per_day"] == []
+
+
+def test_writes_bump_summary_version(storage):
+    version = storage.summary_version
+    storage.add_user("bob", "hash", "user")
+    storage.add_feedback([("bob", "hi", NOW)])
+    storage.add_order("bob", {"Soup": 1}, NOW)
+    storage.count_restriction_picks(["Vegan"])
+    assert storage.summary_version == version + 4
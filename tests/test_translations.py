@@ -0,0 +1,121 @@
+# Menu translations: filling a locale once, translating only what a menu change
+# added, and backing off from a failing backend
+import types
+
+import pytest
+
+import translations
+from catalog import MenuCatalog
+from translations import GoogleBackend, LocalBackend, MenuTranslator, menu_strings
+
+CATEGORIES = ["Soups", "Salads"]
+ITEMS = [{"id": 1, "name": "Tomato Soup", "categories": ["Soups"], "tags": ["vegan"]},
+         {"id": 2, "name": "Caesar Salad", "categories": ["Salads"], "tags": []}]
+
+
+# LocalBackend that records what it was asked for, and fails while `down` is set
+class RecordingBackend(LocalBackend):
+    def __init__(self):
+        super().__init__()
+        self.calls = []
+        self.down = False
+
+    def translate(self, texts, locale):
+        self.calls.append((list(texts), locale))
+        if self.down:
+            raise ConnectionError("translate.googleapis.com unreachable")
+        return super().translate(texts, locale)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = types.SimpleNamespace(now=100.0)
+    fake_time = types.SimpleNamespace(monotonic=lambda: clock.now, sleep=lambda seconds: None)
+    monkeypatch.setattr(translations, "time", fake_time)
+    return clock
+
+
+@pytest.fixture
+def catalog():
+    return MenuCatalog(CATEGORIES, ITEMS)
+
+
+def test_locale_is_filled_once(storage, catalog):
+    backend = RecordingBackend()
+    translator = MenuTranslator(storage, backend)
+    table = translator.table(catalog, "es")
+    assert table["Tomato Soup"] == "[es] Tomato Soup"
+    assert table.keys() == menu_strings(catalog)
+    # One batch, then answered from memory
+    assert len(backend.calls) == 1
+    assert translator.table(catalog, "es") is table
+    assert len(backend.calls) == 1
+    assert translator.table(catalog, "en") == {}
+    # Another process finds them stored
+    assert MenuTranslator(storage, RecordingBackend()).table(catalog, "es") == table
+    assert storage.translations("es") == table
+
+
+def test_menu_change_translates_only_new_strings(storage, catalog):
+    backend = RecordingBackend()
+    translator = MenuTranslator(storage, backend)
+    before = translator.table(catalog, "fr")
+    changed = catalog.updated(CATEGORIES, [{"id": 3, "name": "Onion Soup", "categories": ["Soups"], "tags": []}],
+                              [], [])
+    after = translator.table(changed, "fr")
+    assert backend.calls[-1] == (["Onion Soup"], "fr")
+    assert after["Onion Soup"] == "[fr] Onion Soup"
+    # The table sessions already hold is never changed under them
+    assert "Onion Soup" not in before
+
+
+def test_failed_strings_are_retried_later(storage, catalog, clock):
+    backend = RecordingBackend()
+    backend.down = True
+    translator = MenuTranslator(storage, backend, retry_seconds=60)
+    # Shown untranslated meanwhile
+    assert translator.table(catalog, "de") == {}
+    assert isinstance(translator.last_error, ConnectionError)
+    backend.down = False
+    clock.now += 30
+    assert translator.table(catalog, "de") == {}
+    assert len(backend.calls) == 1
+    clock.now += 30
+    assert translator.table(catalog, "de")["Caesar Salad"] == "[de] Caesar Salad"
+    assert len(backend.calls) == 2
+    assert storage.translations("de")["Caesar Salad"] == "[de] Caesar Salad"
+
+
+# GoogleBackend against a fake googletrans Translator that upper-cases text,
+# and loses the line breaks of requests with more than `keeps_lines` lines
+class FakeTranslator:
+    def __init__(self, keeps_lines=1_000):
+        self.keeps_lines = keeps_lines
+
+    def translate(self, text, dest, src):
+        lines = text.split("\n")
+        joined = "\n".join(lines) if len(lines) <= self.keeps_lines else " ".join(lines)
+        return types.SimpleNamespace(text=joined.upper())
+
+
+def google(translator, max_chars=GoogleBackend.max_chars):
+    backend = GoogleBackend.__new__(GoogleBackend)
+    backend.translator = translator
+    backend.requests = 0
+    backend.max_chars = max_chars
+    return backend
+
+
+def test_google_backend_batches_and_splits_lines():
+    texts = ["Tomato Soup", "Caesar Salad", "Lentil Soup", "Tea"]
+    backend = google(FakeTranslator(), max_chars=30)
+    assert backend.translate(texts, "es") == [text.upper() for text in texts]
+    # Two newline-joined requests of at most 30 characters
+    assert backend.requests == 2
+
+
+def test_google_backend_retries_mangled_chunk_one_string_at_a_time():
+    texts = ["Tomato Soup", "Caesar Salad", "Tea"]
+    backend = google(FakeTranslator(keeps_lines=1))
+    assert backend.translate(texts, "es") == [text.upper() for text in texts]
+    assert backend.requests == 1 + len(texts)
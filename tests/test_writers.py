@@ -0,0 +1,296 @@
+# The write-behind cart store and feedback queue, and the order tracker:
+# batching, flushing on stop, and recovering from failed writes
+import threading
+import time
+
+import pytest
+
+from carts import CartStore
+from feedback import FeedbackWriter
+from orders import DELIVERED, OrderTracker
+from storage import SqliteStorage
+
+NOW = 1_700_000_000.0
+
+
+# SQLite storage whose writes of one kind fail the first `failures` times, like a locked database
+class FlakyStorage(SqliteStorage):
+    def __init__(self, path, method, failures=1):
+        super().__init__(path)
+        self.failures = failures
+        self.calls = 0
+        setattr(self, method, self._flaky(getattr(self, method)))
+
+    def _flaky(self, write):
+        def flaky(*args):
+            self.calls += 1
+            if self.calls <= self.failures:
+                raise RuntimeError("database is locked")
+            return write(*args)
+        return flaky
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError("timed out")
+        time.sleep(0.005)
+
+
+@pytest.fixture
+def sqlite(workdir):
+    storage = SqliteStorage(str(workdir / "app.db"))
+    storage.migrate()
+    return storage
+
+
+def flaky(workdir, method, failures=1):
+    storage = FlakyStorage(str(workdir / "app.db"), method, failures)
+    storage.migrate()
+    return storage
+
+
+def test_cart_changes_are_batched(sqlite):
+    carts = CartStore(sqlite, flush_seconds=60, batch_size=1000)
+    carts.add("bob", 1)
+    carts.add("bob", 1)
+    carts.add("bob", 2, 3)
+    carts.set_quantity("bob", 2, 0)
+    assert carts.get("bob") == {1: 2}
+    assert sqlite.load_cart("bob") == []
+    assert carts.flush() == 2
+    assert sqlite.load_cart("bob") == [(1, 2)]
+    assert carts.flush() == 0
+
+
+def test_cart_clear_and_release(sqlite):
+    sqlite.save_cart_entries([("bob", 1, 1), ("bob", 2, 2)])
+    carts = CartStore(sqlite, flush_seconds=60)
+    assert carts.get("bob") == {1: 1, 2: 2}
+    carts.clear("bob")
+    assert carts.get("bob") == {}
+    carts.add("bob", 3)
+    carts.release("bob")
+    assert sqlite.load_cart("bob") == [(3, 1)]
+    assert "bob" not in carts._carts
+
+
+def test_cart_writer_flushes_by_age_and_batch(sqlite):
+    carts = CartStore(sqlite, flush_seconds=0.05, batch_size=1000)
+    carts.start()
+    try:
+        carts.add("bob", 1)
+        wait_for(lambda: sqlite.load_cart("bob") == [(1, 1)])
+    finally:
+        carts.stop()
+
+    carts = CartStore(sqlite, flush_seconds=60, batch_size=3)
+    carts.start()
+    try:
+        for item_id in range(3):
+            carts.add("amy", item_id)
+        wait_for(lambda: len(sqlite.load_cart("amy")) == 3)
+    finally:
+        carts.stop()
+
+
+def test_cart_stop_flushes(sqlite):
+    carts = CartStore(sqlite, flush_seconds=60)
+    carts.start()
+    carts.add("bob", 5)
+    carts.stop()
+    assert sqlite.load_cart("bob") == [(5, 1)]
+
+
+def test_cart_write_failure_is_retried(workdir):
+    storage = flaky(workdir, "save_cart_entries")
+    carts = CartStore(storage, flush_seconds=0.01)
+    carts.retry_seconds = 0.01
+    carts.start()
+    try:
+        carts.add("bob", 1)
+        carts.add("bob", 2)
+        wait_for(lambda: sorted(storage.load_cart("bob")) == [(1, 1), (2, 1)])
+        assert str(carts.last_error) == "database is locked"
+        assert carts._thread.is_alive()
+    finally:
+        carts.stop()
+
+
+def test_cart_release_keeps_unwritten_cart(workdir):
+    storage = flaky(workdir, "save_cart_entries")
+    carts = CartStore(storage, flush_seconds=60)
+    carts.add("bob", 1)
+    carts.release("bob")
+    assert carts.get("bob") == {1: 1}
+    carts.release("bob")
+    assert storage.load_cart("bob") == [(1, 1)]
+
+
+def test_idle_carts_are_evicted_and_reloaded(sqlite):
+    carts = CartStore(sqlite, flush_seconds=60, idle_seconds=0.05)
+    carts.add("bob", 1)
+    carts.flush()
+    time.sleep(0.1)
+    carts.get("amy")
+    assert list(carts._carts) == ["amy"]
+    assert carts.get("bob") == {1: 1}
+
+
+def test_least_recently_used_clean_carts_go_first(sqlite):
+    carts = CartStore(sqlite, flush_seconds=60, max_carts=2)
+    carts.get("amy")
+    carts.add("bob", 1)
+    carts.get("amy")
+    carts.get("cy")
+    # bob has an unwritten change, so the older clean cart goes
+    assert list(carts._carts) == ["bob", "cy"]
+    carts.get("dan")
+    assert list(carts._carts) == ["bob", "dan"]
+    # Once written, bob's cart is clean and evictable
+    carts.flush()
+    carts.get("eve")
+    assert list(carts._carts) == ["dan", "eve"]
+    assert carts.get("bob") == {1: 1}
+
+
+def test_cart_in_a_failed_write_is_not_evicted(workdir):
+    carts = None
+
+    # Another session loads a cart while bob's write is in flight, then the write fails
+    class Busy(SqliteStorage):
+        failed = False
+
+        def save_cart_entries(self, rows):
+            if not self.failed:
+                self.failed = True
+                carts.get("amy")
+                raise RuntimeError("database is locked")
+            super().save_cart_entries(rows)
+
+    storage = Busy(str(workdir / "app.db"))
+    storage.migrate()
+    carts = CartStore(storage, flush_seconds=60, max_carts=1)
+    carts.add("bob", 7, 2)
+    with pytest.raises(RuntimeError):
+        carts.flush()
+    assert carts.get("bob") == {7: 2}
+    carts.flush()
+    assert storage.load_cart("bob") == [(7, 2)]
+
+
+def test_feedback_is_batched(sqlite):
+    writer = FeedbackWriter(sqlite, flush_seconds=60, batch_size=1000)
+    for n in range(3):
+        writer.submit("bob", f"note {n}")
+    assert sqlite.feedback_page() == []
+    assert writer.flush() == 3
+    assert [row[2] for row in sqlite.feedback_page()] == ["note 2", "note 1", "note 0"]
+
+
+def test_feedback_writer_flushes_by_age_and_on_stop(sqlite):
+    writer = FeedbackWriter(sqlite, flush_seconds=0.05)
+    writer.start()
+    writer.submit("bob", "soon")
+    wait_for(lambda: len(sqlite.feedback_page()) == 1)
+    writer.submit("bob", "at stop")
+    writer.flush_seconds = 60
+    writer.stop()
+    assert [row[2] for row in sqlite.feedback_page()] == ["at stop", "soon"]
+
+
+def test_durable_feedback_waits_for_its_commit(sqlite):
+    writer = FeedbackWriter(sqlite, flush_seconds=60, durable=True)
+    writer.start()
+    try:
+        writer.submit("bob", "kept")
+        assert [row[2] for row in sqlite.feedback_page()] == ["kept"]
+        writer.submit("bob", "queued", durable=False)
+        assert len(sqlite.feedback_page()) == 1
+    finally:
+        writer.stop()
+    assert len(sqlite.feedback_page()) == 2
+
+
+def test_durable_submitter_gets_write_error(workdir):
+    storage = flaky(workdir, "add_feedback")
+    writer = FeedbackWriter(storage, flush_seconds=60)
+    writer.retry_seconds = 0.01
+    writer.start()
+    try:
+        with pytest.raises(RuntimeError, match="database is locked"):
+            writer.submit("bob", "first", durable=True)
+        # The row stays queued and goes out with the retry
+        writer.submit("bob", "second", durable=True)
+        assert [row[2] for row in storage.feedback_page()] == ["second", "first"]
+        assert writer._thread.is_alive()
+    finally:
+        writer.stop()
+
+
+def test_concurrent_durable_submits(sqlite):
+    writer = FeedbackWriter(sqlite, flush_seconds=60, durable=True)
+    writer.start()
+    threads = [threading.Thread(target=writer.submit, args=(f"user{n}", "hi")) for n in range(20)]
+    try:
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert len(sqlite.feedback_page(limit=100)) == 20
+    finally:
+        writer.stop()
+
+
+def test_tracker_moves_orders_to_delivered(sqlite):
+    tracker = OrderTracker(sqlite, stage_seconds=0.01)
+    tracker.start()
+    try:
+        order_id = tracker.place("bob", ["Soup", "Soup", "Salad"])
+        assert tracker.status(order_id) in range(DELIVERED + 1)
+        wait_for(lambda: sqlite.order_status(order_id) == DELIVERED)
+        assert tracker.status(order_id) == DELIVERED
+        assert order_id not in tracker._stages
+        _, items = sqlite.order_page("bob")
+        assert sorted(items) == [(order_id, "Salad", 1), (order_id, "Soup", 2)]
+    finally:
+        tracker.stop()
+
+
+def test_tracker_resumes_open_orders(sqlite):
+    order_id = sqlite.add_order("bob", {"Soup": 1}, NOW)
+    sqlite.set_order_statuses([(3, NOW, order_id)])
+    tracker = OrderTracker(sqlite, stage_seconds=0.01)
+    tracker.start()
+    try:
+        assert tracker.status(order_id) >= 3
+        wait_for(lambda: sqlite.order_status(order_id) == DELIVERED)
+    finally:
+        tracker.stop()
+
+
+def test_tracker_write_failure_is_retried(workdir):
+    storage = flaky(workdir, "set_order_statuses", failures=2)
+    tracker = OrderTracker(storage, stage_seconds=0.01, retry_seconds=0.01)
+    tracker.start()
+    try:
+        order_id = tracker.place("bob", ["Soup"])
+        wait_for(lambda: storage.order_status(order_id) == DELIVERED)
+        assert str(tracker.last_error) == "database is locked"
+        assert tracker._thread.is_alive()
+    finally:
+        tracker.stop()
+
+
+def test_tracker_stage_counts_only_once_written(workdir):
+    storage = flaky(workdir, "set_order_statuses", failures=1_000)
+    tracker = OrderTracker(storage, stage_seconds=0.01, retry_seconds=0.01)
+    tracker.start()
+    try:
+        order_id = tracker.place("bob", ["Soup"])
+        wait_for(lambda: storage.calls >= 3)
+        assert tracker.status(order_id) == 0
+        assert storage.order_status(order_id) == 0
+    finally:
+        tracker.stop()
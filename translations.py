@@ -0,0 +1,156 @@
+import os
+import threading
+import time
+
+from catalog import DIETARY_RESTRICTIONS, TAG_VOCABULARY
+from metrics import timed
+from storage import get_storage
+
+# Language the menu file is written in
+SOURCE_LOCALE = 'en'
+# Languages offered on the ordering page, by their name in that language
+LANGUAGES = {
+    "English": "en", "Español": "es", "Français": "fr", "Deutsch": "de",
+    "Italiano": "it", "Português": "pt", "中文": "zh-cn", "日本語": "ja",
+}
+# Which backend translates strings the cache doesn't have yet: google, or
+# local for the offline stand-in
+TRANSLATOR = os.environ.get('TRANSLATOR', 'google')
+# Seconds before strings a backend failed on are tried again
+RETRY_SECONDS = 300.0
+
+
+# Translations through Google Translate's web endpoint (the googletrans
+# package). Its translate() takes one string per request, so strings are sent
+# newline-joined, up to `max_chars` per request, and split back apart; a chunk
+# that comes back with a different number of lines is retried string by string.
+class GoogleBackend:
+    max_chars = 4500
+
+    def __init__(self, timeout=10.0):
+        import httpx
+        from googletrans import Translator
+        self.translator = Translator(timeout=httpx.Timeout(timeout))
+        self.requests = 0
+
+    # Translations of `texts` into `locale`, in order
+    def translate(self, texts, locale):
+        translated = []
+        for chunk in self._chunks(texts):
+            lines = self._request('\n'.join(chunk), locale).split('\n')
+            if len(lines) != len(chunk):
+                lines = [self._request(text, locale) for text in chunk]
+            translated.extend(line.strip() for line in lines)
+        return translated
+
+    def _chunks(self, texts):
+        chunk, size = [], 0
+        for text in texts:
+            if chunk and size + len(text) + 1 > self.max_chars:
+                yield chunk
+                chunk, size = [], 0
+            chunk.append(text)
+            size += len(text) + 1
+        if chunk:
+            yield chunk
+
+    def _request(self, text, locale):
+        self.requests += 1
+        return self.translator.translate(text, dest=locale, src=SOURCE_LOCALE).text
+
+
+# Offline stand-in for GoogleBackend, for tests and machines without network
+# access: "Tomato Soup" becomes "[es] Tomato Soup". `latency` seconds are spent
+# per request of up to `batch` strings, to imitate a round trip.
+class LocalBackend:
+    def __init__(self, latency=0.0, batch=GoogleBackend.max_chars // 20):
+        self.latency = latency
+        self.batch = batch
+        self.requests = 0
+
+    def translate(self, texts, locale):
+        for _ in range(0, len(texts), self.batch):
+            self.requests += 1
+            time.sleep(self.latency)
+        return [f"[{locale}] {text}" for text in texts]
+
+
+def open_backend(name=TRANSLATOR):
+    if name == 'local':
+        return LocalBackend()
+    if name == 'google':
+        return GoogleBackend()
+    raise ValueError(f"Unknown translator {name!r}")
+
+
+# Every string of a catalog the ordering page shows: item names, categories,
+# tags and the restriction labels
+def menu_strings(catalog):
+    return set(catalog.names) | set(catalog.category_names()) | set(TAG_VOCABULARY) | set(DIETARY_RESTRICTIONS)
+
+
+# Menu text in other languages. The first time a locale is asked for, the
+# process loads everything stored for it (storage's translations table, keyed
+# by locale and source text) into a dict, sends all the strings still missing
+# to the backend in one batch and stores the results; later lookups of that
+# catalog version and locale return the dict without touching storage or the
+# backend. A menu change only translates its new strings. When the backend
+# fails, the missing strings are shown untranslated and retried after
+# `retry_seconds`.
+class MenuTranslator:
+    def __init__(self, storage=None, backend=None, retry_seconds=RETRY_SECONDS):
+        self.storage = storage or get_storage()
+        self.backend = backend
+        self.retry_seconds = retry_seconds
+        self.last_error = None
+        self._texts = {}  # locale -> {source: translation}
+        self._ready = {}  # locale -> catalog version whose strings are all in _texts
+        self._retry_at = {}  # locale -> when strings a backend failed on may be tried again
+        self._lock = threading.Lock()
+
+    # {source: translation} covering the strings of `catalog` in `locale`
+    # (empty for SOURCE_LOCALE); use table.get(text, text)
+    def table(self, catalog, locale):
+        if locale == SOURCE_LOCALE:
+            return {}
+        if self._ready.get(locale) == catalog.version:
+            return self._texts[locale]
+        return self._fill(catalog, locale)
+
+    @timed("translations.fill")
+    def _fill(self, catalog, locale):
+        with self._lock:
+            texts = self._texts.get(locale)
+            if texts is None:
+                texts = self._texts[locale] = self.storage.translations(locale)
+            missing = sorted(menu_strings(catalog) - texts.keys())
+            if missing:
+                if time.monotonic() < self._retry_at.get(locale, 0):
+                    return texts
+                try:
+                    if self.backend is None:
+                        self.backend = open_backend()
+                    translated = dict(zip(missing, self.backend.translate(missing, locale)))
+                except Exception as error:
+                    self.last_error = error
+                    self._retry_at[locale] = time.monotonic() + self.retry_seconds
+                    return texts
+                self.storage.add_translations(locale, translated.items())
+                # A new dict, so sessions holding the old one never see it change mid-rerun
+                texts = self._texts[locale] = {**texts, **translated}
+            self._ready[locale] = catalog.version
+            return texts
+
+
+_translator = None
+_translator_lock = threading.Lock()
+
+
+# Process-wide menu translator
+def get_translator():
+    global _translator
+    if _translator is None:
+        with _translator_lock:
+            if _translator is None:
+                _translator = MenuTranslator()
+    return _translator
@@ -0,0 +1,138 @@
+import threading
+import time
+
+# Seconds the writer waits after a failed write before trying that work again
+RETRY_SECONDS = 1.0
+
+
+# Write-behind machinery shared by the cart store and the feedback queue: work
+# is queued in memory and one background thread writes everything pending in a
+# single transaction once `batch_size` items are waiting, the oldest is
+# `flush_seconds` old, or a subclass says it is urgent. A failed write puts
+# the work back at the front of the queue, keeps the error in `last_error` and
+# is retried after `retry_seconds`, so a transient error (a locked database)
+# delays writes instead of stopping them.
+#
+# Subclasses keep their queue under self._cond and call _queued() after adding
+# to it, and implement _size, _take, _restore and _write; _urgent, _done and
+# _failed are optional hooks.
+class WriteBehind:
+    def __init__(self, name, flush_seconds, batch_size, retry_seconds=RETRY_SECONDS):
+        self.name = name
+        self.flush_seconds = flush_seconds
+        self.batch_size = batch_size
+        self.retry_seconds = retry_seconds
+        self.last_error = None
+        self._pending_since = None
+        self._retry_at = None
+        self._cond = threading.Condition()
+        self._flush_lock = threading.Lock()
+        self._thread = None
+        self._stopped = False
+
+    def start(self):
+        with self._cond:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+            self._thread.start()
+
+    # Stop the writer after writing everything still pending
+    def stop(self):
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join()
+        self.flush()
+
+    # Number of pending items; caller holds self._cond
+    def _size(self):
+        raise NotImplementedError
+
+    # Remove and return everything pending, as a batch for _write; caller holds self._cond
+    def _take(self):
+        raise NotImplementedError
+
+    # Put a batch whose write failed back in front of anything queued since; caller holds self._cond
+    def _restore(self, batch):
+        raise NotImplementedError
+
+    # Write a batch in one transaction; returns how many items were written
+    def _write(self, batch):
+        raise NotImplementedError
+
+    # Whether to write at once, whatever the batch size and age; caller holds self._cond
+    def _urgent(self):
+        return False
+
+    # Called with self._cond held after a batch was written
+    def _done(self, batch):
+        pass
+
+    # Called with self._cond held after a batch failed and was restored
+    def _failed(self, batch, error):
+        pass
+
+    # Caller holds self._cond, after queueing work: starts the age timer or wakes the writer for a full batch
+    def _queued(self):
+        if self._pending_since is None:
+            self._pending_since = time.monotonic()
+            self._cond.notify_all()
+        elif self._size() >= self.batch_size:
+            self._cond.notify_all()
+
+    # Write everything pending in one transaction; returns how many items were
+    # written. If the write fails the work is put back and the error raised.
+    def flush(self):
+        with self._flush_lock:
+            with self._cond:
+                batch = self._take()
+                since, self._pending_since = self._pending_since, None
+            if not batch:
+                return 0
+            try:
+                written = self._write(batch)
+            except Exception as error:
+                with self._cond:
+                    self._restore(batch)
+                    self._pending_since = since
+                    self._retry_at = time.monotonic() + self.retry_seconds
+                    self.last_error = error
+                    self._failed(batch, error)
+                    self._cond.notify_all()
+                raise
+            with self._cond:
+                self._retry_at = None
+                self._done(batch)
+                self._cond.notify_all()
+            return written
+
+    # Whether the writer should flush now; caller holds self._cond
+    def _due(self):
+        if not self._size():
+            return False
+        now = time.monotonic()
+        if self._retry_at is not None and now < self._retry_at:
+            return False
+        return self._urgent() or self._size() >= self.batch_size or now - self._pending_since >= self.flush_seconds
+
+    # Seconds until the writer may next have work due, None to wait for a wake-up; caller holds self._cond
+    def _timeout(self):
+        if not self._size():
+            return None
+        if self._retry_at is not None:
+            return self._retry_at - time.monotonic()
+        return self._pending_since + self.flush_seconds - time.monotonic()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._stopped and not self._due():
+                    self._cond.wait(self._timeout())
+                if self._stopped:
+                    return
+            try:
+                self.flush()
+            except Exception:
+                pass  # Kept in last_error; the batch is back in the queue for the retry